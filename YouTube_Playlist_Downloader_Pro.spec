@@ -24,7 +24,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['numpy', 'unittest', 'doctest', 'pdb', 'pydoc', 'pydoc_data', 'xmlrpc', 'lib2to3', 'distutils', 'setuptools', 'pip', 'test', 'tkinter.test', 'idlelib', 'curses', 'PIL.ImageQt', 'PyQt5', 'PyQt6', 'PySide2', 'PySide6', 'IPython', 'matplotlib', 'scipy', 'pandas'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -36,18 +36,14 @@ pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='YouTube_Playlist_Downloader_Pro',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=false,
+    upx=False,
+    console=False,
     disable_windowed_traceback=False,
     target_arch=None,
     codesign_identity=None,
@@ -55,3 +51,14 @@ exe = EXE(
     icon='icons/app_icon.ico',
     version_file='version_info.txt',
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='YouTube_Playlist_Downloader_Pro',
+)
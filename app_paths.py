@@ -0,0 +1,41 @@
+"""
+YouTube Playlist Downloader Pro - Application Paths
+Per-user locations for caches and persistent application data.
+"""
+
+import os
+import sys
+
+APP_DIR_NAME = "YouTubePlaylistDownloaderPro"
+
+
+def _base_dir(windows_var, xdg_var, xdg_default):
+    if sys.platform == "win32":
+        base = os.environ.get(windows_var) or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get(xdg_var) or os.path.expanduser(xdg_default)
+    return base
+
+
+def get_cache_dir():
+    """Return (and create) the directory for disposable cached data."""
+    override = os.environ.get("YTPD_CACHE_DIR")
+    if override:
+        path = override
+    else:
+        path = os.path.join(_base_dir("LOCALAPPDATA", "XDG_CACHE_HOME", "~/.cache"), APP_DIR_NAME, "cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_data_dir():
+    """Return (and create) the directory for data that must survive restarts."""
+    override = os.environ.get("YTPD_DATA_DIR")
+    if override:
+        path = override
+    else:
+        path = os.path.join(_base_dir("APPDATA", "XDG_DATA_HOME", "~/.local/share"), APP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,112 @@
+"""
+YouTube Playlist Downloader Pro - Bandwidth Budget
+One download rate limit shared by every active download.
+
+``BandwidthBudget`` holds the global limit in bytes per second. Each running
+download registers a ``JobThrottle`` with a weight and gets
+``limit * weight / total_weight`` of the budget. Shares are recomputed on
+every call, so changing the limit or finishing, cancelling or adding a job
+takes effect for the other downloads immediately, without restarting them.
+"""
+
+import threading
+import time
+
+# Choices offered in the GUI, in bytes per second (None means unlimited)
+BANDWIDTH_PRESETS = {
+    "Unlimited": None,
+    "512 KB/s": 512 * 1024,
+    "1 MB/s": 1024 * 1024,
+    "2 MB/s": 2 * 1024 * 1024,
+    "5 MB/s": 5 * 1024 * 1024,
+    "10 MB/s": 10 * 1024 * 1024,
+}
+
+# Longest single sleep, so cancellation and limit changes are noticed quickly
+MAX_SLEEP = 0.25
+
+# Bytes a job may send in a burst, as seconds' worth of its share
+BURST_SECONDS = 1.0
+
+
+class BandwidthBudget:
+    """Thread-safe global rate limit divided between weighted jobs."""
+
+    def __init__(self, limit=None):
+        self._lock = threading.Lock()
+        self._limit = limit or None
+        self._weights = {}
+
+    @property
+    def limit(self):
+        return self._limit
+
+    def set_limit(self, limit):
+        """Change the global limit in bytes per second; None or 0 removes it."""
+        with self._lock:
+            self._limit = limit or None
+
+    def register(self, job_id, weight=1.0):
+        """Add a job to the budget and return its throttle."""
+        with self._lock:
+            self._weights[job_id] = max(float(weight), 0.01)
+        return JobThrottle(self, job_id)
+
+    def unregister(self, job_id):
+        """Remove a job so its share goes to the others."""
+        with self._lock:
+            self._weights.pop(job_id, None)
+
+    def share(self, job_id):
+        """Return the job's current rate in bytes per second, or None if unlimited."""
+        with self._lock:
+            if self._limit is None:
+                return None
+            weight = self._weights.get(job_id)
+            if weight is None:
+                return None
+            return self._limit * weight / sum(self._weights.values())
+
+
+class JobThrottle:
+    """Token bucket for one job, refilled at the job's current share."""
+
+    def __init__(self, budget, job_id):
+        self.budget = budget
+        self.job_id = job_id
+        self._tokens = 0.0
+        self._last = time.monotonic()
+
+    def rate(self):
+        return self.budget.share(self.job_id)
+
+    def consume(self, amount, cancelled=None):
+        """Account for ``amount`` downloaded bytes, sleeping until the share allows them.
+
+        ``cancelled`` is polled between sleeps so a cancelled download is not
+        held back by the throttle.
+        """
+        while True:
+            rate = self.rate()
+            now = time.monotonic()
+            if rate is None:
+                self._tokens = 0.0
+                self._last = now
+                return
+
+            self._tokens = min(self._tokens + (now - self._last) * rate, rate * BURST_SECONDS)
+            self._last = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return
+
+            # Take what is there and wait for the rest at the current rate
+            amount -= max(self._tokens, 0.0)
+            self._tokens = 0.0
+            if cancelled is not None and cancelled():
+                return
+            time.sleep(min(amount / rate, MAX_SLEEP))
+
+    def close(self):
+        """Leave the budget; call when the job finishes, however it ends."""
+        self.budget.unregister(self.job_id)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmark: overhead of the app itself, offline.
+
+Points both front ends at ``fake_ytdlp.py`` (through ``YTPD_YTDLP``) so the
+network and yt-dlp drop out and what is left is the app: playlist listing
+via ``fetch_playlist_info``, the CLI's ``download_videos``, and the GUI's
+streamed playlist loading and ``run_download`` through its queue. Records
+per-video overhead, throughput, peak RSS and, for the GUI, how late Tk
+event-loop callbacks run while all of this happens. Run from the
+repository root:
+
+    python benchmarks/bench_app_overhead.py --videos 200 --jobs 4 --json before.json
+
+and compare the JSON files of two builds. The GUI part needs a display
+(use ``xvfb-run`` on a headless machine) and is skipped without one.
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import shlex
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_YTDLP = os.path.join(ROOT, "benchmarks", "fake_ytdlp.py")
+sys.path.insert(0, ROOT)
+
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PLbenchmark"
+
+# Interval of the GUI event-loop lag probe
+LAG_TICK_MS = 20
+
+
+def configure_environment(args, workdir):
+    """Route yt-dlp, caches and app data to the fake and a scratch directory."""
+    os.environ.update({
+        'YTPD_YTDLP': shlex.join([sys.executable, FAKE_YTDLP]),
+        'YTPD_ENGINE': "subprocess",
+        'YTPD_CACHE_DIR': os.path.join(workdir, "cache"),
+        'YTPD_DATA_DIR': os.path.join(workdir, "data"),
+        'YTPD_FAKE_ENTRIES': str(args.videos),
+        'YTPD_FAKE_SIZE': str(args.size),
+        'YTPD_FAKE_SPEED': str(args.speed),
+        'YTPD_FAKE_PROGRESS_LINES': str(args.progress_lines),
+    })
+
+
+def load_module(name, filename):
+    """Import one of the app's scripts (their file names aren't valid module names)."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mib():
+    """Return peak RSS of this process and of its largest child, in MiB (None on Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1048576
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 1048576
+    return round(own, 1), round(child, 1)
+
+
+def download_figures(seconds, count, args):
+    """Throughput and per-video overhead beyond the simulated transfer time."""
+    slots = max(1, min(args.jobs, count))
+    transfer = args.size / args.speed if args.speed else 0.0
+    return {
+        'seconds': round(seconds, 3),
+        'videos_per_second': round(count / seconds, 2) if seconds else None,
+        'mib_per_second': round(count * args.size / 1048576 / seconds, 2) if seconds else None,
+        'overhead_ms_per_video': round((seconds * slots / count - transfer) * 1000, 1),
+    }
+
+
+def bench_cli(args, workdir):
+    cli = load_module("ytpd_cli", "youtube_Download-cli.py")
+    quiet = io.StringIO()
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(quiet):
+        videos = cli.fetch_playlist_info(PLAYLIST_URL)
+    fetch_seconds = time.perf_counter() - started
+    if not videos:
+        raise RuntimeError("fetch_playlist_info returned no videos from the fake yt-dlp")
+
+    download_dir = os.path.join(workdir, "cli")
+    os.makedirs(download_dir)
+    # download_videos asks for a format and waits for Enter; take the defaults
+    original_input = builtins.input
+    builtins.input = lambda prompt="": ""
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(quiet):
+            cli.download_videos(videos, download_dir, jobs=args.jobs)
+        download_seconds = time.perf_counter() - started
+    finally:
+        builtins.input = original_input
+
+    downloaded = sum(1 for name in os.listdir(download_dir) if name.endswith(".mp4"))
+    return {
+        'fetch': {
+            'seconds': round(fetch_seconds, 3),
+            'entries': len(videos),
+            'entries_per_second': round(len(videos) / fetch_seconds, 1),
+        },
+        'download': dict(download_figures(download_seconds, len(videos), args), videos=downloaded),
+    }
+
+
+class LagProbe:
+    """Measures how late ``after()`` callbacks run on a Tk event loop."""
+
+    def __init__(self, widget, interval_ms=LAG_TICK_MS):
+        self.widget = widget
+        self.interval = interval_ms / 1000.0
+        self.lags = []
+        self._stopped = False
+        self._expected = time.perf_counter() + self.interval
+        widget.after(interval_ms, self._tick)
+
+    def _tick(self):
+        if self._stopped:
+            return
+        now = time.perf_counter()
+        self.lags.append(max(0.0, now - self._expected))
+        self._expected = now + self.interval
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+    def summary(self):
+        """Stop probing and return lag statistics in milliseconds."""
+        self._stopped = True
+        if not self.lags:
+            return {}
+        lags = sorted(self.lags)
+        return {
+            'samples': len(lags),
+            'mean_ms': round(sum(lags) / len(lags) * 1000, 1),
+            'p95_ms': round(lags[min(len(lags) - 1, math.ceil(0.95 * len(lags)) - 1)] * 1000, 1),
+            'max_ms': round(lags[-1] * 1000, 1),
+        }
+
+
+def pump(app, done, timeout):
+    """Run the Tk event loop until ``done()`` is true."""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("GUI benchmark timed out")
+        app.update()
+        time.sleep(0.002)
+
+
+def bench_gui(args, workdir):
+    import tkinter as tk
+
+    try:
+        gui = load_module("ytpd_gui", "youtube_downloader-gui.py")
+        app = gui.YouTubeDownloaderApp()
+    except tk.TclError as e:
+        print(f"Skipping the GUI benchmark (no display: {e})")
+        return None
+    from download_archive import DownloadArchive
+
+    try:
+        app.withdraw()
+        app.download_path = os.path.join(workdir, "gui")
+        os.makedirs(app.download_path, exist_ok=True)
+        app.archive = DownloadArchive(app.download_path)
+        app.concurrency_var.set(str(args.jobs))
+        app.on_concurrency_changed(str(args.jobs))
+
+        load_probe = LagProbe(app)
+        app.url_entry.insert(0, PLAYLIST_URL)
+        started = time.perf_counter()
+        app.start_fetch_thread(force_refresh=True)
+        pump(app, lambda: not app.is_fetching and len(app.video_rows) >= args.videos, args.timeout)
+        fetch_seconds = time.perf_counter() - started
+        load_lag = load_probe.summary()
+
+        download_probe = LagProbe(app)
+        started = time.perf_counter()
+        for video_url in list(app.video_rows):
+            app.start_single_download(video_url, priority=0)
+        pump(app, lambda: not app.has_pending_work(), args.timeout)
+        download_seconds = time.perf_counter() - started
+
+        return {
+            'fetch': {
+                'seconds': round(fetch_seconds, 3),
+                'entries': len(app.video_rows),
+                'entries_per_second': round(len(app.video_rows) / fetch_seconds, 1),
+                'event_loop_lag': load_lag,
+            },
+            'download': dict(download_figures(download_seconds, len(app.video_rows), args),
+                             videos=app.completed_downloads, failed=app.failed_downloads,
+                             event_loop_lag=download_probe.summary()),
+        }
+    finally:
+        app.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline overhead of the CLI and GUI against a fake yt-dlp")
+    parser.add_argument("--videos", type=int, default=100, help="playlist size (default: 100)")
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="bytes per video (default: 1 MiB)")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="simulated bytes/s per download, 0 for instant (default: 0)")
+    parser.add_argument("--progress-lines", type=int, default=100,
+                        help="progress updates per video (default: 100)")
+    parser.add_argument("--jobs", type=int, default=3, help="parallel downloads (default: 3)")
+    parser.add_argument("--no-gui", action="store_true", help="only benchmark the CLI")
+    parser.add_argument("--timeout", type=float, default=600.0, help="GUI timeout in seconds (default: 600)")
+    parser.add_argument("--label", default=None, help="name for this build in the JSON output")
+    parser.add_argument("--json", metavar="PATH", help="also write the results here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args, workdir)
+        results = {
+            'label': args.label,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {name: getattr(args, name) for name in ("videos", "size", "speed", "progress_lines", "jobs")},
+            'cli': bench_cli(args, workdir),
+        }
+        results['gui'] = None if args.no_gui else bench_gui(args, workdir)
+        results['peak_rss_mib'], results['peak_child_rss_mib'] = peak_rss_mib()
+
+    for front_end in ("cli", "gui"):
+        if not results[front_end]:
+            continue
+        fetch, download = results[front_end]['fetch'], results[front_end]['download']
+        print(f"{front_end.upper():<4} fetch     {fetch['entries']:>6} entries in {fetch['seconds']:7.2f} s "
+              f"({fetch['entries_per_second']:,.0f}/s)")
+        print(f"{front_end.upper():<4} download  {download['videos']:>6} videos  in {download['seconds']:7.2f} s "
+              f"({download['videos_per_second']}/s, {download['mib_per_second']} MiB/s, "
+              f"{download['overhead_ms_per_video']} ms overhead/video)")
+        for phase in (fetch, download):
+            lag = phase.get('event_loop_lag')
+            if lag:
+                print(f"     event loop lag: mean {lag['mean_ms']} ms, p95 {lag['p95_ms']} ms, max {lag['max_ms']} ms")
+    print(f"Peak RSS: {results['peak_rss_mib']} MiB (largest child {results['peak_child_rss_mib']} MiB)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
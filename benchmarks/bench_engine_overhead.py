@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-video overhead of the in-process, subprocess and worker engines.
+
+Serves small synthetic media files from a local HTTP server and downloads
+each one with both engines, so the numbers reflect engine overhead
+(interpreter startup, yt_dlp import, extractor init) rather than network
+speed. Run from the repository root:
+
+    python benchmarks/bench_engine_overhead.py --videos 20
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdlp_engine import (ENGINE_INPROCESS, ENGINE_SUBPROCESS, ENGINE_WORKERS, DownloadEngine,
+                          inprocess_available)
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_media_server(directory, count, size):
+    """Write ``count`` synthetic clips into ``directory`` and serve them."""
+    payload = os.urandom(size)
+    for i in range(count):
+        with open(os.path.join(directory, f"clip_{i:04d}.mp4"), 'wb') as f:
+            f.write(payload)
+
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_engine(mode, base_url, count, output_dir):
+    """Download every clip with one engine and return per-video timings."""
+    engine = DownloadEngine(mode)
+    options = {'output_template': os.path.join(output_dir, mode, "%(id)s.%(ext)s")}
+    timings = []
+    failures = 0
+
+    # Worker startup is paid once per session, like the in-process import; keep it out of the timings
+    engine.warm_up()
+    try:
+        for i in range(count):
+            started = time.perf_counter()
+            result = engine.create_download(f"{base_url}/clip_{i:04d}.mp4", options).run()
+            timings.append(time.perf_counter() - started)
+            if not result['success']:
+                failures += 1
+    finally:
+        engine.close()
+
+    return timings, failures
+
+
+def summarize(mode, timings, failures):
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    median = timings[len(timings) // 2]
+    print(f"{mode:<12} videos={len(timings):<5} failed={failures:<3} "
+          f"mean={mean * 1000:8.1f} ms  median={median * 1000:8.1f} ms  "
+          f"total={sum(timings):7.2f} s")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-video overhead of each download engine")
+    parser.add_argument("--videos", type=int, default=10, help="videos per engine (default: 10)")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="bytes per synthetic clip (default: 64 KiB)")
+    args = parser.parse_args()
+
+    if not inprocess_available():
+        print("yt_dlp is not importable; the in-process engine cannot be benchmarked.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as media_dir, tempfile.TemporaryDirectory() as output_dir:
+        server = start_media_server(media_dir, args.videos, args.size)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        print(f"Downloading {args.videos} x {args.size} byte clips from {base_url}\n")
+        means = {}
+        for mode in (ENGINE_SUBPROCESS, ENGINE_WORKERS, ENGINE_INPROCESS):
+            timings, failures = run_engine(mode, base_url, args.videos, output_dir)
+            means[mode] = summarize(mode, timings, failures)
+
+        server.shutdown()
+
+    print()
+    for mode in (ENGINE_WORKERS, ENGINE_INPROCESS):
+        saved = means[ENGINE_SUBPROCESS] - means[mode]
+        print(f"{mode.capitalize()} engine saves {saved * 1000:.1f} ms per video over subprocesses "
+              f"({saved * 2000:.0f} s on a 2,000-item playlist)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decoding subprocess progress lines.
+
+Compares the regex scraping of yt-dlp's human-readable ``[download]`` lines
+that the subprocess engine used to do with decoding the machine-readable
+``--progress-template`` records it requests now. Both paths turn a line
+into the same 'progress' event. Run from the repository root:
+
+    python benchmarks/bench_progress_parsing.py --lines 200000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdlp_engine import (PROGRESS_PREFIX, format_eta, format_speed, parse_progress_record,
+                          parse_speed, progress_event)
+
+# The regexes SubprocessDownload ran on every output line before progress templates
+_legacy_progress_regex = re.compile(r'\[download\]\s+(\d+(?:\.\d+)?)%')
+_legacy_speed_regex = re.compile(r'(\d+(?:\.\d+)?(?:K|M|G)?iB/s)')
+_legacy_eta_regex = re.compile(r'ETA\s+(\d+:\d+(?::\d+)?)')
+
+
+def legacy_event(line):
+    progress_match = _legacy_progress_regex.search(line)
+    if not progress_match:
+        return None
+    speed_match = _legacy_speed_regex.search(line)
+    eta_match = _legacy_eta_regex.search(line)
+    return {
+        'type': 'progress',
+        'percent': float(progress_match.group(1)),
+        'speed': speed_match.group(1) if speed_match else "N/A",
+        'speed_bps': parse_speed(speed_match.group(1)) if speed_match else None,
+        'eta': eta_match.group(1) if eta_match else "N/A",
+    }
+
+
+def template_event(line):
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    status = parse_progress_record(line)
+    if status is None or status['status'] != 'downloading':
+        return None
+    return progress_event(status)
+
+
+def make_lines(count, total=512 * 1024 * 1024):
+    """Return matching human-readable and template lines for one long download."""
+    human, template = [], []
+    for i in range(count):
+        downloaded = total * (i + 1) // count
+        speed = 2.5 * 1024 * 1024 + (i % 97) * 1024
+        eta = int((total - downloaded) / speed)
+        human.append(f"[download]  {100.0 * downloaded / total:5.1f}% of  512.00MiB "
+                     f"at  {format_speed(speed)} ETA {format_eta(eta)}")
+        template.append(f"{PROGRESS_PREFIX} downloading {downloaded} {total} NA {speed} {eta}")
+    return human, template
+
+
+def measure(name, decode, lines):
+    started = time.perf_counter()
+    decoded = sum(1 for line in lines if decode(line) is not None)
+    elapsed = time.perf_counter() - started
+    rate = len(lines) / elapsed
+    print(f"{name:<10} lines={len(lines):<8} decoded={decoded:<8} "
+          f"time={elapsed:7.3f} s  rate={rate:12,.0f} lines/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Progress line decoding throughput")
+    parser.add_argument("--lines", type=int, default=100000, help="progress lines per parser (default: 100000)")
+    args = parser.parse_args()
+
+    human, template = make_lines(args.lines)
+    regex_rate = measure("regex", legacy_event, human)
+    template_rate = measure("template", template_event, template)
+
+    print(f"\nTemplate records decode {template_rate / regex_rate:.2f}x as fast as regex scraping")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+A scriptable stand-in for yt-dlp, for offline benchmarks.
+
+Understands the subset of the command line the app uses: ``--version``,
+``--flat-playlist -j URL`` (prints synthetic playlist entries) and a
+download (prints a destination line and progress, in the
+``--progress-template`` format if one is given, and writes the file).
+Point the app at it with the ``YTPD_YTDLP`` environment variable:
+
+    YTPD_YTDLP="python benchmarks/fake_ytdlp.py" python youtube_Download-cli.py
+
+Behaviour is set through environment variables:
+
+    YTPD_FAKE_ENTRIES         entries per playlist (default 100)
+    YTPD_FAKE_ENTRY_DELAY     seconds between playlist entries (default 0)
+    YTPD_FAKE_SIZE            bytes per video (default 1 MiB)
+    YTPD_FAKE_SPEED           simulated bytes per second, 0 for no delay (default 0)
+    YTPD_FAKE_PROGRESS_LINES  progress updates per video (default 100)
+    YTPD_FAKE_FAIL_EVERY      fail every Nth video, 0 for never (default 0)
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+VERSION = "2099.01.01-fake"
+
+_template_field_regex = re.compile(r'%\((?:progress\.)?(\w+)\)s')
+
+
+def _env_number(name, default, kind=int):
+    try:
+        return kind(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _option_value(args, *names):
+    for i, arg in enumerate(args[:-1]):
+        if arg in names:
+            return args[i + 1]
+    return None
+
+
+def _video_id(url):
+    match = re.search(r'[?&]v=([\w-]+)', url)
+    return match.group(1) if match else re.sub(r'\W+', '_', url)[-16:]
+
+
+def list_playlist(url):
+    count = _env_number("YTPD_FAKE_ENTRIES", 100)
+    delay = _env_number("YTPD_FAKE_ENTRY_DELAY", 0.0, float)
+    playlist = _video_id(url)
+    for i in range(count):
+        video_id = f"{playlist[:8]}{i:05d}"
+        print(json.dumps({
+            'id': video_id,
+            'title': f"Synthetic video {i + 1} of {playlist}",
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'duration': 180 + i % 600,
+            'uploader': "Benchmark Channel",
+            'view_count': 1000 * (i + 1),
+        }), flush=True)
+        if delay:
+            time.sleep(delay)
+    return 0
+
+
+def _progress_line(template, status):
+    if template is None:
+        total = status['total_bytes']
+        percent = 100.0 * status['downloaded_bytes'] / total
+        return f"[download] {percent:5.1f}% of {total / 1048576:.2f}MiB at {status['speed'] / 1048576:.2f}MiB/s ETA 00:{int(status['eta']):02d}"
+    return _template_field_regex.sub(lambda m: str(status.get(m.group(1), "NA")), template)
+
+
+def download(url, args):
+    size = _env_number("YTPD_FAKE_SIZE", 1024 * 1024)
+    speed = _env_number("YTPD_FAKE_SPEED", 0.0, float)
+    updates = max(1, _env_number("YTPD_FAKE_PROGRESS_LINES", 100))
+    fail_every = _env_number("YTPD_FAKE_FAIL_EVERY", 0)
+
+    video_id = _video_id(url)
+    number = int(re.sub(r'\D', '', video_id[-5:]) or 0)
+    if fail_every and (number + 1) % fail_every == 0:
+        print(f"ERROR: [youtube] {video_id}: Video unavailable (simulated)", flush=True)
+        return 1
+
+    template = _option_value(args, "--progress-template")
+    if template is not None and template.startswith("download:"):
+        template = template[len("download:"):]
+    output = (_option_value(args, "-o", "--output") or "%(title)s.%(ext)s")
+    path = output.replace("%(title)s", f"Synthetic {video_id}").replace("%(id)s", video_id).replace("%(ext)s", "mp4")
+
+    print(f"[youtube] {video_id}: Downloading webpage", flush=True)
+    print(f"[download] Destination: {path}", flush=True)
+    started = time.monotonic()
+    for i in range(1, updates + 1):
+        downloaded = size * i // updates
+        if speed:
+            # Sleep until the simulated transfer has reached this point
+            time.sleep(max(0.0, downloaded / speed - (time.monotonic() - started)))
+        elapsed = max(time.monotonic() - started, 1e-6)
+        current_speed = speed or downloaded / elapsed
+        status = {
+            'status': "downloading",
+            'downloaded_bytes': downloaded,
+            'total_bytes': size,
+            'total_bytes_estimate': "NA",
+            'speed': current_speed,
+            'eta': (size - downloaded) / current_speed,
+        }
+        print(_progress_line(template, status), flush=True)
+
+    with open(path, 'wb') as f:
+        # Sparse, so large simulated videos don't cost disk writes
+        f.truncate(size)
+    if template is not None:
+        print(_progress_line(template, dict(status, status="finished", eta="NA")), flush=True)
+    return 0
+
+
+def main(args):
+    if "--version" in args:
+        print(VERSION)
+        return 0
+    urls = [arg for arg in args if arg.startswith(("http://", "https://"))]
+    if not urls:
+        print("ERROR: no URL given", file=sys.stderr)
+        return 2
+    if "--flat-playlist" in args:
+        return list_playlist(urls[-1])
+    return download(urls[-1], args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
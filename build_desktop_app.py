@@ -8,6 +8,9 @@ import os
 import sys
 import subprocess
 import shutil
+import statistics
+import tempfile
+import time
 from pathlib import Path
 
 # Application configuration
@@ -19,9 +22,90 @@ APP_CONFIG = {
     'icon': 'icons/app_icon.ico',
     'main_script': 'youtube_downloader-gui.py',
     'console': False,  # Set to True if you want console window
-    'onefile': True,   # Create single executable file
+    'onefile': False,  # Single executable (unpacks itself on every launch) instead of a folder
+    'optimize': 1,     # Bytecode optimization: 1 strips asserts (2 also strips docstrings, which some libraries read)
+    'startup_runs': 5, # Timed launches for the startup benchmark, 0 to skip it
 }
 
+# Modules PyInstaller finds in the import graph that the app never loads at
+# runtime (see build/*/xref-*.html). Leaving them out shrinks the bundle and
+# the archive the bootloader opens on every launch.
+STARTUP_EXCLUDES = [
+    'numpy',  # only reached through PIL's type hints
+    'unittest', 'doctest', 'pdb', 'pydoc', 'pydoc_data',
+    'xmlrpc', 'lib2to3', 'distutils', 'setuptools', 'pip',
+    'test', 'tkinter.test', 'idlelib', 'curses',
+    'PIL.ImageQt', 'PyQt5', 'PyQt6', 'PySide2', 'PySide6',
+    'IPython', 'matplotlib', 'scipy', 'pandas',
+]
+
+# Timed launches set this so the app exits as soon as its window is drawn
+EXIT_AFTER_STARTUP_ENV_VAR = "YTPD_EXIT_AFTER_STARTUP"
+STARTUP_TIMEOUT = 60
+
+def executable_name():
+    name = APP_CONFIG['name'].replace(' ', '_')
+    return f"{name}.exe" if sys.platform == "win32" else name
+
+def build_output():
+    """Return ``(executable, what to distribute)`` for the build in dist/."""
+    dist_dir = Path("dist")
+    if APP_CONFIG['onefile']:
+        exe_path = dist_dir / executable_name()
+        return exe_path, exe_path
+    app_dir = dist_dir / APP_CONFIG['name'].replace(' ', '_')
+    return app_dir / executable_name(), app_dir
+
+def output_size(path):
+    """Size in bytes of a file, or of everything in a folder."""
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+def measure_startup(executable, runs):
+    """Launch the built app ``runs`` times; return how long each took to draw its window.
+
+    An untimed first launch warms the OS file cache and the app's toolchain
+    cache. Cache and data go to a scratch directory. Returns None if the app
+    can't be timed here (no display, or it didn't exit by itself).
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ)
+        env.update({
+            EXIT_AFTER_STARTUP_ENV_VAR: "1",
+            'YTPD_CACHE_DIR': os.path.join(scratch, "cache"),
+            'YTPD_DATA_DIR': os.path.join(scratch, "data"),
+        })
+        timings = []
+        for run in range(runs + 1):
+            started = time.perf_counter()
+            try:
+                result = subprocess.run([str(executable)], env=env, timeout=STARTUP_TIMEOUT,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except (OSError, subprocess.TimeoutExpired):
+                return None
+            if result.returncode != 0:
+                return None
+            if run:
+                timings.append(time.perf_counter() - started)
+    return timings
+
+def report_build(exe_path, output_path):
+    """Print the size of the build and, unless disabled, its startup time."""
+    kind = "Folder size" if output_path.is_dir() else "File size"
+    print(f"📏 {kind}: {output_size(output_path) / (1024*1024):.1f} MB")
+
+    runs = APP_CONFIG['startup_runs']
+    if not runs:
+        return
+    print(f"⏱️ Measuring startup time ({runs} launches)...")
+    timings = measure_startup(exe_path, runs)
+    if timings:
+        print(f"⏱️ Startup time: {statistics.median(timings):.2f} s median, "
+              f"{min(timings):.2f} s best (until the window is drawn)")
+    else:
+        print("⚠️ Could not measure startup time (the app needs a display to start)")
+
 def check_requirements():
     """Check if all required tools and files are available."""
     print("🔍 Checking requirements...")
@@ -57,6 +141,7 @@ def check_requirements():
 
 def create_spec_file():
     """Create PyInstaller spec file for advanced configuration."""
+    name = APP_CONFIG['name'].replace(' ', '_')
     spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
@@ -83,7 +168,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    excludes={STARTUP_EXCLUDES!r},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -91,7 +176,10 @@ a = Analysis(
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
-
+'''
+    
+    if APP_CONFIG['onefile']:
+        spec_content += f'''
 exe = EXE(
     pyz,
     a.scripts,
@@ -99,14 +187,14 @@ exe = EXE(
     a.zipfiles,
     a.datas,
     [],
-    name='{APP_CONFIG['name'].replace(' ', '_')}',
+    name='{name}',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
     upx_exclude=[],
     runtime_tmpdir=None,
-    console={str(APP_CONFIG['console']).lower()},
+    console={APP_CONFIG['console']},
     disable_windowed_traceback=False,
     target_arch=None,
     codesign_identity=None,
@@ -114,9 +202,43 @@ exe = EXE(
     icon='{APP_CONFIG['icon']}',
     version_file='version_info.txt',
 )
+'''
+    else:
+        # Folder build: nothing is unpacked at launch, and no UPX, since
+        # compressed DLLs are expanded again every time they are loaded
+        spec_content += f'''
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='{name}',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console={APP_CONFIG['console']},
+    disable_windowed_traceback=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon='{APP_CONFIG['icon']}',
+    version_file='version_info.txt',
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='{name}',
+)
 '''
     
-    spec_filename = f"{APP_CONFIG['name'].replace(' ', '_')}.spec"
+    spec_filename = f"{name}.spec"
     with open(spec_filename, 'w', encoding='utf-8') as f:
         f.write(spec_content)
     
@@ -186,9 +308,11 @@ def build_application():
     # Create version info
     create_version_info()
     
-    # Build command
+    # Build command; PyInstaller compiles the bundled bytecode at the
+    # optimization level of the interpreter running it
+    optimize_flags = ["-" + "O" * APP_CONFIG['optimize']] if APP_CONFIG['optimize'] else []
     build_cmd = [
-        sys.executable, "-m", "PyInstaller",
+        sys.executable, *optimize_flags, "-m", "PyInstaller",
         "--clean",
         "--noconfirm",
         spec_file
@@ -204,18 +328,18 @@ def build_application():
             print("✅ Build completed successfully!")
             
             # Find the executable
-            exe_name = f"{APP_CONFIG['name'].replace(' ', '_')}.exe"
-            exe_path = Path("dist") / exe_name
+            exe_path, output_path = build_output()
             
             if exe_path.exists():
                 print(f"🎉 Executable created: {exe_path}")
-                print(f"📏 File size: {exe_path.stat().st_size / (1024*1024):.1f} MB")
+                report_build(exe_path, output_path)
                 
-                # Create a more user-friendly name
+                # Create a more user-friendly name (a folder build's
+                # executable only runs from inside its folder)
                 friendly_name = f"{APP_CONFIG['name']}.exe"
                 friendly_path = Path("dist") / friendly_name
                 
-                if friendly_path != exe_path:
+                if APP_CONFIG['onefile'] and friendly_path != exe_path:
                     shutil.copy2(exe_path, friendly_path)
                     print(f"📋 Also created: {friendly_path}")
                 
@@ -240,8 +364,11 @@ def create_desktop_shortcut():
         from win32com.client import Dispatch
         
         desktop = winshell.desktop()
-        exe_path = Path("dist") / f"{APP_CONFIG['name']}.exe"
-        
+        if APP_CONFIG['onefile']:
+            exe_path = Path("dist") / f"{APP_CONFIG['name']}.exe"
+        else:
+            exe_path, _ = build_output()
+
         if exe_path.exists():
             shortcut_path = Path(desktop) / f"{APP_CONFIG['name']}.lnk"
             
@@ -313,6 +440,7 @@ def main():
     print(f"   Main Script: {APP_CONFIG['main_script']}")
     print(f"   Icon: {APP_CONFIG['icon']}")
     print(f"   Single File: {APP_CONFIG['onefile']}")
+    print(f"   Bytecode Optimization: {APP_CONFIG['optimize']}")
     
     # Confirm build
     response = input(f"\n🤔 Build desktop application? (y/N): ").strip().lower()
@@ -334,6 +462,9 @@ def main():
             for file in dist_dir.glob("*.exe"):
                 size_mb = file.stat().st_size / (1024*1024)
                 print(f"   📁 {file.name} ({size_mb:.1f} MB)")
+            if not APP_CONFIG['onefile']:
+                _, app_dir = build_output()
+                print(f"   📁 {app_dir.name}/ ({output_size(app_dir) / (1024*1024):.1f} MB, distribute the whole folder)")
         
         print(f"\n📁 Files are located in: {dist_dir.absolute()}")
         print("\n🚀 You can now distribute the executable file!")
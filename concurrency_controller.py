@@ -0,0 +1,154 @@
+"""
+YouTube Playlist Downloader Pro - Adaptive Concurrency
+Picks the number of parallel downloads from measured throughput.
+
+Download threads ``report()`` their current speed. The UI calls ``sample()``
+periodically with the queue's state. Once per measurement window, while
+every slot is busy, the controller compares the aggregate speed with what
+the previous limit achieved:
+
+* additive increase - one more download is tried while each extra one
+  still raises total throughput by at least ``GAIN_THRESHOLD``
+* back off - if the extra download did not help, the previous limit is
+  restored and held for a few windows before probing again
+* multiplicative decrease - if throughput falls sharply at a steady limit
+  (congestion, throttling), the limit is cut by ``DECREASE_FACTOR``
+"""
+
+import math
+import threading
+import time
+
+MIN_WORKERS = 1
+MAX_WORKERS = 8
+
+# Seconds of samples behind each decision
+MEASURE_SECONDS = 6.0
+
+# An extra download must add this much aggregate throughput to be kept
+GAIN_THRESHOLD = 0.10
+
+# A drop this large at an unchanged limit counts as congestion
+CONGESTION_DROP = 0.25
+DECREASE_FACTOR = 0.5
+
+# Windows to wait after backing off before trying a higher limit again
+HOLD_WINDOWS = 3
+
+# Speeds not refreshed for this long are treated as stalled (0 B/s)
+STALE_SECONDS = 5.0
+
+
+def _format_rate(bps):
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bps < 1024.0 or unit == "MB/s":
+            return f"{bps:.1f} {unit}" if unit == "MB/s" else f"{bps:.0f} {unit}"
+        bps /= 1024.0
+
+
+class AdaptiveConcurrency:
+    """AIMD controller for the download queue's worker limit."""
+
+    def __init__(self, initial, min_workers=MIN_WORKERS, max_workers=MAX_WORKERS, clock=time.monotonic):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.clock = clock
+        self.limit = max(min_workers, min(initial, max_workers))
+        self.decision = ("=", f"measuring at {self.limit}")
+
+        self._lock = threading.Lock()
+        self._speeds = {}
+        self._samples = []
+        self._window_start = None
+        self._baseline = None   # (limit, aggregate speed measured at that limit)
+        self._hold = 0
+
+    def report(self, job_id, speed_bps):
+        """Record a download's latest speed; called from download threads."""
+        if speed_bps is None:
+            return
+        with self._lock:
+            self._speeds[job_id] = (speed_bps, self.clock())
+
+    def job_finished(self, job_id):
+        with self._lock:
+            self._speeds.pop(job_id, None)
+
+    def aggregate(self):
+        """Return the summed speed of all downloads reported recently."""
+        now = self.clock()
+        with self._lock:
+            return sum(speed for speed, seen in self._speeds.values() if now - seen <= STALE_SECONDS)
+
+    def sample(self, active_count, pending_count):
+        """Take one measurement; return the new limit if it changed, else None."""
+        now = self.clock()
+
+        # Throughput only says something about the limit while exactly that many
+        # downloads run; after a cut, running downloads finish before measuring
+        if active_count != self.limit:
+            if pending_count == 0:
+                self.decision = ("=", f"holding at {self.limit}, queue empty")
+            self._samples = []
+            self._window_start = None
+            return None
+
+        if self._window_start is None:
+            self._window_start = now
+        self._samples.append(self.aggregate())
+        if now - self._window_start < MEASURE_SECONDS:
+            return None
+
+        measured = sum(self._samples) / len(self._samples)
+        self._samples = []
+        self._window_start = None
+        return self._decide(measured, pending_count)
+
+    def _decide(self, measured, pending_count):
+        previous = self.limit
+
+        if measured <= 0:
+            self.decision = ("=", f"waiting for speed reports at {self.limit}")
+        elif self._baseline is None:
+            self._baseline = (self.limit, measured)
+            self._probe_or_hold(measured, pending_count)
+        elif self._baseline[0] < self.limit:
+            # The last step added downloads; keep them only if they paid off
+            base_limit, base_speed = self._baseline
+            gain = (measured - base_speed) / base_speed if base_speed else 1.0
+            if gain >= GAIN_THRESHOLD:
+                self._baseline = (self.limit, measured)
+                self._probe(measured, pending_count, f"{gain:+.0%} from {base_limit}, ")
+            else:
+                self.limit = base_limit
+                self._hold = HOLD_WINDOWS
+                self.decision = ("↓", f"{previous} added {gain:+.0%}, back to {self.limit}")
+        else:
+            base_speed = self._baseline[1]
+            drop = (base_speed - measured) / base_speed if base_speed else 0.0
+            if drop >= CONGESTION_DROP:
+                self.limit = max(self.min_workers, math.floor(self.limit * DECREASE_FACTOR))
+                self._baseline = None
+                self._hold = HOLD_WINDOWS
+                self.decision = ("↓", f"throughput fell {drop:.0%}, cut to {self.limit}")
+            else:
+                self._baseline = (self.limit, measured)
+                self._probe_or_hold(measured, pending_count)
+
+        return self.limit if self.limit != previous else None
+
+    def _probe_or_hold(self, measured, pending_count):
+        if self._hold > 0:
+            self._hold -= 1
+            self.decision = ("=", f"holding at {self.limit}, {_format_rate(measured)}")
+        else:
+            self._probe(measured, pending_count, "")
+
+    def _probe(self, measured, pending_count, prefix):
+        if self.limit >= self.max_workers:
+            self.decision = ("=", f"{prefix}at maximum {self.limit}, {_format_rate(measured)}")
+        elif pending_count == 0:
+            self.decision = ("=", f"{prefix}{self.limit} enough, queue empty")
+        else:
+            self.limit += 1
+            self.decision = ("↑", f"{prefix}trying {self.limit}, {_format_rate(measured)}")
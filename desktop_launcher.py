@@ -2,34 +2,101 @@
 """
 YouTube Playlist Downloader Pro - Desktop Launcher
 Enhanced version with desktop-specific features and better error handling.
+
+Startup only locates dependencies (``importlib.util.find_spec``) instead of
+importing them; yt_dlp is first imported by the download engine when it is
+needed, after the main window is up. Run with ``--startup-profile`` to see
+how long each startup phase takes.
 """
 
+import time
+
+_LAUNCHER_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox
+import importlib
+import importlib.util
 import sys
 import os
 import subprocess
+from contextlib import contextmanager
 from pathlib import Path
 
 # Add the current directory to the path so we can import our modules
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+GUI_MODULE_NAME = "youtube_downloader-gui"
+PROFILE_FILE_NAME = "startup-profile.txt"
+
+# pip package name -> module it provides
+REQUIRED_MODULES = {
+    "yt-dlp": "yt_dlp",
+    "customtkinter": "customtkinter",
+}
+
 def check_dependencies():
-    """Check if all required dependencies are available."""
-    missing_deps = []
-    
-    try:
-        import yt_dlp
-    except ImportError:
-        missing_deps.append("yt-dlp")
-    
+    """Check if all required dependencies are available, without importing them."""
+    return [package for package, module in REQUIRED_MODULES.items()
+            if importlib.util.find_spec(module) is None]
+
+class StartupProfile:
+    """Wall-clock time of each startup phase, reported with --startup-profile."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.phases = [("launcher imports (tkinter)", time.perf_counter() - _LAUNCHER_START)]
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def report(self):
+        """Return the profile as text, slowest phases marked."""
+        total = time.perf_counter() - _LAUNCHER_START
+        lines = ["YouTube Playlist Downloader Pro - startup profile", ""]
+        for name, seconds in self.phases:
+            share = seconds / total if total else 0.0
+            lines.append(f"{seconds * 1000:9.1f} ms  {share:6.1%}  {name}")
+        lines.append(f"{total * 1000:9.1f} ms  total until the window was drawn")
+        lines.append("")
+        lines.append(f"yt_dlp imported during startup: {'yes' if 'yt_dlp' in sys.modules else 'no (deferred)'}")
+        return "\n".join(lines)
+
+    def save(self):
+        """Print the report and write it to the cache directory; returns the file path."""
+        text = self.report()
+        if sys.stdout is not None:
+            print(text)
+        try:
+            from app_paths import get_cache_dir
+            path = os.path.join(get_cache_dir(), PROFILE_FILE_NAME)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+            return path
+        except OSError:
+            return None
+
+def load_gui_module():
+    """Import the GUI module by name, falling back to its file next to the launcher."""
     try:
-        import customtkinter
-    except ImportError:
-        missing_deps.append("customtkinter")
-    
-    return missing_deps
+        return importlib.import_module(GUI_MODULE_NAME)
+    except ModuleNotFoundError as e:
+        # Only a missing GUI module falls through; a missing dependency inside it is an error
+        if e.name != GUI_MODULE_NAME:
+            raise
+    path = current_dir / f"{GUI_MODULE_NAME}.py"
+    if not path.exists():
+        raise ImportError("Could not import GUI module")
+    spec = importlib.util.spec_from_file_location("gui_module", path)
+    gui_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gui_module)
+    return gui_module
 
 def install_dependencies(missing_deps):
     """Install missing dependencies."""
@@ -70,6 +137,7 @@ def show_error_dialog(title, message):
 
 def main():
     """Main launcher function."""
+    profile = StartupProfile("--startup-profile" in sys.argv[1:])
     try:
         # Set application properties for Windows
         if sys.platform == "win32":
@@ -83,7 +151,8 @@ def main():
                 pass
         
         # Check dependencies
-        missing_deps = check_dependencies()
+        with profile.phase("dependency check (find_spec, no imports)"):
+            missing_deps = check_dependencies()
         
         if missing_deps:
             if show_dependency_error(missing_deps):
@@ -143,34 +212,10 @@ def main():
         
         # Import and run the main application
         try:
-            # Import the GUI module (handle different possible module names)
-            gui_module = None
-            possible_modules = [
-                'youtube_downloader-gui',
-                'youtube_downloader_gui', 
-                'youtube_downloader-gui.py'
-            ]
-            
-            for module_name in possible_modules:
-                try:
-                    if module_name.endswith('.py'):
-                        # Import from file
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location(
-                            "gui_module", 
-                            current_dir / module_name
-                        )
-                        gui_module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(gui_module)
-                        break
-                    else:
-                        gui_module = __import__(module_name)
-                        break
-                except (ImportError, FileNotFoundError):
-                    continue
-            
-            if gui_module is None:
-                raise ImportError("Could not import GUI module")
+            with profile.phase("import customtkinter"):
+                importlib.import_module("customtkinter")
+            with profile.phase("import GUI and app modules"):
+                gui_module = load_gui_module()
             
             # Get the main app class
             app_class = getattr(gui_module, 'YouTubeDownloaderApp', None)
@@ -178,7 +223,8 @@ def main():
                 raise ImportError("Could not find YouTubeDownloaderApp class")
             
             # Create and run the application
-            app = app_class()
+            with profile.phase("create main window and widgets"):
+                app = app_class()
             
             # Set window icon if available
             icon_path = current_dir / "icons" / "app_icon.ico"
@@ -192,6 +238,13 @@ def main():
             app.title("YouTube Playlist Downloader Pro")
             app.resizable(True, True)
             
+            # Draw the window before anything else gets to run
+            with profile.phase("first draw"):
+                app.update_idletasks()
+                app.update()
+            if profile.enabled:
+                profile.save()
+            
             # Start the application
             app.mainloop()
             
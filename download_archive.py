@@ -0,0 +1,140 @@
+"""
+YouTube Playlist Downloader Pro - Download Archive
+Remembers which videos are already in a download directory.
+
+Each directory gets an append-only ``.ytpd-archive.jsonl`` file with one
+record per completed download (video ID, output path, size, format and
+completion time). The file is read once into a dict keyed by video ID and
+format, so checking whether a video is done in the format asked for is a
+single lookup, and that check happens before any yt-dlp process or
+``YoutubeDL`` instance is created.
+"""
+
+import json
+import os
+import threading
+import time
+
+ARCHIVE_FILE_NAME = ".ytpd-archive.jsonl"
+
+# Rewrite the archive on load once it holds this many superseded records
+# per live entry (the same video downloaded again, in another format, ...)
+COMPACT_RATIO = 2
+
+
+def archive_key(video_info):
+    """Return the key a video is archived under: its ID, or its URL if unknown."""
+    return video_info.get('id') or video_info['url']
+
+
+def describe_format(options):
+    """Return a short label for the format a set of download options produces."""
+    if options.get('audio_only'):
+        return options.get('audio_format', "mp3")
+    return options.get('format') or "best"
+
+
+def format_key(video_info, options):
+    """Return the key of a video in one format: its archive key and the format label."""
+    return f"{archive_key(video_info)}:{describe_format(options)}"
+
+
+def _record_key(record):
+    return f"{record['id']}:{record.get('format') or 'best'}"
+
+
+class DownloadArchive:
+    """Index of completed downloads for one directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, ARCHIVE_FILE_NAME)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._needs_newline = False
+        self._load()
+
+    def _load(self):
+        record_count = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                        self._entries[_record_key(record)] = record
+                        record_count += 1
+                    except (ValueError, KeyError, TypeError):
+                        # A line cut short by a crash; the rest are still usable
+                        continue
+        except OSError:
+            return
+
+        if record_count > COMPACT_RATIO * max(len(self._entries), 1):
+            self._compact()
+
+    def _compact(self):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in self._entries.values():
+                    f.write(json.dumps(record) + "\n")
+            os.replace(temp_path, self.path)
+            self._needs_newline = False
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, video_info, options):
+        """Return the archive record for a video in the format ``options`` produce, or None."""
+        return self._entries.get(format_key(video_info, options))
+
+    def is_downloaded(self, video_info, options):
+        """Return True if the video was downloaded here in this format and its file still exists."""
+        record = self._entries.get(format_key(video_info, options))
+        if record is None:
+            return False
+        # Only videos found in the archive cost a stat() call
+        return not record.get('path') or os.path.exists(record['path'])
+
+    def split(self, videos, options):
+        """Return ``(pending, done)`` lists for a sequence of video info dicts."""
+        pending, done = [], []
+        for video_info in videos:
+            (done if self.is_downloaded(video_info, options) else pending).append(video_info)
+        return pending, done
+
+    def add(self, video_info, path, options):
+        """Record a completed download and append it to the archive file."""
+        size = None
+        if path:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                path = None
+
+        record = {
+            'id': archive_key(video_info),
+            'url': video_info.get('url'),
+            'title': video_info.get('title'),
+            'path': path,
+            'size': size,
+            'format': describe_format(options),
+            'completed_at': time.time(),
+        }
+
+        with self._lock:
+            self._entries[_record_key(record)] = record
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    # Don't glue the record onto a line a crash left unfinished
+                    if self._needs_newline:
+                        f.write("\n")
+                        self._needs_newline = False
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                # The in-memory index still prevents re-downloads this session
+                pass
+        return record
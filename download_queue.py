@@ -0,0 +1,160 @@
+"""
+YouTube Playlist Downloader Pro - Download Queue
+A bounded job queue that runs at most ``max_workers`` downloads at a time.
+
+Jobs wait in a FIFO or priority queue and are started on their own thread as
+soon as a slot frees up, so a large playlist never has more than
+``max_workers`` yt-dlp downloads running at once.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+ORDER_FIFO = "fifo"
+ORDER_PRIORITY = "priority"
+ORDERINGS = (ORDER_FIFO, ORDER_PRIORITY)
+
+DEFAULT_MAX_WORKERS = 3
+
+
+class DownloadQueue:
+    """Run submitted jobs with bounded concurrency.
+
+    ``target`` callables run on daemon threads. In priority order, jobs with a
+    higher ``priority`` start first; ties (and every job in FIFO order) start
+    in submission order. ``metrics()`` reports the queue's depth and how
+    long jobs waited for a slot.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, ordering=ORDER_FIFO,
+                 on_start=None, on_finish=None):
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Unknown queue ordering: {ordering}")
+
+        self.max_workers = max(1, int(max_workers))
+        self.ordering = ordering
+        self.on_start = on_start
+        self.on_finish = on_finish
+
+        self._lock = threading.Lock()
+        self._heap = []
+        self._pending = {}
+        self._active = set()
+        self._counter = itertools.count()
+
+        self._peak_pending = 0
+        self._started = 0
+        self._finished = 0
+        self._total_wait = 0.0
+
+    def submit(self, job_id, target, priority=0):
+        """Queue ``target`` under ``job_id``; returns False if it is already queued or running."""
+        with self._lock:
+            if job_id in self._pending or job_id in self._active:
+                return False
+
+            key = -priority if self.ordering == ORDER_PRIORITY else 0
+            entry = [key, next(self._counter), job_id, target, time.monotonic()]
+            self._pending[job_id] = entry
+            heapq.heappush(self._heap, entry)
+            self._peak_pending = max(self._peak_pending, len(self._pending))
+
+        self._fill_slots()
+        return True
+
+    def remove(self, job_id):
+        """Drop a job that has not started yet; returns True if it was pending."""
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                return False
+            # Lazy deletion: the heap entry is skipped when it reaches the top
+            entry[3] = None
+            return True
+
+    def cancel_pending(self):
+        """Drain every job that has not started yet and return their ids."""
+        with self._lock:
+            drained = [entry[2] for entry in sorted(self._heap) if entry[3] is not None]
+            self._heap.clear()
+            self._pending.clear()
+            return drained
+
+    def set_max_workers(self, max_workers):
+        """Change the concurrency limit; extra slots are filled immediately."""
+        with self._lock:
+            self.max_workers = max(1, int(max_workers))
+        self._fill_slots()
+
+    def set_ordering(self, ordering):
+        """Switch between FIFO and priority order for jobs submitted from now on."""
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Unknown queue ordering: {ordering}")
+        with self._lock:
+            self.ordering = ordering
+
+    def is_pending(self, job_id):
+        with self._lock:
+            return job_id in self._pending
+
+    def is_active(self, job_id):
+        with self._lock:
+            return job_id in self._active
+
+    @property
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    @property
+    def active_count(self):
+        with self._lock:
+            return len(self._active)
+
+    def metrics(self):
+        """Return a snapshot of the queue's depth and throughput."""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'active': len(self._active),
+                'max_workers': self.max_workers,
+                'peak_pending': self._peak_pending,
+                'started': self._started,
+                'finished': self._finished,
+                'mean_wait': self._total_wait / self._started if self._started else 0.0,
+            }
+
+    def _fill_slots(self):
+        """Start pending jobs until every slot is busy or the queue is empty."""
+        to_start = []
+        with self._lock:
+            now = time.monotonic()
+            while self._heap and len(self._active) + len(to_start) < self.max_workers:
+                _, _, job_id, target, submitted = heapq.heappop(self._heap)
+                if target is None:
+                    continue
+                del self._pending[job_id]
+                to_start.append((job_id, target))
+                self._total_wait += now - submitted
+            self._active.update(job_id for job_id, _ in to_start)
+            self._started += len(to_start)
+
+        for job_id, target in to_start:
+            worker = threading.Thread(target=self._run_job, args=(job_id, target))
+            worker.daemon = True
+            worker.start()
+
+    def _run_job(self, job_id, target):
+        try:
+            if self.on_start:
+                self.on_start(job_id)
+            target()
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+                self._finished += 1
+            if self.on_finish:
+                self.on_finish(job_id)
+            self._fill_slots()
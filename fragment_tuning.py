@@ -0,0 +1,132 @@
+"""
+YouTube Playlist Downloader Pro - Fragment Tuning
+Chooses per-download connection counts under a global connection cap.
+
+DASH/HLS formats are made of many small fragments that yt-dlp fetches one
+at a time by default (``concurrent_fragment_downloads``), while single-file
+("progressive") formats are fetched over one connection, optionally in
+ranges (``http_chunk_size``). ``FragmentTuner`` picks both for each
+download from the format's protocol and the per-connection speed seen in
+earlier downloads, and never hands out more connections in total than
+``max_connections``.
+"""
+
+import math
+import threading
+
+# Value of the 'concurrent_fragments' / 'http_chunk_size' options meaning "let the tuner decide"
+AUTO = "auto"
+
+DEFAULT_MAX_CONNECTIONS = 16
+MAX_FRAGMENTS = 8
+
+# Used before any speed has been observed
+DEFAULT_FRAGMENTS = 4
+DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024
+
+# Fragmented downloads get connections until this speed is expected
+TARGET_SPEED = 8 * 1024 * 1024
+
+# Progressive chunks are sized to take about this long at the observed speed
+CHUNK_SECONDS = 5.0
+MIN_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Weight of the newest download in the per-connection speed averages
+SPEED_SMOOTHING = 0.3
+
+FRAGMENTED = "fragmented"
+PROGRESSIVE = "progressive"
+
+_FRAGMENTED_PROTOCOLS = ("m3u8", "http_dash_segments", "dash", "ism", "f4m")
+
+
+def format_kind(protocol):
+    """Return FRAGMENTED or PROGRESSIVE for a yt-dlp format protocol."""
+    protocol = protocol or ""
+    return FRAGMENTED if protocol.startswith(_FRAGMENTED_PROTOCOLS) else PROGRESSIVE
+
+
+def format_protocols(info):
+    """Return the protocols of the format(s) selected in a yt-dlp info dict."""
+    formats = info.get('requested_formats') or [info]
+    return [f.get('protocol') for f in formats]
+
+
+class FragmentTuner:
+    """Plans fragment parallelism and chunk size, and enforces the connection cap."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._reserved = {}
+        self._per_connection_speed = {FRAGMENTED: None, PROGRESSIVE: None}
+        self._observed = {}
+
+    def set_max_connections(self, max_connections):
+        with self._lock:
+            self.max_connections = max(1, int(max_connections))
+
+    @property
+    def connections_in_use(self):
+        with self._lock:
+            return sum(connections for connections, _ in self._reserved.values())
+
+    def plan(self, job_id, protocols=None, fragments=AUTO, chunk_size=AUTO):
+        """Reserve connections for a download and return its settings.
+
+        ``protocols`` lists the selected formats' protocols, or is None when
+        they are not known yet (a subprocess download), in which case both
+        settings are planned. Returns ``{'fragments': n, 'http_chunk_size':
+        bytes or None}``; every download gets at least one connection.
+        """
+        kinds = {format_kind(protocol) for protocol in protocols} if protocols else {FRAGMENTED, PROGRESSIVE}
+        # Speeds are only learned from downloads whose kind is known
+        kind = kinds.pop() if len(kinds) == 1 else (FRAGMENTED if protocols else None)
+
+        with self._lock:
+            if kind != PROGRESSIVE:
+                wanted = self._auto_fragments() if fragments == AUTO else max(1, int(fragments))
+            else:
+                wanted = 1
+            available = self.max_connections - sum(c for c, _ in self._reserved.values())
+            granted = max(1, min(wanted, available))
+
+            chunk = None
+            if kind != FRAGMENTED:
+                chunk = self._auto_chunk_size() if chunk_size == AUTO else chunk_size
+
+            self._reserved[job_id] = (granted, kind)
+        return {'fragments': granted, 'http_chunk_size': chunk}
+
+    def observe(self, job_id, speed_bps):
+        """Record a download's current speed; called from its progress hook."""
+        if speed_bps:
+            self._observed[job_id] = speed_bps
+
+    def release(self, job_id):
+        """Free a download's connections and learn from the speed it reached."""
+        with self._lock:
+            reservation = self._reserved.pop(job_id, None)
+            speed = self._observed.pop(job_id, None)
+            if reservation is None or reservation[1] is None or not speed:
+                return
+            connections, kind = reservation
+            per_connection = speed / connections
+            previous = self._per_connection_speed[kind]
+            self._per_connection_speed[kind] = (
+                per_connection if previous is None
+                else previous + SPEED_SMOOTHING * (per_connection - previous)
+            )
+
+    def _auto_fragments(self):
+        per_connection = self._per_connection_speed[FRAGMENTED]
+        if per_connection is None:
+            return DEFAULT_FRAGMENTS
+        return max(1, min(MAX_FRAGMENTS, math.ceil(TARGET_SPEED / per_connection)))
+
+    def _auto_chunk_size(self):
+        speed = self._per_connection_speed[PROGRESSIVE]
+        if speed is None:
+            return DEFAULT_CHUNK_SIZE
+        return int(max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, speed * CHUNK_SECONDS)))
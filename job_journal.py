@@ -0,0 +1,93 @@
+"""
+YouTube Playlist Downloader Pro - Job Journal
+Append-only record of download jobs so a batch survives a restart.
+
+Every state change (queued, running, completed, failed, cancelled) is
+appended as one JSON line to ``jobs.jsonl`` in the data directory and
+flushed immediately. On the next launch the journal is replayed; jobs whose
+last state is queued or running were cut off and can be resumed with the
+options they were started with. yt-dlp continues interrupted downloads
+from their ``.part`` files, so resumed jobs pick up where they stopped.
+"""
+
+import json
+import os
+import threading
+import time
+
+from app_paths import get_data_dir
+
+JOURNAL_FILE_NAME = "jobs.jsonl"
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_COMPLETED = "completed"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+UNFINISHED_STATES = (STATE_QUEUED, STATE_RUNNING)
+
+
+class JobJournal:
+    """Thread-safe writer and replayer for the job journal."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), JOURNAL_FILE_NAME)
+        self._lock = threading.Lock()
+
+    def record(self, job_id, state, **fields):
+        """Append a state change for ``job_id``; extra fields are merged on replay."""
+        entry = {'job': job_id, 'state': state, 'time': time.time()}
+        entry.update(fields)
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError:
+                # Losing the journal only costs the ability to resume
+                pass
+
+    def replay(self):
+        """Return ``{job_id: job}`` with each job's fields merged in journal order."""
+        jobs = {}
+        with self._lock:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except OSError:
+                return jobs
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                job_id = entry['job']
+            except (ValueError, KeyError, TypeError):
+                # A record cut short by the crash we are recovering from
+                continue
+            job = jobs.setdefault(job_id, {})
+            job.update(entry)
+        return jobs
+
+    def unfinished(self):
+        """Return the jobs that were queued or running when the journal stopped.
+
+        Jobs are returned in the order they were first queued; a job that
+        was running has ``was_running`` set, since it probably left a
+        ``.part`` file behind.
+        """
+        unfinished = []
+        for job in self.replay().values():
+            if job['state'] in UNFINISHED_STATES:
+                job['was_running'] = job['state'] == STATE_RUNNING
+                unfinished.append(job)
+        return unfinished
+
+    def reset(self):
+        """Start a new journal, forgetting every job recorded so far."""
+        with self._lock:
+            try:
+                with open(self.path, 'w', encoding='utf-8'):
+                    pass
+            except OSError:
+                pass
@@ -0,0 +1,331 @@
+"""
+YouTube Playlist Downloader Pro - Job Metrics
+Per-job timing, bytes and speed, aggregated and exported for monitoring.
+
+Each job gets a ``JobTiming`` when it is queued. It is told when the job
+starts and fed the job's download events, and from those it splits the
+job's wall time into phases:
+
+    queue_wait    queued until a download slot picked it up
+    extraction    slot acquired until the first progress event (metadata,
+                  format selection, connecting)
+    transfer      first to last progress event
+    postprocess   after the transfer: merging, audio extraction, and the
+                  post-processing stage if the job was handed to one
+    total         queued until finished
+
+``JobMetrics`` aggregates finished jobs into Prometheus-style histograms and
+keeps the most recent ones for percentiles. ``export()`` writes
+``metrics.prom`` (Prometheus text format, for node_exporter's textfile
+collector or anything that scrapes files) and ``metrics.json``.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from app_paths import get_data_dir
+
+PHASES = ('queue_wait', 'extraction', 'transfer', 'postprocess', 'total')
+
+OUTCOME_COMPLETED = "completed"
+OUTCOME_FAILED = "failed"
+OUTCOME_CANCELLED = "cancelled"
+OUTCOME_LINKED = "linked"
+OUTCOMES = (OUTCOME_COMPLETED, OUTCOME_FAILED, OUTCOME_CANCELLED, OUTCOME_LINKED)
+
+# Histogram bucket upper bounds in seconds
+PHASE_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Finished jobs kept for percentiles and the live view
+RECENT_JOBS = 1000
+
+METRICS_DIR_NAME = "metrics"
+PROMETHEUS_FILE_NAME = "metrics.prom"
+JSON_FILE_NAME = "metrics.json"
+
+# Environment override for the export directory
+METRICS_ENV_VAR = "YTPD_METRICS_DIR"
+
+# Minimum seconds between exports triggered by finishing jobs
+EXPORT_INTERVAL = 5.0
+
+
+def default_metrics_dir():
+    return os.environ.get(METRICS_ENV_VAR) or os.path.join(get_data_dir(), METRICS_DIR_NAME)
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at ``fraction`` (0..1) of an ascending list, or None if empty."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))]
+
+
+class JobTiming:
+    """Timeline of one job. ``observe()`` takes the job's download events."""
+
+    def __init__(self, job_id, title=None):
+        self.job_id = job_id
+        self.title = title
+        self.submitted = time.monotonic()
+        self.started = None
+        self.first_progress = None
+        self.last_progress = None
+        self.transfer_end = None
+        self.postprocess_started = None
+        self.postprocess_seconds = 0.0
+        self.peak_speed = 0.0
+        # Bytes of earlier files of the same job (video and audio are separate downloads)
+        self._earlier_bytes = 0
+        self._file_bytes = 0
+
+    def mark_started(self):
+        self.started = time.monotonic()
+
+    def observe(self, event):
+        """Record one download event (see ``ytdlp_engine``)."""
+        now = time.monotonic()
+        if event['type'] == 'progress':
+            if self.first_progress is None:
+                self.first_progress = now
+            self.last_progress = now
+            downloaded = event.get('downloaded_bytes') or 0
+            if downloaded < self._file_bytes:
+                # A new file started
+                self._earlier_bytes += self._file_bytes
+            self._file_bytes = downloaded
+            speed = event.get('speed_bps') or 0.0
+            if speed > self.peak_speed:
+                self.peak_speed = speed
+        elif event['type'] in ('extract_audio', 'processing') and self.transfer_end is None:
+            self.transfer_end = now
+
+    def mark_download_finished(self):
+        """The download handle returned; anything after the transfer was post-processing."""
+        now = time.monotonic()
+        if self.transfer_end is None:
+            self.transfer_end = self.last_progress or now
+        self.postprocess_seconds += now - self.transfer_end
+
+    def mark_postprocess_started(self):
+        self.postprocess_started = time.monotonic()
+
+    def mark_postprocess_finished(self):
+        if self.postprocess_started is not None:
+            self.postprocess_seconds += time.monotonic() - self.postprocess_started
+            self.postprocess_started = None
+
+    @property
+    def bytes(self):
+        return self._earlier_bytes + self._file_bytes
+
+    def record(self, outcome, finished=None, size=None):
+        """Return the finished job as a dict of phase durations, bytes and speeds."""
+        finished = finished or time.monotonic()
+        started = self.started or finished
+        first_progress = self.first_progress or self.transfer_end or finished
+        transfer_end = self.transfer_end or self.last_progress or first_progress
+        transfer = max(0.0, transfer_end - first_progress) if self.first_progress else 0.0
+        size = size if size is not None else self.bytes
+        return {
+            'job': str(self.job_id),
+            'title': self.title,
+            'outcome': outcome,
+            'queue_wait': started - self.submitted,
+            'extraction': max(0.0, min(first_progress, finished) - started),
+            'transfer': transfer,
+            'postprocess': self.postprocess_seconds,
+            'total': finished - self.submitted,
+            'bytes': size,
+            'average_speed': self.bytes / transfer if transfer > 0 else None,
+            'peak_speed': self.peak_speed or None,
+            'finished_at': time.time(),
+        }
+
+
+class JobMetrics:
+    """Thread-safe registry of job timings and their aggregates."""
+
+    def __init__(self, directory=None, recent=RECENT_JOBS):
+        self.directory = directory or default_metrics_dir()
+        self._lock = threading.Lock()
+        self._active = {}
+        self._recent = deque(maxlen=recent)
+        self._outcomes = dict.fromkeys(OUTCOMES, 0)
+        self._phase_sums = dict.fromkeys(PHASES, 0.0)
+        self._phase_buckets = {phase: [0] * (len(PHASE_BUCKETS) + 1) for phase in PHASES}
+        self._jobs = 0
+        self._bytes = 0
+        self._peak_speed = 0.0
+        self._last_export = 0.0
+
+    def start_job(self, job_id, title=None):
+        """Register a job as queued and return its timing (replacing an earlier one)."""
+        timing = JobTiming(job_id, title)
+        with self._lock:
+            self._active[job_id] = timing
+        return timing
+
+    def job(self, job_id):
+        """Return the timing of an unfinished job, or None."""
+        with self._lock:
+            return self._active.get(job_id)
+
+    def finish(self, job_id, outcome, size=None):
+        """Close a job's timeline and add it to the aggregates; returns its record or None."""
+        with self._lock:
+            timing = self._active.pop(job_id, None)
+        if timing is None:
+            return None
+        record = timing.record(outcome, size=size)
+
+        with self._lock:
+            self._jobs += 1
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            if outcome != OUTCOME_LINKED:
+                self._bytes += record['bytes'] or 0
+            if record['peak_speed'] and record['peak_speed'] > self._peak_speed:
+                self._peak_speed = record['peak_speed']
+            for phase in PHASES:
+                seconds = record[phase]
+                self._phase_sums[phase] += seconds
+                buckets = self._phase_buckets[phase]
+                for i, bound in enumerate(PHASE_BUCKETS):
+                    if seconds <= bound:
+                        buckets[i] += 1
+                        break
+                else:
+                    buckets[-1] += 1
+            self._recent.append(record)
+        return record
+
+    def snapshot(self):
+        """Return the aggregates and recent jobs as a JSON-serializable dict."""
+        with self._lock:
+            recent = list(self._recent)
+            snapshot = {
+                'generated_at': time.time(),
+                'jobs': self._jobs,
+                'active': len(self._active),
+                'outcomes': dict(self._outcomes),
+                'bytes': self._bytes,
+                'peak_speed': self._peak_speed or None,
+                'phase_sums': dict(self._phase_sums),
+            }
+
+        phases = {}
+        for phase in PHASES:
+            values = sorted(record[phase] for record in recent)
+            phases[phase] = {
+                'mean': snapshot['phase_sums'][phase] / snapshot['jobs'] if snapshot['jobs'] else None,
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'max': values[-1] if values else None,
+            }
+        speeds = [record['average_speed'] for record in recent if record['average_speed']]
+        snapshot['phases'] = phases
+        snapshot['average_speed'] = sum(speeds) / len(speeds) if speeds else None
+        snapshot['recent'] = recent
+        return snapshot
+
+    def prometheus_text(self):
+        """Return the aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            outcomes = dict(self._outcomes)
+            sums = dict(self._phase_sums)
+            buckets = {phase: list(counts) for phase, counts in self._phase_buckets.items()}
+            jobs, active, total_bytes, peak = self._jobs, len(self._active), self._bytes, self._peak_speed
+
+        lines = [
+            "# HELP ytpd_jobs_total Finished download jobs by outcome.",
+            "# TYPE ytpd_jobs_total counter",
+        ]
+        lines += [f'ytpd_jobs_total{{outcome="{outcome}"}} {count}' for outcome, count in outcomes.items()]
+        lines += [
+            "# HELP ytpd_jobs_active Jobs queued or running.",
+            "# TYPE ytpd_jobs_active gauge",
+            f"ytpd_jobs_active {active}",
+            "# HELP ytpd_job_phase_seconds Time finished jobs spent in each phase.",
+            "# TYPE ytpd_job_phase_seconds histogram",
+        ]
+        for phase in PHASES:
+            cumulative = 0
+            for bound, count in zip(PHASE_BUCKETS + ("+Inf",), buckets[phase]):
+                cumulative += count
+                lines.append(f'ytpd_job_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'ytpd_job_phase_seconds_sum{{phase="{phase}"}} {sums[phase]:.6f}')
+            lines.append(f'ytpd_job_phase_seconds_count{{phase="{phase}"}} {jobs}')
+        lines += [
+            "# HELP ytpd_downloaded_bytes_total Bytes transferred by finished jobs.",
+            "# TYPE ytpd_downloaded_bytes_total counter",
+            f"ytpd_downloaded_bytes_total {total_bytes}",
+            "# HELP ytpd_peak_speed_bytes_per_second Highest speed any job reached.",
+            "# TYPE ytpd_peak_speed_bytes_per_second gauge",
+            f"ytpd_peak_speed_bytes_per_second {peak:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write metrics.prom and metrics.json; returns the directory, or None on error."""
+        files = {
+            PROMETHEUS_FILE_NAME: self.prometheus_text(),
+            JSON_FILE_NAME: json.dumps(self.snapshot(), indent=2),
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, content in files.items():
+                path = os.path.join(self.directory, name)
+                # Scrapers must never see a half-written file
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+        except OSError:
+            return None
+        with self._lock:
+            self._last_export = time.monotonic()
+        return self.directory
+
+    def maybe_export(self):
+        """Export unless the last export was less than EXPORT_INTERVAL ago."""
+        with self._lock:
+            due = time.monotonic() - self._last_export >= EXPORT_INTERVAL
+        if due:
+            self.export()
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+
+
+def summary_lines(snapshot):
+    """Return a plain-text summary of a ``JobMetrics.snapshot()``, one string per line."""
+    from media_store import format_bytes
+
+    outcomes = snapshot['outcomes']
+    lines = [
+        f"Jobs: {snapshot['jobs']} finished ({outcomes[OUTCOME_COMPLETED]} completed, "
+        f"{outcomes[OUTCOME_FAILED]} failed, {outcomes[OUTCOME_CANCELLED]} cancelled, "
+        f"{outcomes[OUTCOME_LINKED]} linked), {snapshot['active']} active",
+    ]
+    speed_text = ""
+    if snapshot['average_speed']:
+        speed_text += f", average {format_bytes(snapshot['average_speed'])}/s"
+    if snapshot['peak_speed']:
+        speed_text += f", peak {format_bytes(snapshot['peak_speed'])}/s"
+    lines.append(f"Transferred: {format_bytes(snapshot['bytes'])}{speed_text}")
+    lines.append("")
+    lines.append(f"{'Phase':<12} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+    for phase in PHASES:
+        stats = snapshot['phases'][phase]
+        lines.append(f"{phase:<12} " + " ".join(f"{_format_seconds(stats[key]):>8}"
+                                               for key in ('mean', 'p50', 'p95', 'max')))
+    return lines
@@ -0,0 +1,191 @@
+"""
+YouTube Playlist Downloader Pro - Job State
+One place that knows which state every download job is in.
+
+Download threads report transitions (queued, started, progress,
+post-processing, completed, failed, cancelled); the state and the counters
+derived from it change under one lock, so a snapshot never sees a job
+counted twice or not at all. The change events are queued and delivered to
+listeners in batches on the UI thread: ``schedule`` is called when the first
+event arrives after a dispatch, the UI thread calls ``dispatch()``, and
+nothing runs at all while no job changes.
+"""
+
+import threading
+
+from job_journal import STATE_CANCELLED, STATE_COMPLETED, STATE_FAILED, STATE_QUEUED, STATE_RUNNING
+
+STATE_POSTPROCESSING = "postprocessing"
+
+STATES = (STATE_QUEUED, STATE_RUNNING, STATE_POSTPROCESSING, STATE_COMPLETED, STATE_FAILED, STATE_CANCELLED)
+ACTIVE_STATES = (STATE_QUEUED, STATE_RUNNING, STATE_POSTPROCESSING)
+FINISHED_STATES = (STATE_COMPLETED, STATE_FAILED, STATE_CANCELLED)
+
+EVENT_QUEUED = "queued"
+EVENT_STARTED = "started"
+EVENT_PROGRESS = "progress"
+EVENT_POSTPROCESSING = "postprocessing"
+EVENT_COMPLETED = "completed"
+EVENT_FAILED = "failed"
+EVENT_CANCELLED = "cancelled"
+
+_TRANSITIONS = {
+    EVENT_QUEUED: STATE_QUEUED,
+    EVENT_STARTED: STATE_RUNNING,
+    EVENT_POSTPROCESSING: STATE_POSTPROCESSING,
+    EVENT_COMPLETED: STATE_COMPLETED,
+    EVENT_FAILED: STATE_FAILED,
+    EVENT_CANCELLED: STATE_CANCELLED,
+}
+
+
+class JobStateModel:
+    """Thread-safe job states, counters and a queue of change events.
+
+    Listeners are called as ``listener(events, counts)`` with the events
+    since the last dispatch, oldest first, as ``(event, job_id, detail)``
+    tuples, and the counters at dispatch time. Progress events are merged
+    per job so a batch holds at most the newest one.
+    """
+
+    def __init__(self, schedule=None):
+        self.schedule = schedule
+        self.ignored = 0
+
+        self._lock = threading.Lock()
+        self._states = {}
+        self._progress = {}
+        self._counts = dict.fromkeys(STATES, 0)
+        self._listeners = []
+        self._events = []
+        self._progress_events = {}
+        self._scheduled = False
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def queued(self, job_id):
+        """A job was submitted; returns False if it is already queued or running."""
+        return self._transition(EVENT_QUEUED, job_id)
+
+    def started(self, job_id):
+        return self._transition(EVENT_STARTED, job_id)
+
+    def postprocessing(self, job_id):
+        return self._transition(EVENT_POSTPROCESSING, job_id)
+
+    def completed(self, job_id, detail=None):
+        return self._transition(EVENT_COMPLETED, job_id, detail)
+
+    def failed(self, job_id, detail=None):
+        return self._transition(EVENT_FAILED, job_id, detail)
+
+    def cancelled(self, job_id):
+        return self._transition(EVENT_CANCELLED, job_id)
+
+    def abandoned(self, job_id, state, detail=None):
+        """Fail a job that is still in ``state`` although its thread has exited."""
+        return self._transition(EVENT_FAILED, job_id, detail, expected=state)
+
+    def progress(self, job_id, fraction):
+        """Record how far a running job is (0.0 - 1.0)."""
+        with self._lock:
+            if self._states.get(job_id) != STATE_RUNNING:
+                return
+            self._progress[job_id] = fraction
+            self._progress_events[job_id] = (EVENT_PROGRESS, job_id, fraction)
+            needs_schedule = self._mark_pending()
+        if needs_schedule and self.schedule:
+            self.schedule()
+
+    def _transition(self, event, job_id, detail=None, expected=None):
+        state = _TRANSITIONS[event]
+        with self._lock:
+            previous = self._states.get(job_id)
+            if expected is not None and previous != expected:
+                self.ignored += 1
+                return False
+            # Only a finished (or unknown) job can be queued again, and a
+            # finished job stays finished: a download that was cancelled and
+            # then reports its failure is counted once, as cancelled
+            if event == EVENT_QUEUED:
+                allowed = previous is None or previous in FINISHED_STATES
+            else:
+                allowed = previous in ACTIVE_STATES
+            if not allowed:
+                self.ignored += 1
+                return False
+
+            if previous is not None:
+                self._counts[previous] -= 1
+            self._counts[state] += 1
+            self._states[job_id] = state
+            if state == STATE_RUNNING:
+                self._progress[job_id] = 0.0
+            elif state in FINISHED_STATES:
+                self._progress.pop(job_id, None)
+                # A finished job's last progress must not arrive after its outcome
+                self._progress_events.pop(job_id, None)
+            self._events.append((event, job_id, detail))
+            needs_schedule = self._mark_pending()
+        if needs_schedule and self.schedule:
+            self.schedule()
+        return True
+
+    def _mark_pending(self):
+        needs_schedule = not self._scheduled
+        self._scheduled = True
+        return needs_schedule
+
+    def dispatch(self):
+        """Deliver the pending events to every listener; call on the UI thread."""
+        with self._lock:
+            events = self._events + list(self._progress_events.values())
+            self._events = []
+            self._progress_events = {}
+            self._scheduled = False
+            counts = dict(self._counts)
+        if events:
+            for listener in self._listeners:
+                listener(events, counts)
+
+    def state(self, job_id):
+        with self._lock:
+            return self._states.get(job_id)
+
+    def is_active(self, job_id):
+        with self._lock:
+            return self._states.get(job_id) in ACTIVE_STATES
+
+    def active_jobs(self):
+        """Return the ids of the jobs that are queued, running or being converted."""
+        with self._lock:
+            return [job_id for job_id, state in self._states.items() if state in ACTIVE_STATES]
+
+    def counts(self):
+        """Return ``{state: number of jobs}`` as one consistent snapshot."""
+        with self._lock:
+            return dict(self._counts)
+
+    @property
+    def active_count(self):
+        with self._lock:
+            return sum(self._counts[state] for state in ACTIVE_STATES)
+
+    def overall_progress(self):
+        """Return the mean progress of the jobs since the last reset, or None without any."""
+        with self._lock:
+            total = sum(self._counts.values())
+            if not total:
+                return None
+            done = sum(self._counts[state] for state in FINISHED_STATES)
+            return (done + sum(self._progress.values())) / total
+
+    def reset_finished(self):
+        """Forget finished jobs and zero their counters; active jobs are kept."""
+        with self._lock:
+            for job_id, state in list(self._states.items()):
+                if state in FINISHED_STATES:
+                    del self._states[job_id]
+            for state in FINISHED_STATES:
+                self._counts[state] = 0
@@ -0,0 +1,219 @@
+"""
+YouTube Playlist Downloader Pro - Media Store
+Content-addressed copies of downloaded videos, shared between directories.
+
+Every finished download is linked into the store under its video ID and
+format. When a later playlist (in any download directory) wants the same
+video in the same format, the stored file is reflinked or hardlinked into
+place instead of being downloaded again, so it costs neither bandwidth nor
+disk space. Objects and links are recorded in ``index.jsonl`` in the store,
+which is also where the bytes-saved report comes from.
+
+The store never copies: files are only shared when the store and the
+download directory are on the same filesystem.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from app_paths import get_data_dir
+from download_archive import format_key
+
+STORE_DIR_NAME = "media-store"
+INDEX_FILE_NAME = "index.jsonl"
+
+# Environment override for the store location
+STORE_ENV_VAR = "YTPD_MEDIA_STORE"
+
+LINK_REFLINK = "reflink"
+LINK_HARDLINK = "hardlink"
+
+# ioctl that clones a file's extents on Btrfs, XFS and other CoW filesystems
+_FICLONE = 0x40049409
+
+
+def store_key(video_info, options):
+    """Return the key a video is stored under: its ID and the format downloaded."""
+    return format_key(video_info, options)
+
+
+def format_bytes(size):
+    """Format a byte count for reports ("1.5 GB")."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024.0 or unit == "TB":
+            break
+        size /= 1024.0
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def default_store_dir():
+    return os.environ.get(STORE_ENV_VAR) or os.path.join(get_data_dir(), STORE_DIR_NAME)
+
+
+def _reflink(source, destination):
+    """Clone ``source`` to ``destination`` sharing its data blocks, or raise OSError."""
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are only supported on Linux")
+    import fcntl
+
+    with open(source, 'rb') as src, open(destination, 'xb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(destination)
+            raise
+
+
+def link_file(source, destination):
+    """Share ``source`` at ``destination`` and return how (LINK_*).
+
+    A reflink is tried first, since the two files can then be changed
+    independently; otherwise the file is hardlinked. Raises OSError if
+    neither works (different filesystems, no link support).
+    """
+    try:
+        _reflink(source, destination)
+        return LINK_REFLINK
+    except OSError:
+        pass
+    os.link(source, destination)
+    return LINK_HARDLINK
+
+
+class MediaStore:
+    """Thread-safe store of downloaded media keyed by video ID and format."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_store_dir()
+        self.index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._objects = {}
+        self._links = 0
+        self._bytes_saved = 0
+        self._needs_newline = False
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                        if record['type'] == 'object':
+                            self._objects[record['key']] = record
+                        elif record['type'] == 'link':
+                            self._links += 1
+                            self._bytes_saved += record['size'] or 0
+                    except (ValueError, KeyError, TypeError):
+                        # A line cut short by a crash
+                        continue
+        except OSError:
+            pass
+
+    def _append(self, record):
+        # Callers hold self._lock
+        try:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+
+    def _object_path(self, key, filename):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest, filename)
+
+    def lookup(self, video_info, options):
+        """Return the stored file for a video in this format, or None."""
+        with self._lock:
+            record = self._objects.get(store_key(video_info, options))
+        if record is None or not os.path.exists(record['path']):
+            return None
+        return record['path']
+
+    def add(self, video_info, options, path):
+        """Link a finished download into the store; returns the stored path or None."""
+        if not path or not os.path.isfile(path):
+            return None
+        key = store_key(video_info, options)
+        stored = self._object_path(key, os.path.basename(path))
+
+        with self._lock:
+            existing = self._objects.get(key)
+            if existing is not None and os.path.exists(existing['path']):
+                return existing['path']
+            try:
+                os.makedirs(os.path.dirname(stored), exist_ok=True)
+                if os.path.exists(stored):
+                    os.remove(stored)
+                method = link_file(path, stored)
+            except OSError:
+                return None
+            record = {
+                'type': 'object',
+                'key': key,
+                'path': stored,
+                'size': os.path.getsize(stored),
+                'method': method,
+                'added_at': time.time(),
+            }
+            self._objects[key] = record
+            self._append(record)
+        return stored
+
+    def link_into(self, video_info, options, directory):
+        """Place the stored copy of a video in ``directory``; returns its path or None.
+
+        The file keeps the name it was first downloaded under. None means the
+        video has to be downloaded (not stored, or not linkable here).
+        """
+        stored = self.lookup(video_info, options)
+        if stored is None:
+            return None
+        destination = os.path.join(directory, os.path.basename(stored))
+
+        if os.path.exists(destination):
+            # Already there (an earlier link, or a download the archive doesn't know)
+            return destination if os.path.getsize(destination) == os.path.getsize(stored) else None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            method = link_file(stored, destination)
+        except OSError:
+            return None
+
+        record = {
+            'type': 'link',
+            'key': store_key(video_info, options),
+            'path': destination,
+            'size': os.path.getsize(destination),
+            'method': method,
+            'linked_at': time.time(),
+        }
+        with self._lock:
+            self._links += 1
+            self._bytes_saved += record['size']
+            self._append(record)
+        return destination
+
+    def report(self):
+        """Return the store's size and how much linking has saved so far."""
+        with self._lock:
+            objects = list(self._objects.values())
+            links, bytes_saved = self._links, self._bytes_saved
+        return {
+            'directory': self.directory,
+            'objects': len(objects),
+            'stored_bytes': sum(record['size'] or 0 for record in objects),
+            'links': links,
+            'bytes_saved': bytes_saved,
+        }
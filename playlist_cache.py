@@ -0,0 +1,151 @@
+"""
+YouTube Playlist Downloader Pro - Playlist Metadata Cache
+SQLite-backed cache of ``--flat-playlist`` entries keyed by playlist.
+
+A cached playlist younger than its TTL is served without running yt-dlp.
+Older entries are still returned immediately so the UI can show them, and
+``store()`` writes back only the positions that changed when a refresh
+completes.
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from app_paths import get_cache_dir
+
+CACHE_FILE_NAME = "playlists.sqlite3"
+
+# Cached playlists are considered fresh for six hours unless overridden
+DEFAULT_TTL = 6 * 60 * 60
+TTL_ENV_VAR = "YTPD_PLAYLIST_CACHE_TTL"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    entry_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    playlist_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    video_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (playlist_key, position)
+);
+"""
+
+
+def get_default_ttl():
+    """Return the TTL in seconds, honouring the YTPD_PLAYLIST_CACHE_TTL override."""
+    try:
+        return float(os.environ.get(TTL_ENV_VAR, DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def playlist_key(url):
+    """Return a stable cache key for a playlist or video URL."""
+    url = url.strip()
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if query.get('list'):
+        return f"playlist:{query['list'][0]}"
+    if query.get('v'):
+        return f"video:{query['v'][0]}"
+    return f"url:{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+
+class PlaylistCache:
+    """Persistent cache of playlist entries with a time-to-live."""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self.ttl = get_default_ttl() if ttl is None else ttl
+        self._lock = threading.Lock()
+
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps the cache usable
+        # from the UI thread and fetch threads alike
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, url):
+        """Return ``(entries, age_seconds)`` for a cached playlist, or None."""
+        key = playlist_key(url)
+        with self._lock, self._connect() as connection:
+            playlist = connection.execute(
+                "SELECT fetched_at FROM playlists WHERE playlist_key = ?", (key,)
+            ).fetchone()
+            if playlist is None:
+                return None
+            rows = connection.execute(
+                "SELECT data FROM entries WHERE playlist_key = ? ORDER BY position", (key,)
+            ).fetchall()
+
+        entries = [json.loads(data) for (data,) in rows]
+        return entries, max(0.0, time.time() - playlist[0])
+
+    def is_fresh(self, age):
+        return age <= self.ttl
+
+    def store(self, url, entries):
+        """Save a freshly enumerated playlist, writing only what changed.
+
+        Returns a dict with the ``added``, ``removed`` and ``changed`` video
+        counts compared to the previous cached copy.
+        """
+        key = playlist_key(url)
+        new_rows = [(position, entry.get('id'), json.dumps(entry, sort_keys=True))
+                    for position, entry in enumerate(entries)]
+
+        with self._lock, self._connect() as connection:
+            old_rows = {
+                position: (video_id, data)
+                for position, video_id, data in connection.execute(
+                    "SELECT position, video_id, data FROM entries WHERE playlist_key = ?", (key,)
+                )
+            }
+
+            changed_rows = [(key, position, video_id, data)
+                            for position, video_id, data in new_rows
+                            if old_rows.get(position) != (video_id, data)]
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (playlist_key, position, video_id, data) VALUES (?, ?, ?, ?)",
+                changed_rows
+            )
+            connection.execute(
+                "DELETE FROM entries WHERE playlist_key = ? AND position >= ?", (key, len(new_rows))
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_key, url, fetched_at, entry_count) VALUES (?, ?, ?, ?)",
+                (key, url, time.time(), len(new_rows))
+            )
+
+        old_ids = {video_id for video_id, _ in old_rows.values()}
+        new_ids = {video_id for _, video_id, _ in new_rows}
+        return {
+            'added': len(new_ids - old_ids),
+            'removed': len(old_ids - new_ids),
+            'changed': len(changed_rows),
+        }
+
+    def invalidate(self, url):
+        """Forget a cached playlist."""
+        key = playlist_key(url)
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM entries WHERE playlist_key = ?", (key,))
+            connection.execute("DELETE FROM playlists WHERE playlist_key = ?", (key,))
@@ -0,0 +1,69 @@
+"""
+YouTube Playlist Downloader Pro - Multi-Playlist Fetcher
+Enumerates several playlists at once and merges their entries.
+
+Each playlist listing is one yt-dlp process that spends most of its time
+waiting on the network, so a small thread pool lists several of them
+concurrently. Results are still handed back in the order the URLs were
+given, and videos that appear in more than one playlist are kept once.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent playlist listings; each one is a yt-dlp process
+DEFAULT_FETCH_WORKERS = 4
+
+
+def entry_key(entry):
+    """Return the key used to recognise the same video across playlists."""
+    return entry.get('id') or entry['url']
+
+
+def fetch_playlists(urls, fetch, max_workers=DEFAULT_FETCH_WORKERS):
+    """Yield ``(url, result, error)`` for every URL, in input order.
+
+    ``fetch(url)`` runs on up to ``max_workers`` threads. A URL is yielded as
+    soon as it and every URL before it have finished, so callers can start
+    on the first playlists while later ones are still being listed. If the
+    consumer stops early, listings that have not started are cancelled.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = [executor.submit(fetch, url) for url in urls]
+    try:
+        for url, future in zip(urls, futures):
+            try:
+                yield url, future.result(), None
+            except Exception as e:
+                yield url, None, e
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class EntryMerger:
+    """Collects entries from several playlists, dropping repeated videos."""
+
+    def __init__(self):
+        self.entries = []
+        self.duplicates = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, entries):
+        """Add a playlist's entries and return the ones not seen before."""
+        added = []
+        with self._lock:
+            for entry in entries:
+                key = entry_key(entry)
+                if key in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen.add(key)
+                added.append(entry)
+            self.entries.extend(added)
+        return added
+
+    def __contains__(self, entry):
+        return entry_key(entry) in self._seen
@@ -0,0 +1,151 @@
+"""
+YouTube Playlist Downloader Pro - Post-processing Stage
+Runs ffmpeg conversions outside the download slots.
+
+Letting yt-dlp extract audio itself keeps a download slot (and its share of
+the bandwidth) busy while ffmpeg transcodes, with the network idle. Instead
+``split_postprocessing()`` strips the conversion from the download options,
+the download stage fetches the source media, and an ``AudioExtraction`` is
+queued on a separate stage sized to the CPU cores.
+"""
+
+import os
+import subprocess
+import threading
+
+from toolchain import resolve_toolchain
+
+# ffmpeg encoder and file extension for each audio format yt-dlp accepts
+AUDIO_CODECS = {
+    'mp3': ('libmp3lame', 'mp3'),
+    'aac': ('aac', 'm4a'),
+    'm4a': ('aac', 'm4a'),
+    'opus': ('libopus', 'opus'),
+    'vorbis': ('libvorbis', 'ogg'),
+    'flac': ('flac', 'flac'),
+    'wav': ('pcm_s16le', 'wav'),
+}
+
+
+def default_postprocess_workers():
+    """Conversions are CPU-bound, so run one per core."""
+    return max(1, os.cpu_count() or 1)
+
+
+def split_postprocessing(options):
+    """Return ``(download_options, postprocess)`` for a set of download options.
+
+    ``postprocess`` holds the ``AudioExtraction`` arguments, or is None when
+    there is nothing to run after the download. The download options then
+    fetch the best audio stream as-is.
+    """
+    if not options.get('audio_only'):
+        return options, None
+
+    download_options = dict(options, audio_only=False)
+    download_options['format'] = options.get('format') or "bestaudio/best"
+    postprocess = {
+        'audio_format': options.get('audio_format', "mp3"),
+        'audio_quality': options.get('audio_quality'),
+    }
+    return download_options, postprocess
+
+
+class AudioExtraction:
+    """Convert a downloaded file to audio with ffmpeg.
+
+    Runs and cancels like a download handle and returns a result dict with
+    the same keys; the source file is removed once the conversion succeeds.
+    """
+
+    def __init__(self, source, audio_format="mp3", audio_quality=None, ffmpeg=None):
+        if audio_format not in AUDIO_CODECS:
+            raise ValueError(f"Unsupported audio format: {audio_format}")
+        self.source = source
+        self.audio_format = audio_format
+        self.audio_quality = audio_quality
+        self.ffmpeg = ffmpeg or resolve_toolchain()['ffmpeg'] or "ffmpeg"
+        self.returncode = None
+        self.process = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def destination(self):
+        _, extension = AUDIO_CODECS[self.audio_format]
+        return os.path.splitext(self.source)[0] + "." + extension
+
+    def command(self):
+        codec, _ = AUDIO_CODECS[self.audio_format]
+        command = [self.ffmpeg, "-y", "-nostdin", "-loglevel", "error",
+                   "-i", self.source, "-vn", "-c:a", codec]
+        if self.audio_quality:
+            # yt-dlp's "192K" style bitrate
+            command += ["-b:a", self.audio_quality.lower()]
+        return command + [self.destination]
+
+    def run(self):
+        """Run the conversion and return a result dict."""
+        if self.destination == self.source:
+            # Already in the requested format
+            self.returncode = 0
+            return self._result(self.source, None)
+
+        with self._lock:
+            if self._cancelled:
+                self.returncode = -1
+                return self._result(None, None)
+            try:
+                self.process = subprocess.Popen(
+                    self.command(),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+            except OSError as e:
+                self.returncode = 1
+                return self._result(None, f"ffmpeg could not be started: {e}")
+
+        _, stderr = self.process.communicate()
+        self.returncode = self.process.returncode
+
+        if self.returncode != 0 or self._cancelled:
+            # Don't leave a half-written file behind
+            try:
+                os.remove(self.destination)
+            except OSError:
+                pass
+            error_lines = [line for line in stderr.splitlines() if line.strip()]
+            return self._result(None, error_lines[-1] if error_lines else "ffmpeg failed")
+
+        try:
+            os.remove(self.source)
+        except OSError:
+            pass
+        return self._result(self.destination, None)
+
+    def _result(self, filename, error):
+        return {
+            'success': self.returncode == 0 and not self._cancelled,
+            'returncode': self.returncode,
+            'cancelled': self._cancelled,
+            'filename': filename,
+            'error': None if self._cancelled else error,
+        }
+
+    def terminate(self):
+        with self._lock:
+            self._cancelled = True
+            if self.process is not None and self.process.poll() is None:
+                self.process.terminate()
+
+    def kill(self):
+        with self._lock:
+            self._cancelled = True
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+
+    def poll(self):
+        if self.process is not None:
+            return self.process.poll()
+        return self.returncode
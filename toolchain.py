@@ -0,0 +1,201 @@
+"""
+YouTube Playlist Downloader Pro - Toolchain Resolver
+Detects yt-dlp, ffmpeg and ffprobe once and remembers the answer.
+
+The result is memoized for the life of the process and persisted to
+``toolchain.json`` in the cache directory. The on-disk entry is keyed by the
+path and modification time of every tool it describes, so later launches
+reuse it without spawning anything until one of those files changes.
+"""
+
+import importlib.util
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+
+from app_paths import get_cache_dir
+
+CACHE_FILE_NAME = "toolchain.json"
+CACHE_VERSION = 1
+
+# Command line to run instead of the detected yt-dlp, e.g. the benchmarks' stand-in
+YTDLP_ENV_VAR = "YTPD_YTDLP"
+
+_toolchain = None
+_toolchain_lock = threading.Lock()
+
+
+def _file_signature(path):
+    """Return [path, mtime] for a file, or None if it does not exist."""
+    if not path:
+        return None
+    try:
+        return [os.path.realpath(path), os.stat(path).st_mtime]
+    except OSError:
+        return None
+
+
+def _locate_tools():
+    """Find every tool on disk without running any of them."""
+    spec = importlib.util.find_spec("yt_dlp")
+    module_version_file = None
+    if spec is not None and spec.origin:
+        module_version_file = os.path.join(os.path.dirname(spec.origin), "version.py")
+
+    return {
+        'ytdlp_executable': shutil.which("yt-dlp"),
+        'ytdlp_module': module_version_file if module_version_file and os.path.exists(module_version_file) else None,
+        'ffmpeg': shutil.which("ffmpeg"),
+        'ffprobe': shutil.which("ffprobe"),
+    }
+
+
+def _cache_key(locations):
+    return {
+        'cache_version': CACHE_VERSION,
+        'python': sys.executable,
+        'tools': {name: _file_signature(path) for name, path in locations.items()},
+    }
+
+
+def _run_version(command):
+    """Run ``command`` and return its first output line, or None if it fails."""
+    try:
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, timeout=30)
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[0].strip() if lines else None
+
+
+def _read_module_version(version_file):
+    """Read yt_dlp's ``__version__`` from its source without importing it."""
+    try:
+        with open(version_file, 'r', encoding='utf-8') as f:
+            match = re.search(r"^__version__\s*=\s*['\"]([^'\"]+)['\"]", f.read(), re.MULTILINE)
+        return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+def _probe_ffmpeg(ffmpeg):
+    """Return the ffmpeg version line and the audio encoders we care about."""
+    if not ffmpeg:
+        return None, []
+    version = _run_version([ffmpeg, "-version"])
+    try:
+        result = subprocess.run([ffmpeg, "-hide_banner", "-encoders"], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, timeout=30)
+        encoders = [name for name in ("libmp3lame", "aac", "libopus", "libvorbis")
+                    if re.search(rf"\s{name}\s", result.stdout)]
+    except (OSError, subprocess.TimeoutExpired):
+        encoders = []
+    return version, encoders
+
+
+def _probe(locations):
+    """Work out the yt-dlp entry point, versions and ffmpeg capabilities."""
+    toolchain = {
+        'ytdlp_command': None,
+        'ytdlp_version': None,
+        'ytdlp_module_available': locations['ytdlp_module'] is not None,
+        'ffmpeg': locations['ffmpeg'],
+        'ffprobe': locations['ffprobe'],
+        'ffmpeg_version': None,
+        'audio_encoders': [],
+    }
+
+    # Prefer the yt-dlp executable, as get_ytdlp_command always has
+    if locations['ytdlp_executable']:
+        version = _run_version([locations['ytdlp_executable'], "--version"])
+        if version:
+            toolchain['ytdlp_command'] = [locations['ytdlp_executable']]
+            toolchain['ytdlp_version'] = version
+
+    if toolchain['ytdlp_command'] is None and locations['ytdlp_module']:
+        toolchain['ytdlp_command'] = [sys.executable, "-m", "yt_dlp"]
+        toolchain['ytdlp_version'] = _read_module_version(locations['ytdlp_module'])
+
+    toolchain['ffmpeg_version'], toolchain['audio_encoders'] = _probe_ffmpeg(locations['ffmpeg'])
+    return toolchain
+
+
+def _cache_path():
+    return os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+
+
+def _load_cached(key):
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != key:
+        return None
+    return cached.get('toolchain')
+
+
+def _save_cached(key, toolchain):
+    path = _cache_path()
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'toolchain': toolchain}, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+
+def _apply_override(toolchain):
+    """Substitute the $YTPD_YTDLP command; the override is never cached."""
+    override = os.environ.get(YTDLP_ENV_VAR)
+    if not override:
+        return toolchain
+    return dict(toolchain,
+                ytdlp_command=shlex.split(override, posix=os.name != "nt"),
+                ytdlp_version=f"{override} (from ${YTDLP_ENV_VAR})")
+
+
+def resolve_toolchain(refresh=False):
+    """Return the detected toolchain, probing at most once per process.
+
+    Pass ``refresh=True`` to ignore both the in-process and on-disk caches,
+    e.g. after the user installs yt-dlp or ffmpeg. ``$YTPD_YTDLP`` replaces
+    the yt-dlp command line.
+    """
+    global _toolchain
+
+    with _toolchain_lock:
+        if _toolchain is not None and not refresh:
+            return _apply_override(_toolchain)
+
+        locations = _locate_tools()
+        key = _cache_key(locations)
+
+        toolchain = None if refresh else _load_cached(key)
+        if toolchain is None:
+            toolchain = _probe(locations)
+            _save_cached(key, toolchain)
+
+        _toolchain = toolchain
+        return _apply_override(_toolchain)
+
+
+def get_ytdlp_command():
+    """Get the appropriate yt-dlp command based on installation method."""
+    command = resolve_toolchain()['ytdlp_command']
+    # Fall back to using Python module, which reports a clear error if missing
+    return list(command) if command else [sys.executable, "-m", "yt_dlp"]
+
+
+def has_mp3_encoder():
+    """Return True if ffmpeg is available and can encode MP3."""
+    toolchain = resolve_toolchain()
+    return bool(toolchain['ffmpeg']) and "libmp3lame" in toolchain['audio_encoders']
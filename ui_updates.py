@@ -0,0 +1,74 @@
+"""
+YouTube Playlist Downloader Pro - UI Update Bus
+Coalesces progress updates from download threads before they reach Tk.
+
+Worker threads ``post()`` the latest state for a row; the UI thread
+``drain()``s the bus at a fixed refresh rate and applies one merged update
+per row, however many were posted in between.
+"""
+
+import threading
+
+# How often the UI thread applies pending updates (10 refreshes per second)
+UI_REFRESH_MS = 100
+
+
+class UIUpdateBus:
+    """Thread-safe store of the newest pending changes per key.
+
+    ``schedule`` is called (from whichever thread posts) when the first
+    update arrives after a drain, so the UI only needs to wake up while
+    there is something to apply.
+    """
+
+    def __init__(self, schedule=None):
+        self.schedule = schedule
+        self.posted = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.discarded = 0
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled = False
+
+    def post(self, key, **changes):
+        """Record new field values for ``key``; newer values replace older ones."""
+        with self._lock:
+            self.posted += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = changes
+            else:
+                pending.update(changes)
+                self.coalesced += 1
+
+            needs_schedule = not self._scheduled
+            self._scheduled = True
+
+        if needs_schedule and self.schedule:
+            self.schedule()
+
+    def drain(self):
+        """Return ``{key: changes}`` for everything posted since the last drain."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+            self.applied += len(pending)
+        return pending
+
+    def discard(self, key):
+        """Drop pending changes for ``key``, e.g. once its download has finished."""
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self.discarded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'posted': self.posted,
+                'applied': self.applied,
+                'coalesced': self.coalesced,
+                'discarded': self.discarded,
+                'pending': len(self._pending),
+            }
@@ -0,0 +1,329 @@
+"""
+YouTube Playlist Downloader Pro - Virtualized Video List
+Shows thousands of playlist rows while only building widgets for the ones on screen.
+
+Per-video state lives in plain ``VideoRow`` objects. ``VirtualVideoList``
+keeps a small pool of ``VideoRowWidget`` instances, enough to fill the
+visible area, and rebinds them to different rows as the list scrolls.
+"""
+
+import sys
+import tkinter as tk
+import customtkinter as ctk
+
+# Height of one row's frame and the vertical gap around it
+ROW_FRAME_HEIGHT = 100
+ROW_PADDING = 5
+ROW_HEIGHT = ROW_FRAME_HEIGHT + 2 * ROW_PADDING
+
+# Pixels scrolled per mouse wheel notch / scrollbar arrow click
+SCROLL_STEP = ROW_HEIGHT // 2
+
+
+class VideoRow:
+    """The model for one video in the list.
+
+    ``border`` names an entry in the app's color table ("primary", "success",
+    ...) or is None for the default border. ``busy`` is True while the video
+    is queued or downloading, which swaps the Download and Cancel buttons.
+    ``archived`` is True once the video is in the download archive, so batch
+    downloads skip it.
+    """
+
+    __slots__ = ('index', 'info', 'url', 'details', 'audio_only', 'quality',
+                 'status', 'progress', 'border', 'busy', 'archived')
+
+    def __init__(self, index, info, details):
+        self.index = index
+        self.info = info
+        self.url = info['url']
+        self.details = details
+        self.audio_only = False
+        self.quality = "Best"
+        self.status = "Ready"
+        self.progress = 0.0
+        self.border = None
+        self.busy = False
+        self.archived = False
+
+
+class VideoRowWidget:
+    """One pooled row of widgets that can display any ``VideoRow``."""
+
+    def __init__(self, parent, colors, on_download, on_cancel):
+        self.colors = colors
+        self.row = None
+
+        # Main video frame with enhanced styling
+        self.video_frame = ctk.CTkFrame(
+            parent,
+            height=ROW_FRAME_HEIGHT,
+            fg_color=colors['background'],
+            border_width=1,
+            border_color="#404040"
+        )
+        self.video_frame.pack_propagate(False)
+
+        # Left section - Video info
+        info_frame = ctk.CTkFrame(self.video_frame, fg_color="transparent")
+        info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Video number and title
+        title_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
+        title_frame.pack(fill=tk.X, anchor="w")
+
+        self.number_label = ctk.CTkLabel(
+            title_frame,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            text_color=colors['primary'],
+            width=30
+        )
+        self.number_label.pack(side=tk.LEFT)
+
+        self.title_label = ctk.CTkLabel(
+            title_frame,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            anchor="w"
+        )
+        self.title_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+
+        # Video details
+        self.details_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=10),
+            text_color="gray",
+            anchor="w"
+        )
+        self.details_label.pack(anchor="w", pady=(5, 0))
+
+        # Progress and status
+        self.status_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=10),
+            anchor="w"
+        )
+        self.status_label.pack(anchor="w", pady=(5, 0))
+
+        self.progress_bar = ctk.CTkProgressBar(
+            info_frame,
+            height=8,
+            progress_color=colors['primary']
+        )
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill=tk.X, pady=(2, 0))
+
+        # Right section - Controls
+        controls_frame = ctk.CTkFrame(self.video_frame, fg_color="transparent", width=200)
+        controls_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
+        controls_frame.pack_propagate(False)
+
+        # Audio only checkbox
+        self.audio_only_var = ctk.BooleanVar(value=False)
+        self.audio_checkbox = ctk.CTkCheckBox(
+            controls_frame,
+            text="Audio Only (MP3)",
+            variable=self.audio_only_var,
+            command=self._on_audio_only_changed,
+            font=ctk.CTkFont(size=10)
+        )
+        self.audio_checkbox.pack(anchor="w", pady=(0, 5))
+
+        # Quality selection for individual video
+        self.quality_var = ctk.StringVar(value="Best")
+        self.quality_option = ctk.CTkOptionMenu(
+            controls_frame,
+            values=["Best", "1080p", "720p", "480p"],
+            variable=self.quality_var,
+            command=self._on_quality_changed,
+            width=120,
+            height=25,
+            font=ctk.CTkFont(size=10)
+        )
+        self.quality_option.pack(anchor="w", pady=(0, 10))
+
+        # Buttons
+        self.download_button = ctk.CTkButton(
+            controls_frame,
+            text="⬇️ Download",
+            command=lambda: self.row and on_download(self.row.url),
+            height=30,
+            width=120,
+            font=ctk.CTkFont(size=11, weight="bold"),
+            fg_color=colors['success']
+        )
+        self.download_button.pack(fill=tk.X, pady=(0, 5))
+
+        self.cancel_button = ctk.CTkButton(
+            controls_frame,
+            text="⏹️ Cancel",
+            command=lambda: self.row and on_cancel(self.row.url),
+            state=tk.DISABLED,
+            height=25,
+            width=120,
+            font=ctk.CTkFont(size=10),
+            fg_color=colors['danger']
+        )
+        self.cancel_button.pack(fill=tk.X)
+
+    def _on_audio_only_changed(self):
+        if self.row is not None:
+            self.row.audio_only = self.audio_only_var.get()
+
+    def _on_quality_changed(self, value):
+        if self.row is not None:
+            self.row.quality = value
+
+    def bind(self, row):
+        """Show ``row`` in this widget."""
+        self.row = row
+        info = row.info
+
+        title = info['title'][:80] + "..." if len(info['title']) > 80 else info['title']
+        self.number_label.configure(text=f"{row.index:02d}.")
+        self.title_label.configure(text=title)
+        self.details_label.configure(text=row.details)
+        self.audio_only_var.set(row.audio_only)
+        self.quality_var.set(row.quality)
+        self.update_state()
+
+    def update_state(self):
+        """Refresh the parts of the row that change while downloading."""
+        row = self.row
+        self.status_label.configure(text=row.status)
+        self.progress_bar.set(row.progress)
+        self.video_frame.configure(border_color=self.colors[row.border] if row.border else "#404040")
+        self.download_button.configure(state=tk.DISABLED if row.busy else tk.NORMAL)
+        self.cancel_button.configure(state=tk.NORMAL if row.busy else tk.DISABLED)
+
+
+class VirtualVideoList(ctk.CTkFrame):
+    """A scrollable list that only materializes the rows currently in view."""
+
+    def __init__(self, parent, colors, on_download, on_cancel, **kwargs):
+        super().__init__(parent, fg_color=colors['surface'], **kwargs)
+        self.colors = colors
+        self.on_download = on_download
+        self.on_cancel = on_cancel
+
+        self.rows = []
+        self.offset = 0
+        self._pool = []
+        self._visible = {}
+        self._render_pending = False
+
+        self.scrollbar = ctk.CTkScrollbar(
+            self,
+            command=self._on_scrollbar,
+            button_color=colors['primary']
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 3), pady=3)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.viewport.bind("<Configure>", lambda event: self.schedule_render())
+        self.viewport.bind("<Enter>", self._bind_mousewheel)
+        self.viewport.bind("<Leave>", self._unbind_mousewheel)
+
+    # --- Model operations ---
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        self.schedule_render()
+
+    def clear(self):
+        self.rows = []
+        self.offset = 0
+        self.schedule_render()
+
+    def refresh_row(self, row):
+        """Redraw ``row`` if it is currently on screen."""
+        widget = self._visible.get(row.url)
+        if widget is not None and widget.row is row:
+            widget.update_state()
+
+    # --- Rendering ---
+
+    def schedule_render(self):
+        """Render once the current burst of changes has been processed."""
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        height = self.viewport.winfo_height()
+        total_height = len(self.rows) * ROW_HEIGHT
+        self.offset = max(0, min(self.offset, total_height - height))
+
+        first = self.offset // ROW_HEIGHT
+        needed = min(height // ROW_HEIGHT + 2, len(self.rows))
+        while len(self._pool) < needed:
+            self._pool.append(VideoRowWidget(self.viewport, self.colors, self.on_download, self.on_cancel))
+
+        self._visible = {}
+        for slot, widget in enumerate(self._pool):
+            index = first + slot
+            if slot < needed and index < len(self.rows):
+                row = self.rows[index]
+                if widget.row is not row:
+                    widget.bind(row)
+                self._visible[row.url] = widget
+                widget.video_frame.place(
+                    x=ROW_PADDING,
+                    y=index * ROW_HEIGHT - self.offset + ROW_PADDING,
+                    relwidth=1.0,
+                    width=-2 * ROW_PADDING,
+                    height=ROW_FRAME_HEIGHT
+                )
+            else:
+                widget.video_frame.place_forget()
+
+        if total_height > height > 0:
+            self.scrollbar.set(self.offset / total_height, (self.offset + height) / total_height)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --- Scrolling ---
+
+    def scroll_to(self, offset):
+        self.offset = max(0, int(offset))
+        self.schedule_render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        height = self.viewport.winfo_height()
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.rows) * ROW_HEIGHT)
+        elif action == "scroll":
+            step = height if unit == "pages" else SCROLL_STEP
+            self.scroll_to(self.offset + int(value) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            direction = -1
+        elif event.num == 5:
+            direction = 1
+        elif sys.platform == "darwin":
+            direction = -event.delta
+        else:
+            direction = -event.delta // 120
+        self.scroll_to(self.offset + direction * SCROLL_STEP)
+
+    def _bind_mousewheel(self, event=None):
+        self.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.bind_all("<Button-4>", self._on_mousewheel)
+        self.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event=None):
+        # <Leave> also fires when the pointer moves onto one of the row widgets
+        if event is not None:
+            under_pointer = self.winfo_containing(event.x_root, event.y_root)
+            if under_pointer is not None and str(under_pointer).startswith(str(self.viewport)):
+                return
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
@@ -0,0 +1,434 @@
+"""
+YouTube Playlist Downloader Pro - Warm Worker Processes
+Long-lived yt-dlp processes that serve fetch and download requests.
+
+A yt-dlp subprocess per video pays for starting Python and importing yt_dlp
+and its extractors every time, which dominates short audio downloads. Each
+worker here imports yt_dlp once and then takes requests over a pipe,
+streaming progress events and playlist entries back, so downloads keep the
+isolation of a separate process (a crash or leak can't take the app down)
+without the per-video startup. Workers are replaced after ``max_jobs``
+requests, or once their resident memory grows past ``max_rss``.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+
+from ytdlp_engine import DownloadHandle, InProcessDownload, parse_playlist_entry
+
+# Workers started up front, so the first downloads don't wait for yt_dlp to load
+DEFAULT_WARM_WORKERS = 2
+# Recycle a worker after this many requests or this much resident memory
+DEFAULT_MAX_JOBS = 50
+DEFAULT_MAX_RSS = 512 * 1024 * 1024
+
+# URL redirections followed when resolving a playlist to list
+MAX_REDIRECTS = 5
+
+# Seconds a stopping worker gets to exit before it is terminated
+STOP_TIMEOUT = 2.0
+
+# Messages on a worker's pipe: requests are tuples starting with their kind,
+# replies are (kind, payload) and every request ends with one REPLY_RESULT
+REQUEST_DOWNLOAD = "download"
+REQUEST_FETCH = "fetch"
+REQUEST_STOP = "stop"
+REPLY_EVENT = "event"
+REPLY_ENTRY = "entry"
+REPLY_RESULT = "result"
+# Sent once by a download that has seen its cancel and is stopping
+REPLY_CANCELLING = "cancelling"
+
+
+class WorkerDied(Exception):
+    """A worker process exited (or was killed) while serving a request."""
+
+
+def current_rss():
+    """Return the resident memory of this process in bytes, or None if unknown."""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Only the peak is available here; ru_maxrss is in bytes on macOS, KiB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# --- Worker process side ---
+
+class _WorkerDownload(InProcessDownload):
+    """An in-process download inside a worker, cancelled through the pool's event."""
+
+    def __init__(self, url, options, on_event, cancel_event, on_cancelling):
+        super().__init__(url, options, on_event)
+        self.cancel_event = cancel_event
+        self.on_cancelling = on_cancelling
+        self._cancelled = cancel_event.is_set()
+
+    def _progress_hook(self, status):
+        if self.cancel_event.is_set() and not self._cancelled:
+            self._cancelled = True
+            self.on_cancelling()
+        super()._progress_hook(status)
+
+
+def _serve_download(send, cancel_event, url, options):
+    download = _WorkerDownload(url, options, lambda event: send(REPLY_EVENT, event), cancel_event,
+                               lambda: send(REPLY_CANCELLING, None))
+    return download.run()
+
+
+def _serve_fetch(send, cancel_event, ydl, url):
+    """List a playlist flat, sending each entry as it is enumerated."""
+    skipped = 0
+    try:
+        info = ydl.extract_info(url, download=False, process=False)
+    except Exception as e:
+        return {'success': False, 'cancelled': False, 'skipped': 0, 'error': str(e)}
+    # A URL can resolve to another one first (a watch?v=...&list=... link to its playlist)
+    for _ in range(MAX_REDIRECTS):
+        if info is None or 'entries' in info or info.get('_type') not in ('url', 'url_transparent'):
+            break
+        try:
+            info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+        except Exception as e:
+            return {'success': False, 'cancelled': False, 'skipped': 0, 'error': str(e)}
+    if info is None:
+        return {'success': False, 'cancelled': False, 'skipped': 0, 'error': "Could not read playlist"}
+
+    # A single video is listed as itself, like `yt-dlp --flat-playlist -j` does
+    entries = info['entries'] if 'entries' in info else [dict(info, url=info.get('webpage_url') or url)]
+    for video_json in entries:
+        if cancel_event.is_set():
+            return {'success': False, 'cancelled': True, 'skipped': skipped, 'error': None}
+        entry = parse_playlist_entry(video_json) if isinstance(video_json, dict) else None
+        if entry is None:
+            skipped += 1
+            continue
+        send(REPLY_ENTRY, entry)
+    return {'success': True, 'cancelled': False, 'skipped': skipped, 'error': None}
+
+
+class _SilentLogger:
+    """yt_dlp logger that drops every message, as the subprocess listing sends stderr to DEVNULL."""
+
+    def debug(self, message):
+        pass
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+
+def _worker_main(conn, cancel_event):
+    """Entry point of a worker process: load yt_dlp once, then serve requests until told to stop."""
+    import yt_dlp
+
+    send_lock = threading.Lock()
+
+    def send(kind, payload):
+        # Progress hooks can run on yt_dlp's fragment download threads
+        with send_lock:
+            conn.send((kind, payload))
+
+    # Flat listing always uses the same parameters, so one instance serves every fetch
+    fetcher = yt_dlp.YoutubeDL({
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': True,
+        'ignoreerrors': True,
+        'logger': _SilentLogger(),
+    })
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = request[0]
+        if kind == REQUEST_STOP:
+            break
+        if kind == REQUEST_DOWNLOAD:
+            result = _serve_download(send, cancel_event, *request[1:])
+        else:
+            result = _serve_fetch(send, cancel_event, fetcher, request[1])
+        result['rss'] = current_rss()
+        send(REPLY_RESULT, result)
+    conn.close()
+
+
+# --- Parent side ---
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.cancel_event),
+            name="ytpd-worker",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.rss = None
+
+    def request(self, *message):
+        """Send a request; read its replies with ``replies()``."""
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as e:
+            raise WorkerDied(str(e))
+
+    def replies(self):
+        """Yield ``(kind, payload)`` replies up to and including the request's result."""
+        while True:
+            try:
+                kind, payload = self.conn.recv()
+            except (EOFError, OSError) as e:
+                raise WorkerDied(str(e) or "worker process exited")
+            if kind == REPLY_RESULT:
+                self.rss = payload.pop('rss', None)
+            yield kind, payload
+            if kind == REPLY_RESULT:
+                return
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        """Ask the worker to exit; terminate it if it doesn't."""
+        try:
+            self.conn.send((REQUEST_STOP,))
+        except (OSError, ValueError):
+            pass
+        self.process.join(STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(STOP_TIMEOUT)
+        self.conn.close()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class WorkerPool:
+    """Thread-safe pool of warm yt-dlp worker processes.
+
+    Workers are handed out to one request at a time; the pool grows to as
+    many workers as there are concurrent requests (callers already bound
+    that with their queues) and keeps the rest idle for the next ones.
+    """
+
+    def __init__(self, warm=DEFAULT_WARM_WORKERS, max_jobs=DEFAULT_MAX_JOBS, max_rss=DEFAULT_MAX_RSS):
+        # spawn everywhere: forking a process with Tk and download threads running isn't safe
+        self._context = multiprocessing.get_context("spawn")
+        self.max_jobs = max_jobs
+        self.max_rss = max_rss
+        self._lock = threading.Lock()
+        self._idle = []
+        self._busy = set()
+        self._closed = False
+        self.started = 0
+        self.recycled = 0
+        with self._lock:
+            for _ in range(warm):
+                self._idle.append(self._spawn())
+
+    def _spawn(self):
+        # Callers hold self._lock
+        self.started += 1
+        return _Worker(self._context)
+
+    def acquire(self):
+        """Return an idle worker, starting one if none is free."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    break
+                self.recycled += 1
+            else:
+                worker = self._spawn()
+            self._busy.add(worker)
+        # Cleared here rather than per request, so a cancel that comes before the request is kept
+        worker.cancel_event.clear()
+        return worker
+
+    def release(self, worker, healthy=True):
+        """Return a worker after a request; worn-out or broken workers are replaced."""
+        worker.jobs += 1
+        worn_out = worker.jobs >= self.max_jobs or (worker.rss or 0) > self.max_rss
+        with self._lock:
+            self._busy.discard(worker)
+            keep = healthy and not worn_out and not self._closed and worker.is_alive()
+            if keep:
+                self._idle.append(worker)
+            else:
+                self.recycled += 1
+        if not keep:
+            if healthy:
+                # Stopping waits for the process; don't hold up the caller's thread
+                threading.Thread(target=worker.stop, daemon=True).start()
+            else:
+                worker.kill()
+
+    def create_download(self, url, options, on_event=None, throttle=None, tuner=None):
+        return PooledDownload(self, url, options, on_event, throttle, tuner)
+
+    def iter_playlist_entries(self, url, stats=None):
+        """Yield video info dicts for a playlist, listed by a worker.
+
+        Same contract as ``ytdlp_engine.iter_playlist_entries``.
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault('skipped', 0)
+
+        worker = self.acquire()
+        finished = False
+        try:
+            worker.request(REQUEST_FETCH, url)
+            for kind, payload in worker.replies():
+                if kind == REPLY_ENTRY:
+                    yield payload
+                elif kind == REPLY_RESULT:
+                    stats['skipped'] += payload['skipped']
+            finished = True
+        except WorkerDied:
+            finished = True
+            worker.kill()
+            self.release(worker, healthy=False)
+            return
+        finally:
+            # The consumer may stop early; the worker is mid-listing, so replace it
+            if not finished:
+                worker.kill()
+                self.release(worker, healthy=False)
+        self.release(worker)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'busy': len(self._busy),
+                'started': self.started,
+                'recycled': self.recycled,
+            }
+
+    def shutdown(self):
+        """Stop every worker; busy ones are killed."""
+        with self._lock:
+            self._closed = True
+            idle, busy = self._idle, list(self._busy)
+            self._idle = []
+        for worker in busy:
+            worker.kill()
+        for worker in idle:
+            worker.stop()
+
+
+class PooledDownload(DownloadHandle):
+    """Download a video in one of a ``WorkerPool``'s processes.
+
+    Like a subprocess download, the rate limit and fragment plan are fixed
+    when the request is sent; progress events arrive over the worker's pipe.
+    A cancelled download counts as stopped (``poll()`` returns -1) as soon as
+    its worker acknowledges the cancel, so the worker is not killed while it
+    winds down and can go back to the pool.
+    """
+
+    def __init__(self, pool, url, options, on_event=None, throttle=None, tuner=None):
+        super().__init__(url, options, on_event, throttle, tuner)
+        self.pool = pool
+        self.worker = None
+        self._stopping = False
+        self._lock = threading.Lock()
+
+    def _result(self, error=None):
+        return {
+            'success': False,
+            'returncode': self.returncode,
+            'cancelled': self._cancelled,
+            'filename': None,
+            'output': "",
+            'error': None if self._cancelled else error,
+            'warnings': [],
+        }
+
+    def _run(self):
+        options = dict(self.options)
+        rate = self.throttle.rate() if self.throttle else None
+        if rate:
+            options['rate_limit'] = int(rate)
+        if self.tuner is not None:
+            plan = self._plan_connections()
+            options['concurrent_fragments'] = plan['fragments']
+            if plan['http_chunk_size']:
+                options['http_chunk_size'] = plan['http_chunk_size']
+
+        with self._lock:
+            if self._cancelled:
+                self.returncode = -1
+                return self._result()
+            self.worker = self.pool.acquire()
+
+        result = None
+        try:
+            self.worker.request(REQUEST_DOWNLOAD, self.url, options)
+            for kind, payload in self.worker.replies():
+                if kind == REPLY_EVENT:
+                    if payload['type'] == 'progress' and self.tuner is not None:
+                        self.tuner.observe(self, payload['speed_bps'])
+                    self._emit(payload)
+                elif kind == REPLY_CANCELLING:
+                    self._stopping = True
+                elif kind == REPLY_RESULT:
+                    result = payload
+        except WorkerDied as e:
+            self.returncode = -1 if self._cancelled else 1
+            self.pool.release(self.worker, healthy=False)
+            return self._result(f"Worker process exited unexpectedly ({e})")
+
+        self.pool.release(self.worker)
+        self.returncode = result['returncode']
+        self.filename = result['filename']
+        if self._cancelled:
+            result.update(success=False, cancelled=True, error=None)
+        return result
+
+    def terminate(self):
+        with self._lock:
+            self._cancelled = True
+            if self.worker is not None:
+                self.worker.cancel_event.set()
+
+    def kill(self):
+        with self._lock:
+            self._cancelled = True
+            if self.worker is not None:
+                self.worker.kill()
+
+    def poll(self):
+        if self.returncode is None and self._stopping:
+            return -1
+        return self.returncode
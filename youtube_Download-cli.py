@@ -1,12 +1,34 @@
-import subprocess
 import json
 import sys
 import os
 import re
 import time
+import argparse
+import signal
+import threading
+import multiprocessing
 from datetime import datetime
 import shutil
 
+from ytdlp_engine import ENGINE_MODES, create_engine, iter_playlist_entries
+from toolchain import resolve_toolchain
+from playlist_cache import PlaylistCache
+from download_archive import DownloadArchive
+from media_store import STORE_ENV_VAR, MediaStore, format_bytes
+from download_queue import DEFAULT_MAX_WORKERS, ORDER_FIFO, DownloadQueue
+from playlist_fetcher import DEFAULT_FETCH_WORKERS, EntryMerger, fetch_playlists
+from fragment_tuning import AUTO, DEFAULT_MAX_CONNECTIONS, FragmentTuner
+from job_metrics import (JobMetrics, METRICS_ENV_VAR, OUTCOME_CANCELLED, OUTCOME_COMPLETED, OUTCOME_FAILED,
+                         PROMETHEUS_FILE_NAME, summary_lines)
+
+# Exit codes for --batch runs
+EXIT_OK = 0                 # every selected video is downloaded (or already was)
+EXIT_SOME_FAILED = 1        # some videos or sources failed, others succeeded
+EXIT_USAGE = 2              # bad arguments or unreadable URL file (argparse uses 2 too)
+EXIT_ALL_FAILED = 3         # nothing could be downloaded
+EXIT_MISSING_TOOLS = 4      # yt-dlp is not installed
+EXIT_INTERRUPTED = 130      # Ctrl+C or SIGTERM
+
 # ANSI Color codes for better UI
 class Colors:
     HEADER = '\033[95m'
@@ -44,28 +66,19 @@ def check_dependencies():
     """Check if required dependencies are installed."""
     print(f"{Colors.OKCYAN}🔍 Checking dependencies...{Colors.ENDC}")
     
-    try:
-        # First try to import yt_dlp module
-        import yt_dlp
-        version = yt_dlp.version.__version__
-        print(f"{Colors.OKGREEN}✅ yt-dlp found: {version}{Colors.ENDC}")
-        return True
-    except ImportError:
-        # If import fails, try command line
-        try:
-            result = subprocess.run(["yt-dlp", "--version"], 
-                                  check=True, 
-                                  stdout=subprocess.PIPE, 
-                                  stderr=subprocess.PIPE, 
-                                  text=True)
-            version = result.stdout.strip()
-            print(f"{Colors.OKGREEN}✅ yt-dlp found: {version}{Colors.ENDC}")
-            return True
-        except (FileNotFoundError, subprocess.CalledProcessError):
-            print(f"{Colors.FAIL}❌ Error: yt-dlp is not installed or not in your system's PATH.{Colors.ENDC}")
-            print(f"{Colors.WARNING}📦 Please install it by running: pip install yt-dlp{Colors.ENDC}")
-            print(f"{Colors.WARNING}📦 Or run the setup script: python setup.py{Colors.ENDC}")
-            return False
+    toolchain = resolve_toolchain()
+    if not toolchain['ytdlp_command']:
+        print(f"{Colors.FAIL}❌ Error: yt-dlp is not installed or not in your system's PATH.{Colors.ENDC}")
+        print(f"{Colors.WARNING}📦 Please install it by running: pip install yt-dlp{Colors.ENDC}")
+        print(f"{Colors.WARNING}📦 Or run the setup script: python setup.py{Colors.ENDC}")
+        return False
+    
+    print(f"{Colors.OKGREEN}✅ yt-dlp found: {toolchain['ytdlp_version'] or 'unknown version'}{Colors.ENDC}")
+    if toolchain['ffmpeg']:
+        print(f"{Colors.OKGREEN}✅ ffmpeg found: {toolchain['ffmpeg']}{Colors.ENDC}")
+    else:
+        print(f"{Colors.WARNING}⚠️  ffmpeg not found - MP3 extraction will not work{Colors.ENDC}")
+    return True
 
 def get_download_directory():
     """Get and validate download directory."""
@@ -95,8 +108,150 @@ def get_download_directory():
         else:
             print(f"{Colors.FAIL}❌ Invalid choice. Please try again.{Colors.ENDC}")
 
+def _fragments_argument(value):
+    if value.lower() == AUTO:
+        return AUTO
+    try:
+        fragments = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+    if fragments < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return fragments
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="YouTube Playlist Downloader CLI")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINE_MODES,
+        default=None,
+        help="download engine: in-process yt_dlp, one yt-dlp subprocess per video, "
+             "warm yt_dlp worker processes, or auto-detect (default: auto, or $YTPD_ENGINE)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="number of videos to download in parallel "
+             f"(default: 1, or {DEFAULT_MAX_WORKERS} with --batch)"
+    )
+    parser.add_argument(
+        "-N", "--fragments",
+        type=_fragments_argument,
+        default=AUTO,
+        metavar="N",
+        help="connections per video for DASH/HLS formats, or 'auto' to pick them "
+             "from format type and observed speed (default: auto)"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        metavar="N",
+        help=f"cap on connections across all parallel downloads (default: {DEFAULT_MAX_CONNECTIONS})"
+    )
+    parser.add_argument(
+        "--fetch-jobs",
+        type=int,
+        default=DEFAULT_FETCH_WORKERS,
+        metavar="N",
+        help=f"number of playlists to list at the same time (default: {DEFAULT_FETCH_WORKERS})"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="reuse cached playlist listings younger than this "
+             "(default: 21600, or $YTPD_PLAYLIST_CACHE_TTL)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached playlist listings and fetch them again"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor write the playlist cache"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="download videos again even if the download archive lists them"
+    )
+    parser.add_argument(
+        "--media-store",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help="link videos downloaded before (into any directory) from a shared store "
+             "instead of downloading them again (default DIR: in the app data "
+             f"directory; also enabled by ${STORE_ENV_VAR})"
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        metavar="DIR",
+        default=None,
+        help="write per-job timing metrics (metrics.prom, metrics.json) here "
+             f"(default: in the app data directory, or ${METRICS_ENV_VAR})"
+    )
+    parser.add_argument(
+        "--store-report",
+        action="store_true",
+        help="print how much space and bandwidth the media store has saved, then exit"
+    )
+    
+    batch = parser.add_argument_group(
+        "batch mode",
+        "run without prompts, e.g. from cron; progress goes to stderr"
+    )
+    batch.add_argument(
+        "--batch",
+        metavar="URL_FILE",
+        help="download every playlist/video URL listed in this file "
+             "(one per line, '#' comments allowed, '-' for stdin)"
+    )
+    batch.add_argument(
+        "-o", "--output",
+        metavar="DIR",
+        default=None,
+        help="download directory for --batch (default: current directory)"
+    )
+    batch.add_argument(
+        "-f", "--format",
+        default="best",
+        metavar="FORMAT",
+        help="'best' (MP4), 'audio' (MP3) or a yt-dlp format string (default: best)"
+    )
+    batch.add_argument(
+        "--select",
+        default="all",
+        metavar="EXPR",
+        help="videos to take from each playlist, e.g. 'all' or '1-10, 15' (default: all)"
+    )
+    batch.add_argument(
+        "--report",
+        metavar="PATH",
+        default=None,
+        help="write the JSONL report here ('-' for stdout; "
+             "default: ytpd-report-<time>.jsonl in the output directory)"
+    )
+    return parser.parse_args(argv)
+
 def main():
     """Main function to run the command-line interface."""
+    args = parse_arguments()
+    
+    if args.store_report:
+        sys.exit(print_store_report(open_media_store(args, required=True)))
+    if args.batch:
+        sys.exit(run_batch(args))
+    
+    args.jobs = max(1, args.jobs or 1)
     
     clear_screen()
     print_banner()
@@ -105,12 +260,23 @@ def main():
         input(f"\n{Colors.WARNING}Press Enter to exit...{Colors.ENDC}")
         sys.exit(1)
     
+    playlist_cache = None if args.no_cache else PlaylistCache(ttl=args.cache_ttl)
+    
     download_dir = get_download_directory()
     print(f"{Colors.OKGREEN}📂 Downloads will be saved to: {download_dir}{Colors.ENDC}")
     
+    # One engine lists and downloads every playlist of the session
+    engine = create_engine(args.engine)
+    try:
+        interactive_loop(args, engine, playlist_cache, download_dir)
+    finally:
+        engine.close()
+
+def interactive_loop(args, engine, playlist_cache, download_dir):
+    """Prompts for playlists and downloads them until the user quits."""
     while True:
         print(f"\n{Colors.HEADER}{'='*60}{Colors.ENDC}")
-        playlist_url = input(f"\n{Colors.BOLD}🔗 Enter YouTube Playlist URL (or 'exit' to quit): {Colors.ENDC}")
+        playlist_url = input(f"\n{Colors.BOLD}🔗 Enter YouTube Playlist URL(s), separated by spaces (or 'exit' to quit): {Colors.ENDC}")
         
         if playlist_url.lower() in ['exit', 'quit', 'q']:
             print(f"\n{Colors.OKCYAN}👋 Thank you for using YouTube Playlist Downloader!{Colors.ENDC}")
@@ -121,80 +287,119 @@ def main():
             continue
 
         print(f"\n{Colors.OKCYAN}🔍 Fetching playlist information...{Colors.ENDC}")
-        videos = fetch_playlist_info(playlist_url)
+        playlist_urls = playlist_url.split()
+        if len(playlist_urls) > 1:
+            videos = fetch_multiple_playlists(playlist_urls, cache=playlist_cache, force_refresh=args.refresh,
+                                              max_workers=args.fetch_jobs, engine=engine)
+        else:
+            videos = fetch_playlist_info(playlist_urls[0], cache=playlist_cache, force_refresh=args.refresh,
+                                         engine=engine)
 
         if videos:
             print(f"{Colors.OKGREEN}✅ Successfully found {len(videos)} videos!{Colors.ENDC}")
             selected_videos = prompt_for_selection(videos)
             if selected_videos:
-                download_videos(selected_videos, download_dir)
+                download_videos(selected_videos, download_dir, engine=engine, jobs=args.jobs,
+                                skip_archived=not args.force, fragments=args.fragments,
+                                max_connections=args.max_connections, store=open_media_store(args),
+                                metrics=JobMetrics(args.metrics_dir))
         else:
             print(f"{Colors.FAIL}❌ Could not find any videos at that URL. Please try again.{Colors.ENDC}")
 
-def get_ytdlp_command():
-    """Get the appropriate yt-dlp command based on installation method."""
-    try:
-        # Try using yt-dlp as a command
-        subprocess.run(["yt-dlp", "--version"], 
-                      check=True, 
-                      stdout=subprocess.PIPE, 
-                      stderr=subprocess.PIPE)
-        return ["yt-dlp"]
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        # Fall back to using Python module
-        return [sys.executable, "-m", "yt_dlp"]
-
-def fetch_playlist_info(url):
-    """Fetches video titles and URLs from a playlist with enhanced error handling."""
+def open_media_store(args, required=False):
+    """Return the MediaStore selected by --media-store or $YTPD_MEDIA_STORE, or None."""
+    if args.media_store is None and not os.environ.get(STORE_ENV_VAR) and not required:
+        return None
+    return MediaStore(args.media_store or None)
+
+def print_store_report(store):
+    """Print the media store's totals; returns an exit code."""
+    report = store.report()
+    print(f"📦 Media store: {report['directory']}")
+    print(f"   {report['objects']} videos stored, {format_bytes(report['stored_bytes'])}")
+    print(f"   {report['links']} downloads avoided by linking, {format_bytes(report['bytes_saved'])} saved")
+    return EXIT_OK
+
+def link_stored_videos(videos, store, download_options, download_dir, archive):
+    """Link videos the media store already has into ``download_dir``.
+
+    Returns ``(remaining, linked_bytes)``: the videos that still have to be
+    downloaded and the size of the ones that were linked.
+    """
+    remaining = []
+    linked_bytes = 0
+    for video in videos:
+        path = store.link_into(video, download_options, download_dir)
+        if path is None:
+            remaining.append(video)
+            continue
+        linked_bytes += archive.add(video, path, download_options)['size'] or 0
+    return remaining, linked_bytes
+
+def fetch_playlist_info(url, cache=None, force_refresh=False, engine=None):
+    """Fetches video titles and URLs from a playlist with enhanced error handling.
+    
+    When a ``PlaylistCache`` is given, a cached copy younger than its TTL is
+    returned without running yt-dlp, and fresh results are written back.
+    With an ``engine``, the listing runs wherever it runs its downloads.
+    """
     try:
-        print(f"{Colors.OKCYAN}⏳ Analyzing playlist structure...{Colors.ENDC}")
-        
-        ytdlp_cmd = get_ytdlp_command()
-        command = ytdlp_cmd + [
-            "--flat-playlist",
-            "-j",
-            "--no-warnings",
-            "--ignore-errors",
-            url
-        ]
-        
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            universal_newlines=True
-        )
-
-        video_info_list = []
-        error_count = 0
+        if cache is not None and not force_refresh:
+            cached = cache.get(url)
+            if cached is not None and cache.is_fresh(cached[1]):
+                entries, age = cached
+                print(f"{Colors.OKCYAN}⚡ Loaded from cache ({int(age // 60)} min old, use --refresh to reload){Colors.ENDC}")
+                return entries
         
-        for line in iter(process.stdout.readline, ''):
-            if line.strip():
-                try:
-                    video_json = json.loads(line)
-                    if 'title' in video_json and 'url' in video_json:
-                        video_info_list.append({
-                            'title': video_json['title'],
-                            'url': video_json['url'],
-                            'duration': video_json.get('duration', 'Unknown'),
-                            'uploader': video_json.get('uploader', 'Unknown')
-                        })
-                except json.JSONDecodeError:
-                    error_count += 1
-                    continue
+        print(f"{Colors.OKCYAN}⏳ Analyzing playlist structure...{Colors.ENDC}")
         
-        process.wait()
+        stats = {}
+        video_info_list = list(engine.iter_playlist_entries(url, stats) if engine is not None
+                               else iter_playlist_entries(url, stats))
+        error_count = stats['skipped']
         
         if error_count > 0:
             print(f"{Colors.WARNING}⚠️  Skipped {error_count} invalid entries{Colors.ENDC}")
         
+        if cache is not None and video_info_list:
+            changes = cache.store(url, video_info_list)
+            if changes['added'] or changes['removed']:
+                print(f"{Colors.OKCYAN}🔄 Cache updated: {changes['added']} new, {changes['removed']} removed{Colors.ENDC}")
+        
         return video_info_list
 
     except Exception as e:
         print(f"{Colors.FAIL}❌ An error occurred while fetching info: {e}{Colors.ENDC}")
         return []
 
+def fetch_multiple_playlists(urls, cache=None, force_refresh=False, max_workers=DEFAULT_FETCH_WORKERS, engine=None):
+    """Lists several playlists concurrently and merges them in the order given.
+    
+    Videos that appear in more than one playlist are only returned once.
+    """
+    print(f"{Colors.OKCYAN}⏳ Listing {len(urls)} playlists ({min(max_workers, len(urls))} at a time)...{Colors.ENDC}")
+    
+    merger = EntryMerger()
+    
+    def fetch(url):
+        return load_playlist(url, cache, force_refresh, engine)
+    
+    for url, fetched, error in fetch_playlists(urls, fetch, max_workers=max_workers):
+        if error is not None:
+            print(f"{Colors.FAIL}❌ {url}: {error}{Colors.ENDC}")
+            continue
+        entries, from_cache = fetched
+        if not entries:
+            print(f"{Colors.WARNING}⚠️  No videos found at {url}{Colors.ENDC}")
+            continue
+        added = merger.add(entries)
+        print(f"{Colors.OKGREEN}✅ {len(entries)} videos{' (cached)' if from_cache else ''}, "
+              f"{len(added)} new: {url}{Colors.ENDC}")
+    
+    if merger.duplicates:
+        print(f"{Colors.OKCYAN}🔁 Skipped {merger.duplicates} videos that appear in more than one playlist{Colors.ENDC}")
+    return merger.entries
+
 def format_duration(duration):
     """Format duration from seconds to readable format."""
     if duration == 'Unknown' or duration is None:
@@ -213,6 +418,47 @@ def format_duration(duration):
     except (ValueError, TypeError):
         return 'Unknown'
 
+def parse_selection(selection_input, count, strict=True):
+    """Parse a selection like 'all' or '1, 3-5, 8' into sorted 1-based indices.
+    
+    Raises ValueError with a user-facing message for malformed input. With
+    ``strict=False`` numbers beyond ``count`` are dropped instead of rejected,
+    so one expression can be applied to playlists of different lengths.
+    """
+    if selection_input.strip().lower() == 'all':
+        return list(range(1, count + 1))
+    
+    selected_indices = set()
+    
+    # Parse ranges and individual numbers
+    for part in re.split(r'[,\s]+', selection_input.strip()):
+        if not part:
+            continue
+        
+        if '-' in part:
+            try:
+                start, end = map(int, part.split('-'))
+            except ValueError:
+                raise ValueError(f"Invalid range format: {part}. Use format like '5-8'.")
+            if not 1 <= start <= end:
+                raise ValueError(f"Invalid range: {part}. Please enter valid numbers (1-{count}).")
+            if end > count:
+                if strict:
+                    raise ValueError(f"Invalid range: {part}. Please enter valid numbers (1-{count}).")
+                end = count
+            selected_indices.update(range(start, end + 1))
+        else:
+            try:
+                index = int(part)
+            except ValueError:
+                raise ValueError(f"Invalid input: {part}. Please use numbers, ranges, or 'all'.")
+            if index < 1 or (strict and index > count):
+                raise ValueError(f"Invalid number: {index}. Please enter a number between 1 and {count}.")
+            if index <= count:
+                selected_indices.add(index)
+    
+    return sorted(selected_indices)
+
 def prompt_for_selection(video_list):
     """Displays videos and prompts user for selection with enhanced UI."""
     print(f"\n{Colors.HEADER}{'='*80}{Colors.ENDC}")
@@ -251,50 +497,31 @@ def prompt_for_selection(video_list):
             print(f"{Colors.OKGREEN}✅ Selected all {len(video_list)} videos{Colors.ENDC}")
             return video_list
 
-        selected_indices = set()
-        
-        # Parse ranges and individual numbers
-        parts = re.split(r'[,\s]+', selection_input)
-        
-        valid_input = True
-        for part in parts:
-            if not part:
-                continue
-            
-            if '-' in part:
-                try:
-                    start, end = map(int, part.split('-'))
-                    if 1 <= start <= end <= len(video_list):
-                        selected_indices.update(range(start, end + 1))
-                    else:
-                        print(f"{Colors.FAIL}❌ Invalid range: {part}. Please enter valid numbers (1-{len(video_list)}).{Colors.ENDC}")
-                        valid_input = False
-                        break
-                except ValueError:
-                    print(f"{Colors.FAIL}❌ Invalid range format: {part}. Use format like '5-8'.{Colors.ENDC}")
-                    valid_input = False
-                    break
-            else:
-                try:
-                    index = int(part)
-                    if 1 <= index <= len(video_list):
-                        selected_indices.add(index)
-                    else:
-                        print(f"{Colors.FAIL}❌ Invalid number: {index}. Please enter a number between 1 and {len(video_list)}.{Colors.ENDC}")
-                        valid_input = False
-                        break
-                except ValueError:
-                    print(f"{Colors.FAIL}❌ Invalid input: {part}. Please use numbers, ranges, or 'all'.{Colors.ENDC}")
-                    valid_input = False
-                    break
+        try:
+            selected_indices = parse_selection(selection_input, len(video_list))
+        except ValueError as e:
+            print(f"{Colors.FAIL}❌ {e}{Colors.ENDC}")
+            continue
         
-        if valid_input and selected_indices:
-            selected_videos = [video_list[i-1] for i in sorted(selected_indices)]
+        if selected_indices:
+            selected_videos = [video_list[i-1] for i in selected_indices]
             print(f"{Colors.OKGREEN}✅ Selected {len(selected_videos)} videos{Colors.ENDC}")
             return selected_videos
-        elif valid_input:
+        else:
             print(f"{Colors.WARNING}⚠️  No videos selected. Please try again.{Colors.ENDC}")
 
+# Download options offered by the interactive menu and accepted by --format
+FORMAT_PRESETS = {
+    'best': {'format': 'best[ext=mp4]', 'audio_only': False, 'description': 'Best Quality MP4'},
+    'audio': {'format': 'bestaudio[ext=m4a]', 'audio_only': True, 'description': 'Audio Only MP3'},
+}
+
+def resolve_format(value):
+    """Return download options for a preset name or a custom yt-dlp format string."""
+    if value in FORMAT_PRESETS:
+        return dict(FORMAT_PRESETS[value])
+    return {'format': value, 'audio_only': False, 'description': f'Custom: {value}'}
+
 def get_download_options():
     """Get user preferences for download quality and format."""
     print(f"\n{Colors.OKBLUE}⚙️  Download Options:{Colors.ENDC}")
@@ -306,9 +533,9 @@ def get_download_options():
         choice = input(f"\n{Colors.BOLD}Choose download option (1-3) [1]: {Colors.ENDC}").strip()
         
         if choice == '' or choice == '1':
-            return {'format': 'best[ext=mp4]', 'audio_only': False, 'description': 'Best Quality MP4'}
+            return resolve_format('best')
         elif choice == '2':
-            return {'format': 'bestaudio[ext=m4a]', 'audio_only': True, 'description': 'Audio Only MP3'}
+            return resolve_format('audio')
         elif choice == '3':
             print("\nCustom Quality Options:")
             print("• 1080p: best[height<=1080]")
@@ -316,7 +543,7 @@ def get_download_options():
             print("• 480p: best[height<=480]")
             custom = input("Enter custom format: ").strip()
             if custom:
-                return {'format': custom, 'audio_only': False, 'description': f'Custom: {custom}'}
+                return resolve_format(custom)
         
         print(f"{Colors.FAIL}❌ Invalid choice. Please try again.{Colors.ENDC}")
 
@@ -327,26 +554,15 @@ def progress_bar(current, total, bar_length=40):
     spaces = '░' * (bar_length - len(arrow))
     return f"{Colors.OKGREEN}[{arrow}{spaces}] {percent*100:.1f}%{Colors.ENDC}"
 
-def download_videos(videos_to_download, download_dir):
-    """Downloads the selected videos with enhanced progress tracking."""
-    if not videos_to_download:
-        return
-    
-    # Get download options
-    options = get_download_options()
-    
-    print(f"\n{Colors.HEADER}{'='*80}{Colors.ENDC}")
-    print(f"{Colors.HEADER}{Colors.BOLD}🚀 STARTING DOWNLOADS{Colors.ENDC}")
-    print(f"{Colors.HEADER}{'='*80}{Colors.ENDC}")
-    print(f"{Colors.OKBLUE}📂 Download Directory: {download_dir}{Colors.ENDC}")
-    print(f"{Colors.OKBLUE}🎯 Format: {options['description']}{Colors.ENDC}")
-    print(f"{Colors.OKBLUE}📊 Total Videos: {len(videos_to_download)}{Colors.ENDC}")
-    
+def download_videos_sequentially(videos_to_download, engine, download_options, archive, tuner=None, store=None,
+                                 metrics=None):
+    """Downloads videos one after another, printing a progress bar for each."""
     successful_downloads = 0
     failed_downloads = 0
-    start_time = time.time()
-    
-    ytdlp_cmd = get_ytdlp_command()
+    metrics = metrics or JobMetrics()
+    # Every video is queued from the start; each waits for the ones before it
+    for i, video in enumerate(videos_to_download):
+        metrics.start_job(i, video['title'])
     
     for i, video in enumerate(videos_to_download, 1):
         print(f"\n{Colors.OKCYAN}{'='*80}{Colors.ENDC}")
@@ -354,69 +570,293 @@ def download_videos(videos_to_download, download_dir):
         print(f"{Colors.OKCYAN}🎵 {video['title'][:70]}{Colors.ENDC}")
         print(f"{Colors.OKCYAN}{'='*80}{Colors.ENDC}")
         
+        # Track progress
+        last_progress = [0]
+        timing = metrics.job(i - 1)
+        timing.mark_started()
+        
+        def on_event(event):
+            timing.observe(event)
+            if event['type'] == 'progress':
+                percent = event['percent']
+                if percent > last_progress[0]:
+                    bar = progress_bar(percent, 100)
+                    print(f"\r{bar} {percent:.1f}%", end='', flush=True)
+                    last_progress[0] = percent
+            elif event['type'] == 'warning':
+                print(f"\n{Colors.WARNING}⚠️  {event['message']}{Colors.ENDC}")
+        
         try:
-            # Prepare command
-            command = ytdlp_cmd + ["--newline"]
-            
-            # Add output template
-            output_template = os.path.join(download_dir, "%(title)s.%(ext)s")
-            command.extend(["-o", output_template])
-            
-            # Add format selection
-            command.extend(["-f", options['format']])
-            
-            # Add audio extraction if needed
-            if options['audio_only']:
-                command.extend(["--extract-audio", "--audio-format", "mp3"])
-            
-            command.append(video['url'])
+            download = engine.create_download(video['url'], download_options, on_event, tuner=tuner)
+            result = download.run()
+            timing.mark_download_finished()
             
-            # Execute download
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Track progress
-            last_progress = 0
-            for line in iter(process.stdout.readline, ''):
-                line = line.strip()
-                if line:
-                    # Extract progress from yt-dlp output
-                    if '[download]' in line and '%' in line:
-                        try:
-                            # Extract percentage
-                            percent_match = re.search(r'(\d+(?:\.\d+)?)%', line)
-                            if percent_match:
-                                percent = float(percent_match.group(1))
-                                if percent > last_progress:
-                                    bar = progress_bar(percent, 100)
-                                    print(f"\r{bar} {percent:.1f}%", end='', flush=True)
-                                    last_progress = percent
-                        except ValueError:
-                            pass
-                    elif any(keyword in line.lower() for keyword in ['error', 'failed', 'unable']):
-                        print(f"\n{Colors.WARNING}⚠️  {line}{Colors.ENDC}")
-            
-            process.wait()
-            
-            if process.returncode == 0:
+            if result['success']:
+                archive.add(video, result['filename'], download_options)
+                if store is not None:
+                    store.add(video, download_options, result['filename'])
+                metrics.finish(i - 1, OUTCOME_COMPLETED)
                 print(f"\n{Colors.OKGREEN}✅ Download completed successfully!{Colors.ENDC}")
                 successful_downloads += 1
             else:
-                print(f"\n{Colors.FAIL}❌ Download failed (Exit Code: {process.returncode}){Colors.ENDC}")
+                metrics.finish(i - 1, OUTCOME_CANCELLED if result['cancelled'] else OUTCOME_FAILED)
+                print(f"\n{Colors.FAIL}❌ Download failed (Exit Code: {result['returncode']}){Colors.ENDC}")
                 failed_downloads += 1
                 
         except KeyboardInterrupt:
+            metrics.finish(i - 1, OUTCOME_CANCELLED)
             print(f"\n{Colors.WARNING}⚠️  Download interrupted by user{Colors.ENDC}")
             break
         except Exception as e:
+            metrics.finish(i - 1, OUTCOME_FAILED)
             print(f"\n{Colors.FAIL}❌ An error occurred during download: {e}{Colors.ENDC}")
             failed_downloads += 1
+        metrics.maybe_export()
+    
+    return successful_downloads, failed_downloads
+
+class MultiProgressRenderer:
+    """Renders one progress line per active download plus an aggregate bar.
+
+    The block is redrawn in place with ANSI cursor movement; messages logged
+    through ``log()`` are printed above it so they scroll normally.
+    """
+
+    def __init__(self, total, stream=None):
+        self.total = total
+        self.stream = stream or sys.stdout
+        self.completed = 0
+        self.active = {}
+        self._lines_drawn = 0
+        self._lock = threading.Lock()
+
+    def start_job(self, job_id, title):
+        with self._lock:
+            self.active[job_id] = {'title': title, 'percent': 0.0, 'speed': "", 'eta': ""}
+
+    def update_job(self, job_id, percent, speed="", eta=""):
+        with self._lock:
+            job = self.active.get(job_id)
+            if job is not None:
+                job.update({'percent': percent, 'speed': speed, 'eta': eta})
+
+    def finish_job(self, job_id):
+        with self._lock:
+            self.active.pop(job_id, None)
+            self.completed += 1
+
+    def log(self, message):
+        """Print a message above the progress block."""
+        with self._lock:
+            self._clear()
+            self.stream.write(message + "\n")
+            self._draw()
+
+    def render(self):
+        with self._lock:
+            self._clear()
+            self._draw()
+
+    def close(self):
+        with self._lock:
+            self._clear()
+            self.stream.flush()
+
+    def _clear(self):
+        if self._lines_drawn:
+            # Move to the start of the block and erase everything below it
+            self.stream.write(f"\033[{self._lines_drawn}F\033[J")
+            self._lines_drawn = 0
+
+    def _draw(self):
+        lines = []
+        for job in self.active.values():
+            title = job['title'][:40] + "..." if len(job['title']) > 43 else job['title']
+            bar = progress_bar(job['percent'], 100, bar_length=20)
+            lines.append(f"{Colors.OKCYAN}📥 {title:<43}{Colors.ENDC} {bar} {job['speed']:>11} {job['eta']:>8}")
+
+        done = self.completed + sum(job['percent'] / 100.0 for job in self.active.values())
+        lines.append(f"{Colors.BOLD}📊 Overall [{self.completed}/{self.total}]{Colors.ENDC} "
+                     f"{progress_bar(done, self.total)}")
+
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._lines_drawn = len(lines)
+
+class RunningDownloads:
+    """Thread-safe set of the download handles in progress, cancelled together on Ctrl+C.
+
+    A job registers its handle before running it. Once ``cancel_all()`` has
+    been called, a handle registered late is cancelled on the spot, so its
+    ``run()`` returns a cancelled result instead of starting to download.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def register(self, job_id, handle):
+        with self._lock:
+            if not self.cancelled:
+                self._handles[job_id] = handle
+                return
+        handle.terminate()
+
+    def unregister(self, job_id):
+        with self._lock:
+            self._handles.pop(job_id, None)
+
+    def cancel_all(self):
+        with self._lock:
+            self.cancelled = True
+            handles = list(self._handles.values())
+        for handle in handles:
+            handle.terminate()
+
+def download_videos_concurrently(videos_to_download, engine, download_options, archive, jobs, tuner=None,
+                                 store=None, metrics=None):
+    """Downloads up to ``jobs`` videos in parallel with a multi-line progress display."""
+    renderer = MultiProgressRenderer(len(videos_to_download))
+    metrics = metrics or JobMetrics()
+    counts_lock = threading.Lock()
+    counts = {'successful': 0, 'failed': 0}
+    running = RunningDownloads()
+    
+    def make_job(job_id, video):
+        timing = metrics.start_job(job_id, video['title'])
+        
+        def on_event(event):
+            timing.observe(event)
+            if event['type'] == 'progress':
+                renderer.update_job(job_id, event['percent'], event['speed'], event['eta'])
+            elif event['type'] == 'warning':
+                renderer.log(f"{Colors.WARNING}⚠️  {video['title'][:40]}: {event['message']}{Colors.ENDC}")
+        
+        def run():
+            renderer.start_job(job_id, video['title'])
+            timing.mark_started()
+            outcome = 'failed'
+            cancelled = False
+            try:
+                download = engine.create_download(video['url'], download_options, on_event, tuner=tuner)
+                running.register(job_id, download)
+                result = download.run()
+                timing.mark_download_finished()
+                cancelled = result['cancelled']
+                if result['success']:
+                    archive.add(video, result['filename'], download_options)
+                    if store is not None:
+                        store.add(video, download_options, result['filename'])
+                    outcome = 'successful'
+                    renderer.log(f"{Colors.OKGREEN}✅ {video['title'][:70]}{Colors.ENDC}")
+                elif not result.get('cancelled'):
+                    renderer.log(f"{Colors.FAIL}❌ {video['title'][:60]} (Exit Code: {result['returncode']}){Colors.ENDC}")
+            except Exception as e:
+                renderer.log(f"{Colors.FAIL}❌ {video['title'][:60]}: {e}{Colors.ENDC}")
+            finally:
+                running.unregister(job_id)
+                with counts_lock:
+                    counts[outcome] += 1
+                if outcome == 'successful':
+                    metrics.finish(job_id, OUTCOME_COMPLETED)
+                else:
+                    metrics.finish(job_id, OUTCOME_CANCELLED if cancelled else OUTCOME_FAILED)
+                metrics.maybe_export()
+                renderer.finish_job(job_id)
+        return run
+    
+    queue = DownloadQueue(max_workers=jobs, ordering=ORDER_FIFO)
+    for job_id, video in enumerate(videos_to_download):
+        queue.submit(job_id, make_job(job_id, video))
+    
+    try:
+        while queue.active_count or queue.pending_count:
+            renderer.render()
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        for job_id in queue.cancel_pending():
+            metrics.finish(job_id, OUTCOME_CANCELLED)
+        running.cancel_all()
+        renderer.log(f"{Colors.WARNING}⚠️  Downloads interrupted by user{Colors.ENDC}")
+        while queue.active_count:
+            time.sleep(0.1)
+    finally:
+        renderer.close()
+    
+    return counts['successful'], counts['failed']
+
+def download_videos(videos_to_download, download_dir, engine_mode=None, jobs=1, skip_archived=True,
+                    fragments=AUTO, max_connections=DEFAULT_MAX_CONNECTIONS, store=None, metrics=None, engine=None):
+    """Downloads the selected videos with enhanced progress tracking.
+    
+    A given ``engine`` is left open for the caller; otherwise one is created
+    from ``engine_mode`` and closed when the downloads are done.
+    """
+    if not videos_to_download:
+        return
+    
+    # Get download options
+    options = get_download_options()
+    download_options = {
+        'output_template': os.path.join(download_dir, "%(title)s.%(ext)s"),
+        'format': options['format'],
+        'audio_only': options['audio_only'],
+        'audio_format': "mp3",
+        'concurrent_fragments': fragments,
+    }
+    
+    # Drop videos that are already in this directory in this format before starting anything
+    archive = DownloadArchive(download_dir)
+    if skip_archived:
+        videos_to_download, already_downloaded = archive.split(videos_to_download, download_options)
+        if already_downloaded:
+            print(f"{Colors.OKCYAN}⏭️  Skipping {len(already_downloaded)} already downloaded videos (use --force to download them again){Colors.ENDC}")
+        if not videos_to_download:
+            print(f"{Colors.OKGREEN}✅ Everything selected is already in {download_dir}{Colors.ENDC}")
+            return
+    
+    linked_count = 0
+    linked_bytes = 0
+    if store is not None and skip_archived:
+        remaining, linked_bytes = link_stored_videos(videos_to_download, store, download_options, download_dir, archive)
+        linked_count = len(videos_to_download) - len(remaining)
+        videos_to_download = remaining
+        if linked_count:
+            print(f"{Colors.OKCYAN}🔗 Linked {linked_count} videos from the media store ({format_bytes(linked_bytes)} not downloaded){Colors.ENDC}")
+        if not videos_to_download:
+            print(f"{Colors.OKGREEN}✅ Everything selected is now in {download_dir}{Colors.ENDC}")
+            return
+    
+    print(f"\n{Colors.HEADER}{'='*80}{Colors.ENDC}")
+    print(f"{Colors.HEADER}{Colors.BOLD}🚀 STARTING DOWNLOADS{Colors.ENDC}")
+    print(f"{Colors.HEADER}{'='*80}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}📂 Download Directory: {download_dir}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}🎯 Format: {options['description']}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}📊 Total Videos: {len(videos_to_download)}{Colors.ENDC}")
+    
+    start_time = time.time()
+    
+    owns_engine = engine is None
+    if owns_engine:
+        engine = create_engine(engine_mode)
+    print(f"{Colors.OKBLUE}⚙️  Engine: {engine.description}{Colors.ENDC}")
+    
+    tuner = FragmentTuner(max_connections=max_connections)
+    metrics = metrics or JobMetrics()
+    
+    try:
+        if jobs > 1:
+            print(f"{Colors.OKBLUE}🔀 Parallel Downloads: {jobs}{Colors.ENDC}")
+            successful_downloads, failed_downloads = download_videos_concurrently(
+                videos_to_download, engine, download_options, archive, jobs, tuner, store, metrics)
+        else:
+            successful_downloads, failed_downloads = download_videos_sequentially(
+                videos_to_download, engine, download_options, archive, tuner, store, metrics)
+    finally:
+        if owns_engine:
+            engine.close()
+        metrics_dir = metrics.export()
     
     # Summary
     end_time = time.time()
@@ -427,10 +867,287 @@ def download_videos(videos_to_download, download_dir):
     print(f"{Colors.HEADER}{'='*80}{Colors.ENDC}")
     print(f"{Colors.OKGREEN}✅ Successful: {successful_downloads}{Colors.ENDC}")
     print(f"{Colors.FAIL}❌ Failed: {failed_downloads}{Colors.ENDC}")
+    if linked_count:
+        print(f"{Colors.OKCYAN}🔗 Linked from media store: {linked_count} ({format_bytes(linked_bytes)} saved){Colors.ENDC}")
     print(f"{Colors.OKCYAN}⏱️  Total Time: {total_time:.1f} seconds{Colors.ENDC}")
     print(f"{Colors.OKBLUE}📂 Files saved to: {download_dir}{Colors.ENDC}")
+    print(f"\n{Colors.BOLD}📈 Where the time went:{Colors.ENDC}")
+    for line in summary_lines(metrics.snapshot())[1:]:
+        print(f"   {line}" if line else "")
+    if metrics_dir is not None:
+        print(f"{Colors.OKBLUE}📈 Metrics: {os.path.join(metrics_dir, PROMETHEUS_FILE_NAME)}{Colors.ENDC}")
     
     input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
 
+def read_url_file(path):
+    """Read URLs from a file (or stdin for '-'), skipping blank lines and comments."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+class BatchReport:
+    """Thread-safe JSONL writer for --batch results; every record is flushed."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record_type, **fields):
+        record = {'type': record_type}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def batch_log(message):
+    """Print a human-readable progress line to stderr."""
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+def load_playlist(url, cache=None, force_refresh=False, engine=None):
+    """Return ``(entries, from_cache)`` for one URL without printing anything.
+    
+    With an ``engine``, the listing runs wherever it runs its downloads.
+    """
+    if cache is not None and not force_refresh:
+        cached = cache.get(url)
+        if cached is not None and cache.is_fresh(cached[1]):
+            return cached[0], True
+    
+    entries = list(engine.iter_playlist_entries(url) if engine is not None else iter_playlist_entries(url))
+    if cache is not None and entries:
+        cache.store(url, entries)
+    return entries, False
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def run_batch(args):
+    """Fetch and download every URL in ``args.batch`` without prompting.
+    
+    Downloads start as soon as each source has been listed, so fetching the
+    next playlist overlaps with downloading the previous one. Returns one of
+    the EXIT_* codes.
+    """
+    try:
+        urls = read_url_file(args.batch)
+    except OSError as e:
+        batch_log(f"❌ Cannot read URL file: {e}")
+        return EXIT_USAGE
+    try:
+        parse_selection(args.select, 0, strict=False)
+    except ValueError as e:
+        batch_log(f"❌ --select: {e}")
+        return EXIT_USAGE
+    if not urls:
+        batch_log("❌ No URLs in the URL file")
+        return EXIT_USAGE
+    
+    if not resolve_toolchain()['ytdlp_command']:
+        batch_log("❌ yt-dlp is not installed or not in your system's PATH")
+        return EXIT_MISSING_TOOLS
+    
+    download_dir = os.path.abspath(args.output or os.getcwd())
+    os.makedirs(download_dir, exist_ok=True)
+    
+    report_path = args.report or os.path.join(
+        download_dir, f"ytpd-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl")
+    report_stream = sys.stdout if report_path == '-' else open(report_path, 'w', encoding='utf-8')
+    report = BatchReport(report_stream)
+    
+    options = resolve_format(args.format)
+    download_options = {
+        'output_template': os.path.join(download_dir, "%(title)s.%(ext)s"),
+        'format': options['format'],
+        'audio_only': options['audio_only'],
+        'audio_format': "mp3",
+        'concurrent_fragments': args.fragments,
+    }
+    tuner = FragmentTuner(max_connections=args.max_connections)
+    jobs = max(1, args.jobs or DEFAULT_MAX_WORKERS)
+    engine = create_engine(args.engine)
+    playlist_cache = None if args.no_cache else PlaylistCache(ttl=args.cache_ttl)
+    archive = DownloadArchive(download_dir)
+    store = None if args.force else open_media_store(args)
+    metrics = JobMetrics(args.metrics_dir)
+    
+    batch_log(f"🚀 {len(urls)} URLs -> {download_dir} ({options['description']}, "
+              f"{jobs} parallel, {engine.description})")
+    if report_path != '-':
+        batch_log(f"📝 Report: {report_path}")
+    
+    counts_lock = threading.Lock()
+    counts = {'completed': 0, 'failed': 0, 'skipped': 0, 'cancelled': 0, 'linked': 0,
+              'sources_failed': 0, 'bytes': 0, 'bytes_saved': 0}
+    running = RunningDownloads()
+    
+    def count(key, amount=1):
+        with counts_lock:
+            counts[key] += amount
+    
+    def make_job(job_id, source, position, video):
+        queued_at = time.time()
+        timing = metrics.start_job(job_id, video['title'])
+        
+        def run():
+            started_at = time.time()
+            timing.mark_started()
+            record = {
+                'source': source,
+                'index': position,
+                'id': video.get('id'),
+                'title': video['title'],
+                'url': video['url'],
+                'format': options['description'],
+                'queued_at': round(queued_at, 3),
+                'started_at': round(started_at, 3),
+                'wait_seconds': round(started_at - queued_at, 3),
+            }
+            try:
+                download = engine.create_download(video['url'], download_options, timing.observe, tuner=tuner)
+                running.register(job_id, download)
+                result = download.run()
+                timing.mark_download_finished()
+                record['returncode'] = result['returncode']
+                if result['success']:
+                    archived = archive.add(video, result['filename'], download_options)
+                    if store is not None:
+                        store.add(video, download_options, result['filename'])
+                    record.update(status='completed', path=archived['path'], bytes=archived['size'])
+                    count('bytes', archived['size'] or 0)
+                elif result['cancelled']:
+                    record['status'] = 'cancelled'
+                else:
+                    record.update(status='failed', error=result['error'])
+            except Exception as e:
+                record.update(status='failed', error=str(e))
+            finally:
+                running.unregister(job_id)
+            
+            finished_at = time.time()
+            record.update(finished_at=round(finished_at, 3),
+                          download_seconds=round(finished_at - started_at, 3))
+            timings = metrics.finish(job_id, record['status'], record.get('bytes'))
+            if timings is not None:
+                record.update({f'{phase}_seconds': round(timings[phase], 3)
+                               for phase in ('extraction', 'transfer', 'postprocess')})
+                record.update(average_speed=timings['average_speed'] and round(timings['average_speed']),
+                              peak_speed=timings['peak_speed'] and round(timings['peak_speed']))
+            metrics.maybe_export()
+            count(record['status'])
+            report.write('item', **record)
+            if record['status'] == 'completed':
+                batch_log(f"✅ {video['title'][:70]}")
+            elif record['status'] == 'failed':
+                batch_log(f"❌ {video['title'][:60]}: {record.get('error') or 'download failed'}")
+        return run
+    
+    def fetch(source):
+        fetch_started = time.time()
+        entries, from_cache = load_playlist(source, playlist_cache, args.refresh, engine)
+        return entries, from_cache, time.time() - fetch_started
+    
+    queue = DownloadQueue(max_workers=jobs, ordering=ORDER_FIFO)
+    submitted = {}
+    merger = EntryMerger()
+    start_time = time.time()
+    interrupted = False
+    previous_sigterm = signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    
+    try:
+        # Sources are listed concurrently but handled in the order given
+        for source, fetched, error in fetch_playlists(urls, fetch, max_workers=args.fetch_jobs):
+            if error is not None:
+                fetched = ([], False, 0.0)
+                batch_log(f"❌ {source}: {error}")
+            entries, from_cache, fetch_seconds = fetched
+            
+            selected = [(i, entries[i - 1]) for i in parse_selection(args.select, len(entries), strict=False)]
+            report.write('source', source=source, status='fetched' if entries else 'fetch_failed',
+                         videos=len(entries), selected=len(selected), from_cache=from_cache,
+                         fetch_seconds=round(fetch_seconds, 3))
+            if not entries:
+                count('sources_failed')
+                batch_log(f"❌ No videos found at {source}")
+                continue
+            batch_log(f"🔍 {source}: {len(entries)} videos, {len(selected)} selected"
+                      f"{' (cached)' if from_cache else ''}")
+            
+            for position, video in selected:
+                # The same video listed by several sources is only downloaded once
+                if not merger.add([video]):
+                    continue
+                
+                if not args.force and archive.is_downloaded(video, download_options):
+                    record = archive.get(video, download_options)
+                    report.write('item', source=source, index=position, id=video.get('id'),
+                                 title=video['title'], url=video['url'], status='skipped',
+                                 path=record.get('path'), bytes=record.get('size'))
+                    count('skipped')
+                    continue
+                
+                linked = store.link_into(video, download_options, download_dir) if store is not None else None
+                if linked is not None:
+                    archived = archive.add(video, linked, download_options)
+                    report.write('item', source=source, index=position, id=video.get('id'),
+                                 title=video['title'], url=video['url'], status='linked',
+                                 path=archived['path'], bytes=archived['size'])
+                    count('linked')
+                    count('bytes_saved', archived['size'] or 0)
+                    continue
+                
+                job_id = len(merger.entries)
+                submitted[job_id] = (source, position, video)
+                queue.submit(job_id, make_job(job_id, source, position, video))
+        
+        while queue.active_count or queue.pending_count:
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        interrupted = True
+        batch_log("⚠️  Interrupted, cancelling downloads...")
+        for job_id in queue.cancel_pending():
+            source, position, video = submitted[job_id]
+            report.write('item', source=source, index=position, id=video.get('id'),
+                         title=video['title'], url=video['url'], status='cancelled')
+            metrics.finish(job_id, OUTCOME_CANCELLED)
+            count('cancelled')
+        running.cancel_all()
+        while queue.active_count:
+            time.sleep(0.1)
+    finally:
+        signal.signal(signal.SIGTERM, previous_sigterm)
+        engine.close()
+        metrics.export()
+    
+    if interrupted:
+        exit_code = EXIT_INTERRUPTED
+    elif counts['failed'] == 0 and counts['sources_failed'] == 0:
+        exit_code = EXIT_OK
+    elif counts['completed'] + counts['skipped'] + counts['linked'] == 0:
+        exit_code = EXIT_ALL_FAILED
+    else:
+        exit_code = EXIT_SOME_FAILED
+    
+    elapsed = time.time() - start_time
+    report.write('summary', sources=len(urls), completed=counts['completed'], failed=counts['failed'],
+                 skipped=counts['skipped'], cancelled=counts['cancelled'], duplicates=merger.duplicates,
+                 linked=counts['linked'], bytes_saved=counts['bytes_saved'],
+                 sources_failed=counts['sources_failed'], bytes=counts['bytes'],
+                 elapsed_seconds=round(elapsed, 3), exit_code=exit_code)
+    if report_stream is not sys.stdout:
+        report_stream.close()
+    
+    linked_note = (f"{counts['linked']} linked from the media store ({format_bytes(counts['bytes_saved'])}), "
+                   if store is not None else "")
+    batch_log(f"📊 {counts['completed']} downloaded, {counts['skipped']} already present, {linked_note}"
+              f"{counts['failed']} failed, {counts['sources_failed']} sources failed "
+              f"in {elapsed:.1f}s (exit {exit_code})")
+    return exit_code
+
 if __name__ == "__main__":
+    # Worker processes of the workers engine re-enter a frozen build here
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
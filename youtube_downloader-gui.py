@@ -1,15 +1,43 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 import customtkinter as ctk
-import subprocess
 import threading
-import json
+import multiprocessing
 import os
-import sys
-import re
 import time
 from datetime import datetime
 
+from ytdlp_engine import create_engine
+from toolchain import get_ytdlp_command
+from download_queue import DEFAULT_MAX_WORKERS, ORDER_FIFO, ORDER_PRIORITY, DownloadQueue
+from video_list import VideoRow, VirtualVideoList
+from ui_updates import UI_REFRESH_MS, UIUpdateBus
+from playlist_cache import PlaylistCache
+from download_archive import DownloadArchive
+from bandwidth import BANDWIDTH_PRESETS, BandwidthBudget
+from concurrency_controller import AdaptiveConcurrency
+from fragment_tuning import AUTO, FragmentTuner
+from media_store import STORE_ENV_VAR, MediaStore, format_bytes
+from postprocessing import AudioExtraction, default_postprocess_workers, split_postprocessing
+from job_metrics import (JobMetrics, OUTCOME_CANCELLED, OUTCOME_COMPLETED, OUTCOME_FAILED, OUTCOME_LINKED,
+                         PROMETHEUS_FILE_NAME, summary_lines)
+from job_journal import (JobJournal, STATE_QUEUED, STATE_RUNNING, STATE_COMPLETED,
+                         STATE_FAILED, STATE_CANCELLED)
+from job_state import (EVENT_CANCELLED, EVENT_COMPLETED, EVENT_FAILED, EVENT_STARTED, STATE_POSTPROCESSING,
+                       JobStateModel)
+
+# Streamed playlist entries are handed to the UI thread in batches of this size,
+# or sooner if this many seconds pass without a full batch
+FETCH_BATCH_SIZE = 25
+FETCH_BATCH_INTERVAL = 0.2
+
+# How often the adaptive concurrency controller is sampled while jobs run, in ms
+CONTROLLER_SAMPLE_MS = 500
+
+# When set, the app closes as soon as its window is drawn; the build script
+# launches packaged builds this way to time their startup
+EXIT_AFTER_STARTUP_ENV_VAR = "YTPD_EXIT_AFTER_STARTUP"
+
 # Set the appearance mode and color theme
 ctk.set_appearance_mode("dark")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
@@ -29,12 +57,58 @@ class YouTubeDownloaderApp(ctk.CTk):
         
         # --- Variables ---
         self.download_processes = {}
-        self.video_widgets = {}
+        self.video_rows = {}
         self.is_fetching = False
+        self.fetch_generation = 0
+        self.queue_new_rows = False
+        self.video_info_list = []
         self.download_path = os.path.join(os.path.expanduser("~"), "Downloads")
         self.total_videos = 0
-        self.completed_downloads = 0
-        self.failed_downloads = 0
+        self.engine = create_engine()
+        self.playlist_cache = PlaylistCache()
+        self.archive = DownloadArchive(self.download_path)
+        self.journal = JobJournal()
+        self.resume_options = {}
+        # Resumed jobs stay in the directory they were started in
+        self.job_paths = {}
+        self.job_archives = {}
+        self.bandwidth = BandwidthBudget()
+        self.download_weights = {}
+        # Set while "Parallel Downloads" is "Auto"
+        self.concurrency_controller = None
+        self.fragment_tuner = FragmentTuner()
+        # Opened the first time "Share Across Playlists" is used
+        self.media_store = None
+        self.ui_updates = UIUpdateBus(
+            schedule=lambda: self.after(UI_REFRESH_MS, self._apply_ui_updates)
+        )
+        # Job states and counters; widgets are refreshed only when a job changes,
+        # with changes merged over UI_REFRESH_MS like the row updates
+        self.jobs = JobStateModel(schedule=lambda: self.after(UI_REFRESH_MS, self.jobs.dispatch))
+        self.jobs.subscribe(self._on_job_events)
+        self.download_queue = DownloadQueue(
+            max_workers=DEFAULT_MAX_WORKERS,
+            ordering=ORDER_PRIORITY,
+            on_start=self.jobs.started,
+            on_finish=lambda url: self._on_job_thread_exit(url, STATE_RUNNING)
+        )
+        # Audio extraction runs here, so download slots free up once the bytes are on disk
+        self.postprocess_queue = DownloadQueue(
+            max_workers=default_postprocess_workers(),
+            on_finish=lambda url: self._on_job_thread_exit(url, STATE_POSTPROCESSING)
+        )
+        self.postprocess_jobs = {}
+        # Cancels for jobs that hold a slot but have not registered their handle yet
+        self.cancel_requests = set()
+        self._cancel_lock = threading.Lock()
+        # Per-job phase timings, exported to the data directory for monitoring
+        self.metrics = JobMetrics()
+        self.metrics_window = None
+        # Last values written by the job event handlers, to skip redundant redraws
+        self._button_states = None
+        self._job_status = None
+        self._stats_text = None
+        self._sampling_concurrency = False
         
         # --- Styling ---
         self.setup_styles()
@@ -42,8 +116,19 @@ class YouTubeDownloaderApp(ctk.CTk):
         # --- GUI Elements ---
         self.create_widgets()
         
-        # --- Start monitoring downloads ---
-        self.after(100, self.monitor_downloads)
+        # --- Offer to resume jobs interrupted by a crash or close ---
+        self.after(300, self.offer_resume)
+        
+        # --- Start worker processes (workers engine) once the window is up ---
+        self.after(500, self.engine.warm_up)
+
+    @property
+    def completed_downloads(self):
+        return self.jobs.counts()[STATE_COMPLETED]
+
+    @property
+    def failed_downloads(self):
+        return self.jobs.counts()[STATE_FAILED]
 
     def center_window(self):
         """Center the window on the screen."""
@@ -220,6 +305,62 @@ class YouTubeDownloaderApp(ctk.CTk):
         )
         self.quality_dropdown.pack(anchor="w", pady=(5, 0))
         
+        # Queue settings
+        queue_frame = ctk.CTkFrame(options_content, fg_color="transparent")
+        queue_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        ctk.CTkLabel(queue_frame, text="Parallel Downloads:", font=ctk.CTkFont(size=12)).pack(anchor="w")
+        self.concurrency_var = ctk.StringVar(value=str(DEFAULT_MAX_WORKERS))
+        self.concurrency_dropdown = ctk.CTkOptionMenu(
+            queue_frame,
+            values=["Auto", "1", "2", "3", "4", "6", "8"],
+            variable=self.concurrency_var,
+            command=self.on_concurrency_changed,
+            width=80
+        )
+        self.concurrency_dropdown.pack(anchor="w", pady=(5, 0))
+        
+        order_frame = ctk.CTkFrame(options_content, fg_color="transparent")
+        order_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        ctk.CTkLabel(order_frame, text="Queue Order:", font=ctk.CTkFont(size=12)).pack(anchor="w")
+        self.queue_order_var = ctk.StringVar(value="Clicked First")
+        self.queue_order_dropdown = ctk.CTkOptionMenu(
+            order_frame,
+            values=["Clicked First", "Playlist Order"],
+            variable=self.queue_order_var,
+            command=self.on_queue_order_changed,
+            width=140
+        )
+        self.queue_order_dropdown.pack(anchor="w", pady=(5, 0))
+        
+        bandwidth_frame = ctk.CTkFrame(options_content, fg_color="transparent")
+        bandwidth_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        ctk.CTkLabel(bandwidth_frame, text="Bandwidth Limit:", font=ctk.CTkFont(size=12)).pack(anchor="w")
+        self.bandwidth_var = ctk.StringVar(value="Unlimited")
+        self.bandwidth_dropdown = ctk.CTkOptionMenu(
+            bandwidth_frame,
+            values=list(BANDWIDTH_PRESETS),
+            variable=self.bandwidth_var,
+            command=self.on_bandwidth_changed,
+            width=120
+        )
+        self.bandwidth_dropdown.pack(anchor="w", pady=(5, 0))
+        
+        fragments_frame = ctk.CTkFrame(options_content, fg_color="transparent")
+        fragments_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        ctk.CTkLabel(fragments_frame, text="Connections/Video:", font=ctk.CTkFont(size=12)).pack(anchor="w")
+        self.fragments_var = ctk.StringVar(value="Auto")
+        self.fragments_dropdown = ctk.CTkOptionMenu(
+            fragments_frame,
+            values=["Auto", "1", "2", "4", "8"],
+            variable=self.fragments_var,
+            width=80
+        )
+        self.fragments_dropdown.pack(anchor="w", pady=(5, 0))
+        
         # Global audio only option
         audio_frame = ctk.CTkFrame(options_content, fg_color="transparent")
         audio_frame.pack(side=tk.RIGHT, padx=(20, 0))
@@ -231,7 +372,16 @@ class YouTubeDownloaderApp(ctk.CTk):
             variable=self.global_audio_var,
             font=ctk.CTkFont(size=12)
         )
-        self.global_audio_checkbox.pack(pady=10)
+        self.global_audio_checkbox.pack(pady=(10, 5))
+        
+        self.store_var = ctk.BooleanVar(value=bool(os.environ.get(STORE_ENV_VAR)))
+        self.store_checkbox = ctk.CTkCheckBox(
+            audio_frame,
+            text="Share Across Playlists",
+            variable=self.store_var,
+            font=ctk.CTkFont(size=12)
+        )
+        self.store_checkbox.pack(pady=(0, 10))
 
     def create_status_section(self, parent):
         """Create the status display section."""
@@ -268,13 +418,14 @@ class YouTubeDownloaderApp(ctk.CTk):
         )
         list_label.pack(anchor="w", pady=(0, 10))
         
-        # Scrollable frame for videos with custom styling
-        self.video_list_frame = ctk.CTkScrollableFrame(
+        # Virtualized list: only the rows in view have widgets
+        self.video_list = VirtualVideoList(
             parent,
-            fg_color=self.colors['surface'],
-            scrollbar_button_color=self.colors['primary']
+            colors=self.colors,
+            on_download=self.start_single_download,
+            on_cancel=self.cancel_single_download
         )
-        self.video_list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+        self.video_list.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
 
     def create_control_buttons(self, parent):
         """Create the main control buttons."""
@@ -324,6 +475,16 @@ class YouTubeDownloaderApp(ctk.CTk):
         )
         self.clear_button.pack(side=tk.LEFT, padx=(0, 10))
 
+        self.metrics_button = ctk.CTkButton(
+            right_buttons,
+            text="📈 Metrics",
+            command=self.show_metrics,
+            height=40,
+            width=100,
+            font=ctk.CTkFont(size=13)
+        )
+        self.metrics_button.pack(side=tk.LEFT, padx=(0, 10))
+
         self.refresh_button = ctk.CTkButton(
             right_buttons,
             text="🔄 Refresh",
@@ -358,52 +519,168 @@ class YouTubeDownloaderApp(ctk.CTk):
         )
         copyright_label.pack(side=tk.RIGHT)
 
+    def offer_resume(self):
+        """Offers to re-queue the jobs the journal says were never finished."""
+        jobs = self.journal.unfinished()
+        if not jobs:
+            self.journal.reset()
+            return
+        
+        partial_count = sum(1 for job in jobs if job['was_running'])
+        response = messagebox.askyesno(
+            "Resume Downloads",
+            f"{len(jobs)} downloads from your last session did not finish"
+            f"{f' ({partial_count} were partially downloaded)' if partial_count else ''}.\n\n"
+            f"Resume them now?"
+        )
+        # Each launch starts a fresh journal; resumed jobs are recorded again
+        self.journal.reset()
+        if not response:
+            return
+        
+        # Downloads go back to the directory they were started in
+        for job in jobs:
+            if job.get('download_path'):
+                self.job_paths[job['job']] = job['download_path']
+            # Also what the archive is checked against: the format the job was started in
+            self.resume_options[job['job']] = job['options']
+        
+        self._append_videos([job['video'] for job in jobs], self.fetch_generation)
+        for job in jobs:
+            if self.video_rows[job['job']].archived:
+                self.resume_options.pop(job['job'], None)
+                continue
+            self.start_single_download(job['job'], priority=job.get('priority', 0))
+        self.display_videos(note="(resumed from last session)")
+
+    def on_concurrency_changed(self, value):
+        """Apply a new parallel download limit to the queue, or hand it to the controller."""
+        if value == "Auto":
+            self.concurrency_controller = AdaptiveConcurrency(initial=self.download_queue.max_workers)
+            self.download_queue.set_max_workers(self.concurrency_controller.limit)
+            self._start_concurrency_sampling()
+        else:
+            self.concurrency_controller = None
+            self.download_queue.set_max_workers(int(value))
+        self.update_stats_display()
+
+    def on_bandwidth_changed(self, value):
+        """Apply a new global bandwidth limit; running downloads adapt immediately."""
+        self.bandwidth.set_limit(BANDWIDTH_PRESETS[value])
+
+    def on_queue_order_changed(self, value):
+        """Switch the queue between priority and FIFO ordering."""
+        ordering = ORDER_PRIORITY if value == "Clicked First" else ORDER_FIFO
+        self.download_queue.set_ordering(ordering)
+
+    def has_pending_work(self):
+        """Return True if any download or conversion is running or waiting in a queue."""
+        return self.jobs.active_count > 0
+
     def select_download_path(self):
         """Opens a file dialog to select the download directory."""
         selected_path = filedialog.askdirectory(title="Select Download Directory")
         if selected_path:
             self.download_path = selected_path
             self.path_label.configure(text=f"📂 {self.download_path}")
+            # Each directory has its own archive; re-check the loaded rows against it
+            self.archive = DownloadArchive(self.download_path)
+            self._apply_archive(list(self.video_rows.values()))
 
     def clear_video_list(self):
         """Clear the video list."""
-        if self.download_processes:
+        if self.has_pending_work():
             if messagebox.askyesno("Confirm Clear", "There are active downloads. Are you sure you want to clear the list?"):
                 self.cancel_all()
             else:
                 return
         
-        for widget in self.video_list_frame.winfo_children():
-            widget.destroy()
-        
-        self.video_widgets.clear()
+        self.video_list.clear()
+        self.video_rows.clear()
+        self.job_paths.clear()
         self.download_processes.clear()
         self.video_info_list = []
+        self.queue_new_rows = False
+        # Drop any batches still in flight from a running fetch
+        self.fetch_generation += 1
         self.total_videos = 0
-        self.completed_downloads = 0
-        self.failed_downloads = 0
+        self.jobs.reset_finished()
         
         self.status_label.configure(text="📋 List cleared - Ready for new playlist")
         self.update_stats_display()
-        self.download_all_button.configure(state=tk.DISABLED)
+        self._check_global_buttons_state()
 
     def refresh_playlist(self):
-        """Refresh the current playlist."""
+        """Refresh the current playlist, bypassing the playlist cache."""
         url = self.url_entry.get()
         if url:
             self.clear_video_list()
-            self.start_fetch_thread()
+            self.start_fetch_thread(force_refresh=True)
         else:
             messagebox.showwarning("No URL", "Please enter a playlist URL first.")
 
     def update_stats_display(self):
         """Update the statistics display."""
         if self.total_videos > 0:
-            self.stats_label.configure(
-                text=f"Total: {self.total_videos} | ✅ {self.completed_downloads} | ❌ {self.failed_downloads} | 🔄 {len(self.download_processes)}"
-            )
+            counts = self.jobs.counts()
+            stats_text = f"Total: {self.total_videos} | ✅ {counts[STATE_COMPLETED]} | ❌ {counts[STATE_FAILED]} | 🔄 {counts[STATE_RUNNING]} | ⏳ {counts[STATE_QUEUED]}"
+            postprocess = self.postprocess_queue.metrics()
+            if postprocess['started'] or postprocess['pending']:
+                stats_text += f" | 🎵 {postprocess['active']} + {postprocess['pending']} queued"
+            if self.ui_updates.coalesced:
+                stats_text += f" | ⚡ {self.ui_updates.coalesced} merged"
+            if self.media_store is not None:
+                stats_text += f" | 🔗 {format_bytes(self.media_store.report()['bytes_saved'])} saved"
+            if self.concurrency_controller is not None:
+                trend, reason = self.concurrency_controller.decision
+                stats_text += f" | 🤖 {self.concurrency_controller.limit} {trend} {reason}"
         else:
-            self.stats_label.configure(text="Ready")
+            stats_text = "Ready"
+        if stats_text != self._stats_text:
+            self._stats_text = stats_text
+            self.stats_label.configure(text=stats_text)
+
+    def show_metrics(self):
+        """Opens the live job metrics window, or raises it if it is already open."""
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.focus()
+            return
+        
+        window = ctk.CTkToplevel(self)
+        window.title("Job Metrics")
+        window.geometry("620x400")
+        self.metrics_text = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Courier", size=12), wrap="none")
+        self.metrics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        ctk.CTkButton(
+            window,
+            text="💾 Export Now",
+            command=self.export_metrics,
+            height=32,
+            width=140
+        ).pack(pady=(0, 10))
+        self.metrics_window = window
+        self._refresh_metrics_view()
+
+    def _refresh_metrics_view(self):
+        """Redraws the metrics window; called when it opens and whenever a job finishes."""
+        window = self.metrics_window
+        if window is None or not window.winfo_exists():
+            self.metrics_window = None
+            return
+        
+        lines = summary_lines(self.metrics.snapshot())
+        lines += ["", f"Exported to: {os.path.join(self.metrics.directory, PROMETHEUS_FILE_NAME)} (and .json)"]
+        self.metrics_text.configure(state=tk.NORMAL)
+        self.metrics_text.delete("1.0", tk.END)
+        self.metrics_text.insert("1.0", "\n".join(lines))
+        self.metrics_text.configure(state=tk.DISABLED)
+
+    def export_metrics(self):
+        """Writes the metrics files now."""
+        if self.metrics.export() is None:
+            messagebox.showerror("Export Failed", f"Could not write metrics to:\n{self.metrics.directory}")
+        else:
+            self.status_label.configure(text=f"📈 Metrics exported to {self.metrics.directory}")
 
     def create_context_menu(self):
         """Creates and binds the right-click context menu for the URL entry."""
@@ -432,7 +709,7 @@ class YouTubeDownloaderApp(ctk.CTk):
             # Handle cases where clipboard is empty or non-text content
             pass
 
-    def start_fetch_thread(self):
+    def start_fetch_thread(self, force_refresh=False):
         """Initiates fetching playlist titles in a separate thread."""
         if self.is_fetching:
             return
@@ -451,71 +728,69 @@ class YouTubeDownloaderApp(ctk.CTk):
         self.load_button.configure(state=tk.DISABLED, text="🔄 Loading...")
         self.status_label.configure(text="🔍 Analyzing playlist structure...")
         
-        # Clear previous video widgets
-        for widget in self.video_list_frame.winfo_children():
-            widget.destroy()
-        self.video_widgets.clear()
+        # Clear previous video rows
+        self.video_list.clear()
+        self.video_rows.clear()
+        self.job_paths.clear()
+        self.video_info_list = []
+        self.total_videos = 0
+        self.jobs.reset_finished()
+        self.queue_new_rows = False
+        self.fetch_generation += 1
 
-        fetch_thread = threading.Thread(target=self.fetch_playlist_titles, args=(url,))
+        fetch_thread = threading.Thread(
+            target=self.fetch_playlist_titles,
+            args=(url, self.fetch_generation, force_refresh)
+        )
         fetch_thread.daemon = True
         fetch_thread.start()
 
     def get_ytdlp_command(self):
         """Get the appropriate yt-dlp command based on installation method."""
+        return get_ytdlp_command()
+
+    def fetch_playlist_titles(self, url, generation, force_refresh=False):
+        """Loads a playlist from the cache when possible, otherwise streams it from yt-dlp."""
         try:
-            # Try using yt-dlp as a command
-            subprocess.run(["yt-dlp", "--version"], 
-                          check=True, 
-                          stdout=subprocess.PIPE, 
-                          stderr=subprocess.PIPE)
-            return ["yt-dlp"]
-        except (FileNotFoundError, subprocess.CalledProcessError):
-            # Fall back to using Python module
-            return [sys.executable, "-m", "yt_dlp"]
-
-    def fetch_playlist_titles(self, url):
-        """Fetches video titles and URLs from a playlist using yt-dlp with enhanced error handling."""
-        try:
-            ytdlp_cmd = self.get_ytdlp_command()
-            command = ytdlp_cmd + [
-                "--flat-playlist", 
-                "-j", 
-                "--no-warnings",
-                "--ignore-errors",
-                url
-            ]
+            cached = None if force_refresh else self.playlist_cache.get(url)
+            if cached is None:
+                entries, skipped = self._stream_playlist_entries(url, generation)
+                if entries:
+                    self.playlist_cache.store(url, entries)
+                self.after(0, lambda: self.display_videos(skipped, generation))
+                return
+            
+            cached_entries, age = cached
+            self.after(0, lambda: self._append_videos(cached_entries, generation))
+            
+            if self.playlist_cache.is_fresh(age):
+                note = f"(cached {self.format_age(age)} ago - use Refresh to reload)"
+                self.after(0, lambda: self.display_videos(0, generation, note))
+                return
             
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                universal_newlines=True
-            )
-
-            self.video_info_list = []
-            error_count = 0
+            # Stale: keep showing the cached rows while re-enumerating in the background
+            self.after(0, lambda: self.load_button.configure(text="🔄 Refreshing..."))
+            stats = {}
+            fresh_entries = []
+            for entry in self.engine.iter_playlist_entries(url, stats):
+                if generation != self.fetch_generation:
+                    return
+                fresh_entries.append(entry)
             
-            for line in iter(process.stdout.readline, ''):
-                if line.strip():
-                    try:
-                        video_json = json.loads(line)
-                        if 'title' in video_json and 'url' in video_json:
-                            self.video_info_list.append({
-                                'title': video_json['title'],
-                                'url': video_json['url'],
-                                'duration': video_json.get('duration', 'Unknown'),
-                                'uploader': video_json.get('uploader', 'Unknown'),
-                                'view_count': video_json.get('view_count', 0)
-                            })
-                    except json.JSONDecodeError:
-                        error_count += 1
-                        continue
+            if not fresh_entries:
+                # Most likely a network problem; keep the cached copy
+                note = f"(cached {self.format_age(age)} ago - refresh failed)"
+                self.after(0, lambda: self.display_videos(0, generation, note))
+                return
             
-            process.wait()
+            changes = self.playlist_cache.store(url, fresh_entries)
+            known_urls = {entry['url'] for entry in cached_entries}
+            added = [entry for entry in fresh_entries if entry['url'] not in known_urls]
+            if added:
+                self.after(0, lambda: self._append_videos(added, generation))
             
-            # Schedule UI updates on main thread
-            self.after(0, lambda: self.display_videos(error_count))
+            note = f"(refreshed: {changes['added']} new, {changes['removed']} removed)"
+            self.after(0, lambda: self.display_videos(stats['skipped'], generation, note))
 
         except FileNotFoundError:
             self.after(0, lambda: messagebox.showerror(
@@ -523,11 +798,47 @@ class YouTubeDownloaderApp(ctk.CTk):
                 "yt-dlp is not installed or not in your system's PATH.\n\nPlease install it using:\npip install yt-dlp\n\nOr run the setup script: python setup.py"
             ))
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch playlist:\n{str(e)}"))
+            # ``e`` is unbound once the except block ends, before the callback runs
+            message = str(e)
+            self.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch playlist:\n{message}"))
         finally:
             self.is_fetching = False
             self.after(0, lambda: self.load_button.configure(state=tk.NORMAL, text="🔍 Load Playlist"))
 
+    def _stream_playlist_entries(self, url, generation):
+        """Streams entries to the UI in batches; returns (entries, skipped), entries None if superseded."""
+        stats = {}
+        entries = []
+        batch = []
+        last_flush = time.monotonic()
+        
+        for entry in self.engine.iter_playlist_entries(url, stats):
+            if generation != self.fetch_generation:
+                # The list was cleared or another playlist was loaded
+                return None, stats['skipped']
+            
+            entries.append(entry)
+            batch.append(entry)
+            if len(batch) >= FETCH_BATCH_SIZE or time.monotonic() - last_flush >= FETCH_BATCH_INTERVAL:
+                self.after(0, lambda b=batch: self._append_videos(b, generation))
+                batch = []
+                last_flush = time.monotonic()
+        
+        if batch:
+            self.after(0, lambda b=batch: self._append_videos(b, generation))
+        
+        return entries, stats['skipped']
+
+    def format_age(self, seconds):
+        """Format an age in seconds as a short human-readable string."""
+        if seconds < 60:
+            return f"{int(seconds)}s"
+        if seconds < 3600:
+            return f"{int(seconds // 60)} min"
+        if seconds < 86400:
+            return f"{seconds / 3600:.1f} h"
+        return f"{seconds / 86400:.1f} days"
+
     def format_duration(self, duration):
         """Format duration from seconds to readable format."""
         if duration == 'Unknown' or duration is None:
@@ -562,362 +873,372 @@ class YouTubeDownloaderApp(ctk.CTk):
         except (ValueError, TypeError):
             return "Unknown"
 
-    def display_videos(self, error_count=0):
-        """Displays fetched video titles with enhanced UI and download options."""
+    def _append_videos(self, videos, generation):
+        """Adds a batch of streamed entries to the list; rows are usable as soon as they appear."""
+        if generation != self.fetch_generation:
+            return
+        
+        first_index = len(self.video_info_list) + 1
+        self.video_info_list.extend(videos)
+        self.total_videos = len(self.video_info_list)
+        
+        rows = [self._create_video_row(i, video_info) for i, video_info in enumerate(videos, first_index)]
+        self._apply_archive(rows)
+        self.video_list.append_rows(rows)
+        
+        self.status_label.configure(text=f"🔍 Loading playlist... {self.total_videos} videos found so far")
+        self.update_stats_display()
+        self._check_global_buttons_state()
+        
+        # "Download All" pressed mid-fetch also covers rows that arrive later
+        if self.queue_new_rows:
+            for row in rows:
+                if not row.archived:
+                    self.start_single_download(row.url, priority=0)
+
+    def display_videos(self, error_count=0, generation=None, note=None):
+        """Finishes a streamed fetch by summarising the loaded playlist."""
+        if generation is not None and generation != self.fetch_generation:
+            return
+        
+        self.queue_new_rows = False
         if self.video_info_list:
-            self.total_videos = len(self.video_info_list)
-            self.completed_downloads = 0
-            self.failed_downloads = 0
-            
             status_text = f"✅ Found {len(self.video_info_list)} videos. Ready to download."
             if error_count > 0:
                 status_text += f" ({error_count} entries skipped)"
+            if note:
+                status_text += f" {note}"
             
             self.status_label.configure(text=status_text)
             self.update_stats_display()
-            self.download_all_button.configure(state=tk.NORMAL)
-            
-            for i, video_info in enumerate(self.video_info_list, 1):
-                video_url = video_info['url']
-                
-                # Main video frame with enhanced styling
-                video_frame = ctk.CTkFrame(
-                    self.video_list_frame, 
-                    height=100,
-                    fg_color=self.colors['background'],
-                    border_width=1,
-                    border_color="#404040"
-                )
-                video_frame.pack(fill=tk.X, pady=5, padx=5)
-                video_frame.pack_propagate(False)
-                
-                # Left section - Video info
-                info_frame = ctk.CTkFrame(video_frame, fg_color="transparent")
-                info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
-                
-                # Video number and title
-                title_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-                title_frame.pack(fill=tk.X, anchor="w")
-                
-                number_label = ctk.CTkLabel(
-                    title_frame,
-                    text=f"{i:02d}.",
-                    font=ctk.CTkFont(size=12, weight="bold"),
-                    text_color=self.colors['primary'],
-                    width=30
-                )
-                number_label.pack(side=tk.LEFT)
-                
-                title_text = video_info['title'][:80] + "..." if len(video_info['title']) > 80 else video_info['title']
-                title_label = ctk.CTkLabel(
-                    title_frame,
-                    text=title_text,
-                    font=ctk.CTkFont(size=12, weight="bold"),
-                    anchor="w"
-                )
-                title_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
-                
-                # Video details
-                details_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-                details_frame.pack(fill=tk.X, anchor="w", pady=(5, 0))
-                
-                duration = self.format_duration(video_info.get('duration'))
-                uploader = video_info.get('uploader', 'Unknown')[:20] + "..." if len(video_info.get('uploader', 'Unknown')) > 20 else video_info.get('uploader', 'Unknown')
-                views = self.format_view_count(video_info.get('view_count'))
-                
-                details_text = f"⏱️ {duration} | 👤 {uploader} | 👀 {views} views"
-                details_label = ctk.CTkLabel(
-                    details_frame,
-                    text=details_text,
-                    font=ctk.CTkFont(size=10),
-                    text_color="gray",
-                    anchor="w"
-                )
-                details_label.pack(anchor="w")
-                
-                # Progress and status
-                progress_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-                progress_frame.pack(fill=tk.X, anchor="w", pady=(5, 0))
-                
-                status_label = ctk.CTkLabel(
-                    progress_frame,
-                    text="Ready",
-                    font=ctk.CTkFont(size=10),
-                    anchor="w"
-                )
-                status_label.pack(anchor="w")
-                
-                progress_bar = ctk.CTkProgressBar(
-                    progress_frame,
-                    height=8,
-                    progress_color=self.colors['primary']
-                )
-                progress_bar.set(0)
-                progress_bar.pack(fill=tk.X, pady=(2, 0))
-                
-                # Right section - Controls
-                controls_frame = ctk.CTkFrame(video_frame, fg_color="transparent", width=200)
-                controls_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
-                controls_frame.pack_propagate(False)
-                
-                # Options
-                options_frame = ctk.CTkFrame(controls_frame, fg_color="transparent")
-                options_frame.pack(fill=tk.X)
-                
-                # Audio only checkbox
-                audio_only_var = ctk.BooleanVar(value=False)
-                audio_checkbox = ctk.CTkCheckBox(
-                    options_frame,
-                    text="Audio Only (MP3)",
-                    variable=audio_only_var,
-                    font=ctk.CTkFont(size=10)
-                )
-                audio_checkbox.pack(anchor="w", pady=(0, 5))
-                
-                # Quality selection for individual video
-                quality_var = ctk.StringVar(value="Best")
-                quality_option = ctk.CTkOptionMenu(
-                    options_frame,
-                    values=["Best", "1080p", "720p", "480p"],
-                    variable=quality_var,
-                    width=120,
-                    height=25,
-                    font=ctk.CTkFont(size=10)
-                )
-                quality_option.pack(anchor="w", pady=(0, 10))
-                
-                # Buttons
-                button_frame = ctk.CTkFrame(controls_frame, fg_color="transparent")
-                button_frame.pack(fill=tk.X)
-                
-                download_button = ctk.CTkButton(
-                    button_frame,
-                    text="⬇️ Download",
-                    command=lambda url=video_url: self.start_single_download(url),
-                    height=30,
-                    width=120,
-                    font=ctk.CTkFont(size=11, weight="bold"),
-                    fg_color=self.colors['success']
-                )
-                download_button.pack(fill=tk.X, pady=(0, 5))
-
-                cancel_button = ctk.CTkButton(
-                    button_frame,
-                    text="⏹️ Cancel",
-                    command=lambda url=video_url: self.cancel_single_download(url),
-                    state=tk.DISABLED,
-                    height=25,
-                    width=120,
-                    font=ctk.CTkFont(size=10),
-                    fg_color=self.colors['danger']
-                )
-                cancel_button.pack(fill=tk.X)
-                
-                # Store widget references
-                self.video_widgets[video_url] = {
-                    'video_frame': video_frame,
-                    'status_label': status_label,
-                    'progress_bar': progress_bar,
-                    'download_button': download_button,
-                    'cancel_button': cancel_button,
-                    'audio_only_var': audio_only_var,
-                    'quality_var': quality_var,
-                }
         else:
             self.status_label.configure(text="❌ No videos found in playlist.")
-            self.download_all_button.configure(state=tk.DISABLED)
+            self._check_global_buttons_state()
 
-    def start_single_download(self, video_url):
-        """Prepares and starts the download of a single video with enhanced options."""
-        if video_url in self.download_processes:
-            return
+    def _create_video_row(self, i, video_info):
+        """Builds the model for one video row; widgets are only created for rows in view."""
+        duration = self.format_duration(video_info.get('duration'))
+        uploader = video_info.get('uploader', 'Unknown')[:20] + "..." if len(video_info.get('uploader', 'Unknown')) > 20 else video_info.get('uploader', 'Unknown')
+        views = self.format_view_count(video_info.get('view_count'))
         
-        self.download_all_button.configure(state=tk.DISABLED)
-        self.cancel_all_button.configure(state=tk.NORMAL)
+        row = VideoRow(i, video_info, f"⏱️ {duration} | 👤 {uploader} | 👀 {views} views")
+        self.video_rows[row.url] = row
+        return row
+
+    def _job_archive(self, video_url):
+        """Return the download directory and archive of a job (the chosen ones unless it was resumed)."""
+        path = self.job_paths.get(video_url, self.download_path)
+        if path == self.download_path:
+            return path, self.archive
+        if path not in self.job_archives:
+            self.job_archives[path] = DownloadArchive(path)
+        return path, self.job_archives[path]
+
+    def _apply_archive(self, rows):
+        """Marks rows whose videos are already in the download archive, in the chosen format, as done."""
+        for row in rows:
+            if row.busy:
+                continue
+            options = self.resume_options.get(row.url) or self._build_download_options(row)
+            archived = self._job_archive(row.url)[1].is_downloaded(row.info, options)
+            if archived:
+                row.archived = True
+                row.status = "✅ Already downloaded"
+                row.progress = 1.0
+                row.border = 'success'
+            elif row.archived:
+                row.archived = False
+                row.status = "Ready"
+                row.progress = 0.0
+                row.border = None
+            self.video_list.refresh_row(row)
+
+    def _apply_ui_updates(self):
+        """Applies the newest pending state for each row posted by download threads."""
+        for video_url, changes in self.ui_updates.drain().items():
+            self._update_row(video_url, **changes)
+        self.update_stats_display()
+
+    def _update_row(self, video_url, **changes):
+        """Updates a row's model and redraws it if it is on screen."""
+        row = self.video_rows.get(video_url)
+        if row is None:
+            return
+        for name, value in changes.items():
+            setattr(row, name, value)
+        self.video_list.refresh_row(row)
+
+    def start_single_download(self, video_url, priority=1):
+        """Queues a single video for download; it starts when a download slot is free."""
+        if not self.jobs.queued(video_url):
+            return
+        with self._cancel_lock:
+            self.cancel_requests.discard(video_url)
         
-        widgets = self.video_widgets[video_url]
-        widgets['download_button'].configure(state=tk.DISABLED)
-        widgets['cancel_button'].configure(state=tk.NORMAL)
-        widgets['status_label'].configure(text="🔄 Initializing...")
-        widgets['video_frame'].configure(border_color=self.colors['primary'])
+        self._update_row(video_url, busy=True, status="⏳ Queued", border='primary')
+
+        row = self.video_rows[video_url]
+        # Individually clicked videos get a bigger share of a bandwidth limit than batch ones
+        self.download_weights[video_url] = 2.0 if priority > 0 else 1.0
+        self.journal.record(
+            video_url, STATE_QUEUED,
+            video=row.info,
+            options=self.resume_options.get(video_url) or self._build_download_options(row),
+            priority=priority,
+            download_path=self._job_archive(video_url)[0]
+        )
+        self.metrics.start_job(video_url, row.info.get('title'))
+        self.download_queue.submit(video_url, lambda: self.run_download(video_url), priority=priority)
+
+    def _build_download_options(self, row):
+        """Collect the global and per-video settings into engine download options."""
+        options = {
+            'output_template': os.path.join(self._job_archive(row.url)[0], "%(title)s.%(ext)s"),
+            'no_playlist': True,
+            'write_description': True,
+            'write_info_json': True,
+            'concurrent_fragments': AUTO if self.fragments_var.get() == "Auto" else int(self.fragments_var.get()),
+        }
+
+        # Determine format based on global and individual settings
+        audio_only = self.global_audio_var.get() or row.audio_only
+        global_quality = self.quality_var.get()
 
-        download_thread = threading.Thread(target=self.run_download, args=(video_url,))
-        download_thread.daemon = True
-        download_thread.start()
+        if audio_only or global_quality == "Audio Only (MP3)":
+            options.update({
+                'audio_only': True,
+                'audio_format': "mp3",
+                'audio_quality': "192K"
+            })
+        else:
+            # Quality selection
+            quality = row.quality
+
+            if quality == "Best" or global_quality == "Best Quality":
+                options['format'] = "best[ext=mp4]"
+            elif quality == "1080p":
+                options['format'] = "best[height<=1080][ext=mp4]"
+            elif quality == "720p":
+                options['format'] = "best[height<=720][ext=mp4]"
+            elif quality == "480p":
+                options['format'] = "best[height<=480][ext=mp4]"
+
+        return options
+
+    def _get_media_store(self):
+        """Return the shared media store if "Share Across Playlists" is on, else None."""
+        if not self.store_var.get():
+            return None
+        if self.media_store is None:
+            self.media_store = MediaStore()
+        return self.media_store
 
     def run_download(self, video_url):
-        """Executes the yt-dlp command for a single video with enhanced features."""
-        widgets = self.video_widgets[video_url]
-        full_output = []
-        
+        """Runs the download for a single video through the configured engine."""
+        download_path, archive = self._job_archive(video_url)
+        handed_off = False
+        timing = self.metrics.job(video_url) or self.metrics.start_job(video_url)
+        timing.mark_started()
+
+        # Progress goes through the update bus, which applies only the newest
+        # state per row at UI_REFRESH_MS instead of one Tk callback per line
+        def on_event(event):
+            timing.observe(event)
+            if event['type'] == 'progress':
+                controller = self.concurrency_controller
+                if controller is not None:
+                    controller.report(video_url, event.get('speed_bps'))
+                self.jobs.progress(video_url, event['percent'] / 100.0)
+                self.ui_updates.post(
+                    video_url,
+                    progress=event['percent'] / 100.0,
+                    status=f"⬇️ {event['percent']:.1f}% | 🚀 {event['speed']} | ⏱️ {event['eta']}"
+                )
+            elif event['type'] == 'extract_audio':
+                self.ui_updates.post(video_url, status="🎵 Extracting audio...")
+            elif event['type'] == 'processing':
+                self.ui_updates.post(video_url, status="🔄 Processing...")
+            elif event['type'] == 'warning':
+                self.ui_updates.post(video_url, status=f"⚠️ {event['message'][:50]}...")
+
+        throttle = None
         try:
-            # Build command with enhanced options
-            ytdlp_cmd = self.get_ytdlp_command()
-            command = ytdlp_cmd + ["--newline"]
-            
-            # Output template with download path
-            output_template = os.path.join(self.download_path, "%(title)s.%(ext)s")
-            command.extend(["-o", output_template])
-
-            # Determine format based on global and individual settings
-            audio_only = self.global_audio_var.get() or widgets['audio_only_var'].get()
-            
-            if audio_only:
-                command.extend([
-                    "--extract-audio",
-                    "--audio-format", "mp3",
-                    "--audio-quality", "192K"
-                ])
-            else:
-                # Quality selection
-                quality = widgets['quality_var'].get()
-                global_quality = self.quality_var.get()
-                
-                if global_quality == "Audio Only (MP3)":
-                    command.extend([
-                        "--extract-audio", 
-                        "--audio-format", "mp3",
-                        "--audio-quality", "192K"
-                    ])
-                else:
-                    if quality == "Best" or global_quality == "Best Quality":
-                        command.extend(["-f", "best[ext=mp4]"])
-                    elif quality == "1080p":
-                        command.extend(["-f", "best[height<=1080][ext=mp4]"])
-                    elif quality == "720p":
-                        command.extend(["-f", "best[height<=720][ext=mp4]"])
-                    elif quality == "480p":
-                        command.extend(["-f", "best[height<=480][ext=mp4]"])
-
-            # Add additional options
-            command.extend([
-                "--no-playlist",
-                "--write-description",
-                "--write-info-json"
-            ])
-            
-            command.append(video_url)
-
-            # Start download process
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            self.download_processes[video_url] = process
-            
-            # Progress tracking
-            progress_regex = re.compile(r'\[download\]\s+(\d+\.\d+)%')
-            speed_regex = re.compile(r'(\d+(?:\.\d+)?(?:K|M|G)?iB/s)')
-            eta_regex = re.compile(r'ETA\s+(\d+:\d+)')
-            
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                
-                full_output.append(line)
-                line = line.strip()
-                
-                if process.poll() is not None and not line:
-                    break
-
-                # Update progress
-                progress_match = progress_regex.search(line)
-                if progress_match:
-                    try:
-                        percentage = float(progress_match.group(1)) / 100.0
-                        
-                        # Extract speed and ETA
-                        speed_match = speed_regex.search(line)
-                        eta_match = eta_regex.search(line)
-                        
-                        speed_text = speed_match.group(1) if speed_match else "N/A"
-                        eta_text = eta_match.group(1) if eta_match else "N/A"
-                        
-                        status_text = f"⬇️ {percentage*100:.1f}% | 🚀 {speed_text} | ⏱️ {eta_text}"
-                        
-                        self.after(0, lambda p=percentage: widgets['progress_bar'].set(p))
-                        self.after(0, lambda s=status_text: widgets['status_label'].configure(text=s))
-                        
-                    except (ValueError, IndexError):
-                        pass
-                elif '[ExtractAudio]' in line:
-                    self.after(0, lambda: widgets['status_label'].configure(text="🎵 Extracting audio..."))
-                elif '[ffmpeg]' in line and 'Destination:' in line:
-                    self.after(0, lambda: widgets['status_label'].configure(text="🔄 Processing..."))
-                elif any(keyword in line.lower() for keyword in ['error', 'failed', 'unable']):
-                    self.after(0, lambda l=line: widgets['status_label'].configure(text=f"⚠️ {l[:50]}..."))
+            row = self.video_rows.get(video_url)
+            if row is None:
+                # The list was cleared or replaced while this job waited for a slot
+                self._finish_job_metrics(video_url, OUTCOME_CANCELLED)
+                self.journal.record(video_url, STATE_CANCELLED)
+                self.jobs.cancelled(video_url)
+                self.download_weights.pop(video_url, None)
+                return
             
-            process.wait()
+            # Resumed jobs keep their original options so the .part file matches
+            options = self.resume_options.pop(video_url, None) or self._build_download_options(row)
+            store = self._get_media_store()
             
-            # Determine success
-            combined_output = "".join(full_output)
-            is_success = (process.returncode == 0 or 
-                         any(indicator in combined_output for indicator in [
-                             '[download] 100%',
-                             '[ExtractAudio] Destination:',
-                             '[ffmpeg] Destination:'
-                         ]))
+            # A video already downloaded for another playlist is linked, not fetched again
+            linked = store.link_into(row.info, options, download_path) if store is not None else None
+            if linked is not None:
+                archived = archive.add(row.info, linked, options)
+                self._finish_job_metrics(video_url, OUTCOME_LINKED, size=archived['size'])
+                self.journal.record(video_url, STATE_COMPLETED)
+                self.jobs.completed(video_url)
+                self.after(0, lambda: self._handle_successful_download(video_url, "🔗 Linked from media store"))
+                return
             
+            download_options, postprocess = split_postprocessing(options)
+            throttle = self.bandwidth.register(video_url, self.download_weights.pop(video_url, 1.0))
+            download = self.engine.create_download(video_url, download_options, on_event, throttle, self.fragment_tuner)
+            if not self._register_handle(self.download_processes, video_url, download):
+                self._report_cancelled_before_start(video_url)
+                return
+            self.journal.record(video_url, STATE_RUNNING, options=options)
+
+            result = download.run()
+            timing.mark_download_finished()
+
+            # Without a destination line there is no file to convert
+            if (result['success'] and postprocess is not None and
+                    not (result['filename'] and os.path.exists(result['filename']))):
+                result = dict(result, success=False, error="Output file not found, cannot extract audio")
+
             # Update UI based on result
-            if is_success:
+            if result['success'] and postprocess is not None:
+                source = result['filename']
+                self.jobs.postprocessing(video_url)
+                self.postprocess_queue.submit(
+                    video_url, lambda: self.run_postprocess(video_url, source, postprocess, options))
+                self.ui_updates.post(video_url, progress=1.0, status="⏳ Waiting for audio extraction...")
+                handed_off = True
+            elif result['success']:
+                archive.add(row.info, result['filename'], options)
+                if store is not None:
+                    store.add(row.info, options, result['filename'])
+                self._finish_job_metrics(video_url, OUTCOME_COMPLETED)
+                self.journal.record(video_url, STATE_COMPLETED)
+                self.jobs.completed(video_url)
                 self.after(0, lambda: self._handle_successful_download(video_url))
             else:
-                self.after(0, lambda: self._handle_failed_download(video_url, combined_output))
+                self._finish_job_metrics(video_url, OUTCOME_CANCELLED if result['cancelled'] else OUTCOME_FAILED)
+                self.journal.record(video_url, STATE_CANCELLED if result['cancelled'] else STATE_FAILED)
+                if result['cancelled']:
+                    self.jobs.cancelled(video_url)
+                else:
+                    self.jobs.failed(video_url, result['error'])
+                self.after(0, lambda: self._handle_failed_download(video_url, result['error']))
 
         except Exception as e:
-            self.after(0, lambda: self._handle_download_error(video_url, str(e)))
+            # ``e`` is unbound once the except block ends, before the callback runs
+            message = str(e)
+            self._finish_job_metrics(video_url, OUTCOME_FAILED)
+            self.journal.record(video_url, STATE_FAILED, error=message)
+            self.jobs.failed(video_url, message)
+            self.after(0, lambda: self._handle_download_error(video_url, message))
         finally:
+            # Hand this download's share of the bandwidth limit to the others
+            if throttle is not None:
+                throttle.close()
+            if self.concurrency_controller is not None:
+                self.concurrency_controller.job_finished(video_url)
             if video_url in self.download_processes:
                 del self.download_processes[video_url]
             
+            if not handed_off:
+                self.after(0, lambda: self._cleanup_download_ui(video_url))
+
+    def run_postprocess(self, video_url, source, postprocess, options):
+        """Converts a finished download on the post-processing stage."""
+        try:
+            row = self.video_rows[video_url]
+            extraction = AudioExtraction(source, **postprocess)
+            if not self._register_handle(self.postprocess_jobs, video_url, extraction):
+                self._report_cancelled_before_start(video_url)
+                return
+            self.ui_updates.post(video_url, status="🎵 Extracting audio...")
+            timing = self.metrics.job(video_url)
+            if timing is not None:
+                timing.mark_postprocess_started()
+
+            result = extraction.run()
+            if timing is not None:
+                timing.mark_postprocess_finished()
+
+            if result['success']:
+                self._job_archive(video_url)[1].add(row.info, result['filename'], options)
+                store = self._get_media_store()
+                if store is not None:
+                    store.add(row.info, options, result['filename'])
+                self._finish_job_metrics(video_url, OUTCOME_COMPLETED)
+                self.journal.record(video_url, STATE_COMPLETED)
+                self.jobs.completed(video_url)
+                self.after(0, lambda: self._handle_successful_download(video_url))
+            else:
+                self._finish_job_metrics(video_url, OUTCOME_CANCELLED if result['cancelled'] else OUTCOME_FAILED)
+                self.journal.record(video_url, STATE_CANCELLED if result['cancelled'] else STATE_FAILED)
+                if result['cancelled']:
+                    self.jobs.cancelled(video_url)
+                else:
+                    self.jobs.failed(video_url, result['error'])
+                self.after(0, lambda: self._handle_failed_download(video_url, result['error']))
+
+        except Exception as e:
+            # ``e`` is unbound once the except block ends, before the callback runs
+            message = str(e)
+            self._finish_job_metrics(video_url, OUTCOME_FAILED)
+            self.journal.record(video_url, STATE_FAILED, error=message)
+            self.jobs.failed(video_url, message)
+            self.after(0, lambda: self._handle_download_error(video_url, message))
+        finally:
+            self.postprocess_jobs.pop(video_url, None)
             self.after(0, lambda: self._cleanup_download_ui(video_url))
-            self.after(0, self._check_global_buttons_state)
 
-    def _handle_successful_download(self, video_url):
+    def _register_handle(self, handles, video_url, handle):
+        """Makes a job's handle cancellable; returns False if it was cancelled before getting here."""
+        with self._cancel_lock:
+            if video_url in self.cancel_requests:
+                self.cancel_requests.discard(video_url)
+                return False
+            handles[video_url] = handle
+            return True
+
+    def _report_cancelled_before_start(self, video_url):
+        """Finishes a job that was cancelled between getting a slot and starting."""
+        self._finish_job_metrics(video_url, OUTCOME_CANCELLED)
+        self.jobs.cancelled(video_url)
+        self.after(0, lambda: self._mark_cancelled(video_url))
+
+    def _on_job_thread_exit(self, video_url, state):
+        """Fails a job whose thread ended without reporting an outcome, so it cannot stay active."""
+        if self.jobs.abandoned(video_url, state, "Download ended unexpectedly"):
+            self._finish_job_metrics(video_url, OUTCOME_FAILED)
+            self.after(0, lambda: self._handle_failed_download(video_url, "Download ended unexpectedly"))
+
+    def _finish_job_metrics(self, video_url, outcome, size=None):
+        """Close a job's timeline; metrics files are rewritten at most every few seconds."""
+        self.metrics.finish(video_url, outcome, size=size)
+        self.metrics.maybe_export()
+
+    def _handle_successful_download(self, video_url, status="✅ Download completed!"):
         """Handle successful download UI updates."""
-        widgets = self.video_widgets[video_url]
-        widgets['status_label'].configure(text="✅ Download completed!")
-        widgets['progress_bar'].set(1.0)
-        widgets['video_frame'].configure(border_color=self.colors['success'])
-        self.completed_downloads += 1
-        self.update_stats_display()
+        # Final states must not be overwritten by a progress update still in the bus
+        self.ui_updates.discard(video_url)
+        self._update_row(video_url, status=status, progress=1.0, border='success', archived=True)
 
-    def _handle_failed_download(self, video_url, error_output):
+    def _handle_failed_download(self, video_url, error):
         """Handle failed download UI updates."""
-        widgets = self.video_widgets[video_url]
-        error_msg = "Download failed"
-        if "ERROR:" in error_output:
-            error_lines = [line for line in error_output.split('\n') if 'ERROR:' in line]
-            if error_lines:
-                error_msg = error_lines[-1].replace('ERROR:', '').strip()[:50]
-        
-        widgets['status_label'].configure(text=f"❌ {error_msg}")
-        widgets['progress_bar'].set(0)
-        widgets['video_frame'].configure(border_color=self.colors['danger'])
-        self.failed_downloads += 1
-        self.update_stats_display()
+        error_msg = error[:50] if error else "Download failed"
+        
+        self.ui_updates.discard(video_url)
+        self._update_row(video_url, status=f"❌ {error_msg}", progress=0.0, border='danger')
 
     def _handle_download_error(self, video_url, error_message):
         """Handle download exception UI updates."""
-        widgets = self.video_widgets[video_url]
-        widgets['status_label'].configure(text=f"⚠️ Error: {error_message[:30]}...")
-        widgets['progress_bar'].set(0)
-        widgets['video_frame'].configure(border_color=self.colors['warning'])
-        self.failed_downloads += 1
-        self.update_stats_display()
+        self.ui_updates.discard(video_url)
+        self._update_row(video_url, status=f"⚠️ Error: {error_message[:30]}...", progress=0.0, border='warning')
 
     def _cleanup_download_ui(self, video_url):
         """Clean up download UI elements."""
-        if video_url in self.video_widgets:
-            widgets = self.video_widgets[video_url]
-            widgets['download_button'].configure(state=tk.NORMAL)
-            widgets['cancel_button'].configure(state=tk.DISABLED)
+        self._update_row(video_url, busy=False)
 
 
     def download_all(self):
@@ -926,42 +1247,66 @@ class YouTubeDownloaderApp(ctk.CTk):
             messagebox.showwarning("No Videos", "Please load a playlist first.")
             return
         
+        # Videos already in the archive are skipped without starting anything; the
+        # format may have changed since the rows were checked, so check them again
+        self._apply_archive(list(self.video_rows.values()))
+        pending_urls = [video_info['url'] for video_info in self.video_info_list
+                        if not self.video_rows[video_info['url']].archived]
+        archived_count = len(self.video_info_list) - len(pending_urls)
+        if not pending_urls and not self.is_fetching:
+            messagebox.showinfo("Nothing to Download",
+                                f"All {archived_count} videos are already in {self.download_path}.")
+            return
+        
+        skipped_note = f"{archived_count} already downloaded videos will be skipped.\n\n" if archived_count else ""
+        
         # Confirm download
         response = messagebox.askyesno(
             "Confirm Download", 
-            f"Are you sure you want to download all {len(self.video_info_list)} videos?\n\n"
+            f"Are you sure you want to download all {len(pending_urls)} videos"
+            f"{' (and the rest as they load)' if self.is_fetching else ''}?\n\n"
+            f"{skipped_note}"
             f"Download path: {self.download_path}"
         )
         
         if not response:
             return
         
-        self.download_all_button.configure(state=tk.DISABLED)
-        self.cancel_all_button.configure(state=tk.NORMAL)
         self.status_label.configure(text="🚀 Starting batch download...")
         
         # Reset counters
-        self.completed_downloads = 0
-        self.failed_downloads = 0
+        self.jobs.reset_finished()
         self.update_stats_display()
         
-        # Start downloads with a small delay between each
-        for i, video_info in enumerate(self.video_info_list):
-            video_url = video_info['url']
-            if video_url not in self.download_processes:
-                # Use after() to stagger the start times slightly
-                self.after(i * 500, lambda url=video_url: self.start_single_download(url))
+        # Queue every video; the download queue bounds how many run at once
+        for video_url in pending_urls:
+            self.start_single_download(video_url, priority=0)
+        
+        # Rows still being streamed in are queued as they arrive
+        self.queue_new_rows = self.is_fetching
 
     def cancel_single_download(self, video_url):
         """Terminates the subprocess for a specific video download with enhanced feedback."""
-        if video_url in self.download_processes:
-            process = self.download_processes[video_url]
+        if self.download_queue.remove(video_url) or self.postprocess_queue.remove(video_url):
+            self._finish_job_metrics(video_url, OUTCOME_CANCELLED)
+            self.jobs.cancelled(video_url)
+            self._mark_cancelled(video_url)
+            self._cleanup_download_ui(video_url)
+            return
+        
+        with self._cancel_lock:
+            process = self.download_processes.get(video_url) or self.postprocess_jobs.get(video_url)
+            requested = process is None and self.jobs.is_active(video_url)
+            if requested:
+                # Its thread has a slot but no handle yet; it checks this before starting
+                self.cancel_requests.add(video_url)
+        if process is None:
+            if requested:
+                self._update_row(video_url, status="🛑 Cancelling...", progress=0.0, border='warning')
+        else:
             try:
                 process.terminate()
-                widgets = self.video_widgets[video_url]
-                widgets['status_label'].configure(text="🛑 Cancelling...")
-                widgets['progress_bar'].set(0)
-                widgets['video_frame'].configure(border_color=self.colors['warning'])
+                self._update_row(video_url, status="🛑 Cancelling...", progress=0.0, border='warning')
                 
                 # Give process time to terminate gracefully
                 self.after(2000, lambda: self._force_kill_process(video_url, process))
@@ -976,66 +1321,126 @@ class YouTubeDownloaderApp(ctk.CTk):
         except Exception:
             pass
 
+    def _mark_cancelled(self, video_url):
+        """Show a row as cancelled."""
+        self.journal.record(video_url, STATE_CANCELLED)
+        self.ui_updates.discard(video_url)
+        self._update_row(video_url, status="🛑 Cancelled", progress=0.0, border='warning')
+
     def cancel_all(self):
-        """Terminates all active download subprocesses with enhanced feedback."""
-        if not self.download_processes:
+        """Drains the download queue and terminates all active downloads."""
+        counts = self.jobs.counts()
+        pending_count = counts[STATE_QUEUED]
+        active_count = counts[STATE_RUNNING] + counts[STATE_POSTPROCESSING]
+        if not active_count and not pending_count:
             return
         
         response = messagebox.askyesno(
             "Confirm Cancel", 
-            f"Are you sure you want to cancel all {len(self.download_processes)} active downloads?"
+            f"Are you sure you want to cancel all {active_count} active downloads"
+            f" and {pending_count} queued downloads?"
         )
         
         if not response:
             return
         
         self.status_label.configure(text="🛑 Cancelling all downloads...")
+        self.queue_new_rows = False
+        
+        # Drain the queue first so no new downloads start while we cancel
+        for video_url in self.download_queue.cancel_pending() + self.postprocess_queue.cancel_pending():
+            self._finish_job_metrics(video_url, OUTCOME_CANCELLED)
+            self.jobs.cancelled(video_url)
+            self._mark_cancelled(video_url)
+            self._cleanup_download_ui(video_url)
         
         # Create a list to avoid dictionary size change during iteration
-        processes_to_cancel = list(self.download_processes.items())
+        with self._cancel_lock:
+            processes_to_cancel = list(self.download_processes.items()) + list(self.postprocess_jobs.items())
+            registered = {video_url for video_url, _ in processes_to_cancel}
+            # Jobs that hold a slot but have no handle yet are stopped before they start
+            self.cancel_requests.update(video_url for video_url in self.jobs.active_jobs()
+                                        if video_url not in registered)
         
         for video_url, process in processes_to_cancel:
             try:
                 process.terminate()
-                if video_url in self.video_widgets:
-                    widgets = self.video_widgets[video_url]
-                    widgets['status_label'].configure(text="🛑 Cancelled")
-                    widgets['progress_bar'].set(0)
-                    widgets['video_frame'].configure(border_color=self.colors['warning'])
+                self._mark_cancelled(video_url)
             except Exception as e:
                 print(f"Error cancelling download for {video_url}: {e}")
+        
+        self.update_stats_display()
 
-    def monitor_downloads(self):
-        """Enhanced download monitoring with better state management."""
-        self._check_global_buttons_state()
+    def _on_job_events(self, events, counts):
+        """Brings the widgets that summarise the jobs up to date after a batch of state changes."""
+        jobs_finished = False
+        for event, video_url, _ in events:
+            if event == EVENT_STARTED:
+                self._update_row(video_url, status="🔄 Initializing...")
+            elif event in (EVENT_COMPLETED, EVENT_FAILED, EVENT_CANCELLED):
+                jobs_finished = True
         
-        # Update overall progress if downloads are active
-        if self.download_processes:
-            active_count = len(self.download_processes)
-            self.status_label.configure(
-                text=f"📥 Downloading... {active_count} active downloads"
-            )
-        elif hasattr(self, 'video_info_list') and self.video_info_list and self.completed_downloads + self.failed_downloads > 0:
-            if self.completed_downloads + self.failed_downloads == len(self.video_info_list):
-                self.status_label.configure(text="✅ All downloads completed!")
+        self._check_global_buttons_state()
+        self._update_job_status(counts)
+        self.update_stats_display()
+        # The metrics only change when a job finishes; rebuilding them is not free
+        if jobs_finished and self.metrics_window is not None:
+            self._refresh_metrics_view()
+        self._start_concurrency_sampling()
+
+    def _update_job_status(self, counts):
+        """Shows what the jobs are doing in the status bar, if that changed."""
+        if counts[STATE_QUEUED] + counts[STATE_RUNNING] + counts[STATE_POSTPROCESSING]:
+            status = f"📥 Downloading... {counts[STATE_RUNNING]} active, {counts[STATE_QUEUED]} queued"
+            if counts[STATE_POSTPROCESSING]:
+                status += f" | 🎵 {counts[STATE_POSTPROCESSING]} converting"
+            progress = self.jobs.overall_progress()
+            if progress is not None:
+                status += f" | {progress:.0%}"
+        elif self.video_info_list and counts[STATE_COMPLETED] + counts[STATE_FAILED] == len(self.video_info_list):
+            status = "✅ All downloads completed!"
+        else:
+            status = (f"⏹️ Downloads finished: {counts[STATE_COMPLETED]} completed, "
+                      f"{counts[STATE_FAILED]} failed, {counts[STATE_CANCELLED]} cancelled")
+        if status != self._job_status:
+            self._job_status = status
+            self.status_label.configure(text=status)
+
+    def _start_concurrency_sampling(self):
+        """Samples the adaptive controller while it is on and jobs are running."""
+        if self._sampling_concurrency or self.concurrency_controller is None or not self.has_pending_work():
+            return
+        self._sampling_concurrency = True
+        self.after(CONTROLLER_SAMPLE_MS, self._sample_concurrency)
+
+    def _sample_concurrency(self):
+        """Let the adaptive controller resize the queue from measured throughput."""
+        controller = self.concurrency_controller
+        if controller is None or not self.has_pending_work():
+            # Restarted by the next job event, so an idle app schedules nothing
+            self._sampling_concurrency = False
+            return
         
-        # Reschedule
-        self.after(500, self.monitor_downloads)
+        new_limit = controller.sample(self.download_queue.active_count, self.download_queue.pending_count)
+        if new_limit is not None:
+            self.download_queue.set_max_workers(new_limit)
+        self.update_stats_display()
+        self.after(CONTROLLER_SAMPLE_MS, self._sample_concurrency)
 
     def _check_global_buttons_state(self):
         """Enhanced global button state management."""
-        has_active_downloads = bool(self.download_processes)
+        has_active_downloads = self.has_pending_work()
         has_videos = hasattr(self, 'video_info_list') and bool(self.video_info_list)
         
         if not has_active_downloads:
-            if has_videos:
-                self.download_all_button.configure(state=tk.NORMAL)
-            else:
-                self.download_all_button.configure(state=tk.DISABLED)
-            self.cancel_all_button.configure(state=tk.DISABLED)
+            states = (tk.NORMAL if has_videos else tk.DISABLED, tk.DISABLED)
         else:
-            self.download_all_button.configure(state=tk.DISABLED)
-            self.cancel_all_button.configure(state=tk.NORMAL)
+            states = (tk.DISABLED, tk.NORMAL)
+        if states == self._button_states:
+            return
+        self._button_states = states
+        self.download_all_button.configure(state=states[0])
+        self.cancel_all_button.configure(state=states[1])
 
     def create_context_menu(self):
         """Enhanced context menu for URL entry."""
@@ -1072,9 +1477,15 @@ class YouTubeDownloaderApp(ctk.CTk):
 
 
 if __name__ == "__main__":
+    # Worker processes of the workers engine re-enter a frozen build here
+    multiprocessing.freeze_support()
     try:
         app = YouTubeDownloaderApp()
+        if os.environ.get(EXIT_AFTER_STARTUP_ENV_VAR):
+            app.after_idle(lambda: (app.update_idletasks(), app.destroy()))
         app.mainloop()
+        app.engine.close()
+        app.metrics.export()
     except Exception as e:
         print(f"Application error: {e}")
         messagebox.showerror("Application Error", f"Failed to start application:\n{e}")
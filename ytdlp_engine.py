@@ -0,0 +1,672 @@
+"""
+YouTube Playlist Downloader Pro - Download Engines
+Drives yt-dlp either in-process or through one subprocess per video.
+
+The in-process engine keeps a single interpreter (and a single import of
+yt_dlp and its extractors) for the whole session and reports status through
+``progress_hooks``/``postprocessor_hooks``. The subprocess engine is the
+original behaviour and is used as a fallback when yt_dlp cannot be imported.
+The workers engine (``worker_pool.py``) sits in between: downloads run in
+separate, long-lived processes that each import yt_dlp once.
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+from collections import deque
+
+from toolchain import YTDLP_ENV_VAR, get_ytdlp_command
+from fragment_tuning import AUTO, format_protocols
+
+ENGINE_AUTO = "auto"
+ENGINE_INPROCESS = "inprocess"
+ENGINE_SUBPROCESS = "subprocess"
+ENGINE_WORKERS = "workers"
+ENGINE_MODES = (ENGINE_AUTO, ENGINE_INPROCESS, ENGINE_SUBPROCESS, ENGINE_WORKERS)
+
+# Environment override so both entry points can be switched without code changes
+ENGINE_ENV_VAR = "YTPD_ENGINE"
+
+# Output kept per download: the most recent lines, and the last few errors/warnings
+OUTPUT_TAIL_LINES = 200
+MAX_CAPTURED_MESSAGES = 20
+
+
+def format_speed(speed):
+    """Format a speed in bytes per second the way yt-dlp prints it."""
+    if speed is None:
+        return "N/A"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if speed < 1024.0 or unit == "GiB":
+            return f"{speed:.2f}{unit}/s"
+        speed /= 1024.0
+
+
+_SPEED_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+_speed_text_regex = re.compile(r'(\d+(?:\.\d+)?)(?:(K|M|G)i)?B/s')
+
+
+def parse_speed(text):
+    """Convert a speed printed by yt-dlp ("1.50MiB/s") to bytes per second, or None."""
+    match = _speed_text_regex.search(text or "")
+    if not match:
+        return None
+    return float(match.group(1)) * _SPEED_UNITS[match.group(2) or '']
+
+
+def format_eta(eta):
+    """Format an ETA in seconds as MM:SS or HH:MM:SS."""
+    if eta is None:
+        return "N/A"
+    try:
+        eta = int(eta)
+    except (ValueError, TypeError):
+        return "N/A"
+    hours, remainder = divmod(eta, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+# Marks the machine-readable progress records requested with --progress-template
+PROGRESS_PREFIX = "ytpd-progress"
+_PROGRESS_FIELDS = ('status', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate', 'speed', 'eta')
+PROGRESS_TEMPLATE = "download:" + " ".join(
+    [PROGRESS_PREFIX] + [f"%(progress.{field})s" for field in _PROGRESS_FIELDS])
+
+
+# yt-dlp prints "NA" (older versions "None") for fields it doesn't know
+_MISSING_FIELDS = ("NA", "None")
+
+
+def parse_progress_record(line):
+    """Decode one ``PROGRESS_TEMPLATE`` line into a status dict, or None.
+
+    The dict has the same keys as a yt_dlp progress hook status, with
+    numbers (or None) instead of the human-readable strings yt-dlp prints.
+    """
+    fields = line.split(" ")
+    if len(fields) != len(_PROGRESS_FIELDS) + 1 or fields[0] != PROGRESS_PREFIX:
+        return None
+    try:
+        numbers = [None if text in _MISSING_FIELDS else float(text) for text in fields[2:]]
+    except ValueError:
+        return None
+    status = dict(zip(_PROGRESS_FIELDS[1:], numbers))
+    status['status'] = fields[1]
+    return status
+
+
+def progress_event(status):
+    """Build a 'progress' event from a yt_dlp progress status dict."""
+    total = status.get('total_bytes') or status.get('total_bytes_estimate')
+    downloaded = status.get('downloaded_bytes') or 0
+    return {
+        'type': 'progress',
+        'percent': 100.0 * downloaded / total if total else 0.0,
+        'speed': format_speed(status.get('speed')),
+        'speed_bps': status.get('speed'),
+        'eta': format_eta(status.get('eta')),
+        'downloaded_bytes': downloaded,
+        'total_bytes': total,
+    }
+
+
+def build_command_args(options):
+    """Translate download options into yt-dlp command line arguments."""
+    args = ["--newline", "--progress-template", PROGRESS_TEMPLATE, "-o", options['output_template']]
+
+    if options.get('format'):
+        args.extend(["-f", options['format']])
+
+    if options.get('audio_only'):
+        args.extend([
+            "--extract-audio",
+            "--audio-format", options.get('audio_format', "mp3")
+        ])
+        if options.get('audio_quality'):
+            args.extend(["--audio-quality", options['audio_quality']])
+
+    if isinstance(options.get('concurrent_fragments'), int):
+        args.extend(["-N", str(options['concurrent_fragments'])])
+    if isinstance(options.get('http_chunk_size'), int):
+        args.extend(["--http-chunk-size", str(options['http_chunk_size'])])
+
+    if options.get('no_playlist'):
+        args.append("--no-playlist")
+    if options.get('write_description'):
+        args.append("--write-description")
+    if options.get('write_info_json'):
+        args.append("--write-info-json")
+
+    return args
+
+
+def build_ydl_params(options):
+    """Translate download options into ``yt_dlp.YoutubeDL`` parameters."""
+    params = {
+        'outtmpl': options['output_template'],
+        'noplaylist': bool(options.get('no_playlist')),
+        'writedescription': bool(options.get('write_description')),
+        'writeinfojson': bool(options.get('write_info_json')),
+        'quiet': True,
+        'noprogress': True,
+        'continuedl': True,
+    }
+
+    if options.get('format'):
+        params['format'] = options['format']
+
+    # AUTO values are filled in per download by a FragmentTuner
+    if isinstance(options.get('concurrent_fragments'), int):
+        params['concurrent_fragment_downloads'] = options['concurrent_fragments']
+    if isinstance(options.get('http_chunk_size'), int):
+        params['http_chunk_size'] = options['http_chunk_size']
+    # Set by handles that can't throttle through a JobThrottle (worker processes)
+    if options.get('rate_limit'):
+        params['ratelimit'] = options['rate_limit']
+
+    if options.get('audio_only'):
+        postprocessor = {
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': options.get('audio_format', "mp3"),
+        }
+        if options.get('audio_quality'):
+            # yt-dlp's CLI accepts "192K", the postprocessor wants the number
+            postprocessor['preferredquality'] = options['audio_quality'].rstrip("kK")
+        params['postprocessors'] = [postprocessor]
+
+    return params
+
+
+def parse_playlist_entry(video_json):
+    """Convert one ``--flat-playlist -j`` record into a video info dict, or None."""
+    if 'title' not in video_json or 'url' not in video_json:
+        return None
+    return {
+        'id': video_json.get('id'),
+        'title': video_json['title'],
+        'url': video_json['url'],
+        'duration': video_json.get('duration', 'Unknown'),
+        'uploader': video_json.get('uploader', 'Unknown'),
+        'view_count': video_json.get('view_count', 0)
+    }
+
+
+def iter_playlist_entries(url, stats=None):
+    """Yield video info dicts for a playlist as yt-dlp enumerates them.
+
+    Entries are yielded as soon as yt-dlp prints them, so callers can show
+    the first videos of a large playlist while the rest are still being
+    listed. If ``stats`` is a dict, ``stats['skipped']`` counts lines that
+    could not be decoded.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('skipped', 0)
+
+    command = get_ytdlp_command() + [
+        "--flat-playlist",
+        "-j",
+        "--no-warnings",
+        "--ignore-errors",
+        url
+    ]
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        universal_newlines=True
+    )
+
+    try:
+        for line in iter(process.stdout.readline, ''):
+            if not line.strip():
+                continue
+            try:
+                entry = parse_playlist_entry(json.loads(line))
+            except json.JSONDecodeError:
+                stats['skipped'] += 1
+                continue
+            if entry is not None:
+                yield entry
+        process.wait()
+    finally:
+        # The consumer may stop early; don't leave yt-dlp running
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+class OutputCapture:
+    """Bounded record of the output of one download.
+
+    yt-dlp prints a progress line per update (tens of thousands for a long
+    fragmented download), so only the last ``tail_lines`` lines are kept.
+    Error, warning and destination lines are picked out as they stream past,
+    so callers never have to search the full output afterwards.
+    """
+
+    # Lines naming the file a download ends up in; the last match wins
+    destination_regexes = (
+        re.compile(r'^\[download\] Destination: (.+)$'),
+        re.compile(r'^\[download\] (.+) has already been downloaded'),
+        re.compile(r'^\[Merger\] Merging formats into "(.+)"$'),
+        re.compile(r'^\[ExtractAudio\] Destination: (.+)$'),
+    )
+    # Printed once postprocessing has the media on disk, even if yt-dlp exits
+    # non-zero later; finished downloads are reported by progress records
+    completion_markers = ('[ExtractAudio] Destination:', '[ffmpeg] Destination:')
+
+    def __init__(self, tail_lines=OUTPUT_TAIL_LINES):
+        self.tail = deque(maxlen=tail_lines)
+        self.errors = deque(maxlen=MAX_CAPTURED_MESSAGES)
+        self.warnings = deque(maxlen=MAX_CAPTURED_MESSAGES)
+        self.destination = None
+        self.completed = False
+
+    def add(self, line):
+        """Record one line of output; ERROR:/WARNING: lines are also kept separately."""
+        line = line.rstrip('\n')
+        self.tail.append(line)
+
+        if 'ERROR:' in line:
+            self.errors.append(line.split('ERROR:', 1)[1].strip())
+        elif 'WARNING:' in line:
+            self.warnings.append(line.split('WARNING:', 1)[1].strip())
+        elif line.startswith('['):
+            for regex in self.destination_regexes:
+                match = regex.search(line)
+                if match:
+                    self.destination = match.group(1)
+                    break
+            if not self.completed and line.startswith(self.completion_markers):
+                self.completed = True
+
+    def add_warning(self, message):
+        """Record a warning passed without its 'WARNING:' prefix (yt_dlp loggers)."""
+        self.tail.append(message)
+        self.warnings.append(message)
+
+    @property
+    def error(self):
+        """The last error message, or None."""
+        return self.errors[-1] if self.errors else None
+
+    @property
+    def text(self):
+        return "\n".join(self.tail)
+
+    def result(self):
+        """Return the output fields of a download result dict."""
+        return {'output': self.text, 'error': self.error, 'warnings': list(self.warnings)}
+
+
+class DownloadHandle:
+    """A single download that can be run, polled and cancelled like a process.
+
+    ``terminate()``, ``kill()`` and ``poll()`` mirror ``subprocess.Popen`` so
+    callers can keep treating active downloads as processes. An optional
+    ``throttle`` (``bandwidth.JobThrottle``) limits the download rate, and an
+    optional ``tuner`` (``fragment_tuning.FragmentTuner``) picks fragment
+    parallelism and chunk size within its connection cap.
+
+    Result dicts carry ``output`` (the last lines only, see ``OutputCapture``),
+    ``error`` (the last error message or None) and ``warnings``.
+    """
+
+    def __init__(self, url, options, on_event=None, throttle=None, tuner=None):
+        self.url = url
+        self.options = options
+        self.on_event = on_event
+        self.throttle = throttle
+        self.tuner = tuner
+        self.returncode = None
+        self.filename = None
+        self.output = OutputCapture()
+        self._cancelled = False
+
+    def _emit(self, event):
+        if self.on_event:
+            self.on_event(event)
+
+    def _plan_connections(self, protocols=None):
+        """Reserve connections from the tuner; returns its plan."""
+        return self.tuner.plan(
+            self,
+            protocols,
+            fragments=self.options.get('concurrent_fragments', AUTO),
+            chunk_size=self.options.get('http_chunk_size', AUTO)
+        )
+
+    def run(self):
+        """Run the download to completion and return a result dict."""
+        try:
+            return self._run()
+        finally:
+            if self.tuner is not None:
+                self.tuner.release(self)
+
+    def _run(self):
+        raise NotImplementedError
+
+    def terminate(self):
+        self._cancelled = True
+
+    def kill(self):
+        self.terminate()
+
+    def poll(self):
+        return self.returncode
+
+
+class SubprocessDownload(DownloadHandle):
+    """Download a video by spawning a dedicated yt-dlp process.
+
+    Progress arrives as ``PROGRESS_TEMPLATE`` records rather than yt-dlp's
+    human-readable ``[download]`` lines, so it is decoded without regexes.
+    """
+
+    def __init__(self, url, options, on_event=None, throttle=None, tuner=None, ytdlp_cmd=None):
+        super().__init__(url, options, on_event, throttle, tuner)
+        self.ytdlp_cmd = ytdlp_cmd or get_ytdlp_command()
+        self.process = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        options = self.options
+        if self.tuner is not None:
+            # The tuner's plan below is the only -N / --http-chunk-size on the command line
+            options = {key: value for key, value in options.items()
+                       if key not in ('concurrent_fragments', 'http_chunk_size')}
+        command = self.ytdlp_cmd + build_command_args(options)
+        # A separate process can't follow later budget changes; it keeps the share it starts with
+        rate = self.throttle.rate() if self.throttle else None
+        if rate:
+            command += ["--limit-rate", str(int(rate))]
+        # The format isn't known before the process starts, so plan for either kind
+        if self.tuner is not None:
+            plan = self._plan_connections()
+            command += ["-N", str(plan['fragments'])]
+            if plan['http_chunk_size']:
+                command += ["--http-chunk-size", str(plan['http_chunk_size'])]
+        command.append(self.url)
+
+        with self._lock:
+            if self._cancelled:
+                self.returncode = -1
+                return {'success': False, 'returncode': -1, 'cancelled': True, 'filename': None,
+                        **self.output.result()}
+            self.process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                universal_newlines=True
+            )
+
+        for line in iter(self.process.stdout.readline, ''):
+            line = line.strip()
+            self.output.add(line)
+            self._parse_line(line)
+
+        self.process.wait()
+        self.returncode = self.process.returncode
+        self.filename = self.output.destination
+
+        is_success = self.returncode == 0 or self.output.completed
+        return {
+            'success': is_success and not self._cancelled,
+            'returncode': self.returncode,
+            'cancelled': self._cancelled,
+            'filename': self.filename,
+            **self.output.result(),
+        }
+
+    def _parse_line(self, line):
+        if not line:
+            return
+
+        if line.startswith(PROGRESS_PREFIX):
+            status = parse_progress_record(line)
+            if status is None:
+                return
+            if status['status'] == 'finished':
+                self.output.completed = True
+            elif status['status'] == 'downloading':
+                if self.tuner is not None:
+                    self.tuner.observe(self, status['speed'])
+                self._emit(progress_event(status))
+        elif '[ExtractAudio]' in line:
+            self._emit({'type': 'extract_audio'})
+        elif '[ffmpeg]' in line and 'Destination:' in line:
+            self._emit({'type': 'processing'})
+        elif any(keyword in line.lower() for keyword in ['error', 'failed', 'unable']):
+            self._emit({'type': 'warning', 'message': line})
+
+    def terminate(self):
+        with self._lock:
+            self._cancelled = True
+            if self.process is not None and self.process.poll() is None:
+                self.process.terminate()
+
+    def kill(self):
+        with self._lock:
+            self._cancelled = True
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+
+    def poll(self):
+        if self.process is not None:
+            return self.process.poll()
+        return self.returncode
+
+
+class _CapturingLogger:
+    """yt_dlp logger that feeds the messages a subprocess would have printed to the handle's output."""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def debug(self, message):
+        self.handle.output.add(message)
+
+    def info(self, message):
+        self.handle.output.add(message)
+
+    def warning(self, message):
+        # yt_dlp passes warnings to a logger without the 'WARNING:' prefix
+        self.handle.output.add_warning(message)
+        self.handle._emit({'type': 'warning', 'message': message})
+
+    def error(self, message):
+        self.handle.output.add(message)
+        self.handle._emit({'type': 'warning', 'message': message})
+
+
+class InProcessDownload(DownloadHandle):
+    """Download a video with ``yt_dlp.YoutubeDL`` in the current interpreter."""
+
+    def __init__(self, url, options, on_event=None, throttle=None, tuner=None):
+        super().__init__(url, options, on_event, throttle, tuner)
+        self._progress_file = None
+        self._downloaded_bytes = 0
+
+    def _run(self):
+        # Imported lazily so merely loading this module stays cheap
+        import yt_dlp
+        from yt_dlp.utils import DownloadCancelled, DownloadError
+
+        logger = _CapturingLogger(self)
+        params = build_ydl_params(self.options)
+        params.update({
+            'logger': logger,
+            'progress_hooks': [self._progress_hook],
+            'postprocessor_hooks': [self._postprocessor_hook],
+        })
+
+        try:
+            if self._cancelled:
+                raise DownloadCancelled()
+            with yt_dlp.YoutubeDL(params) as ydl:
+                if self.tuner is not None:
+                    ydl.add_post_processor(_make_tuning_postprocessor(self), when='before_dl')
+                self.returncode = ydl.download([self.url])
+        except DownloadCancelled:
+            self.returncode = -1
+        except DownloadError as e:
+            # Already reported through the logger, unless yt_dlp raised before logging
+            if not self.output.errors:
+                self.output.add(str(e))
+            self.returncode = 1
+
+        if self._cancelled:
+            self.returncode = -1
+
+        return {
+            'success': self.returncode == 0,
+            'returncode': self.returncode,
+            'cancelled': self._cancelled,
+            'filename': self.filename,
+            **self.output.result(),
+        }
+
+    def _progress_hook(self, status):
+        from yt_dlp.utils import DownloadCancelled
+
+        # Raising from a hook is how yt_dlp lets callers abort a download
+        if self._cancelled:
+            raise DownloadCancelled()
+
+        if status.get('status') == 'finished':
+            self.filename = status.get('filename') or self.filename
+        elif status.get('status') == 'downloading':
+            downloaded = status.get('downloaded_bytes') or 0
+            self._emit(progress_event(status))
+            if self.tuner is not None:
+                self.tuner.observe(self, status.get('speed'))
+
+            # Sleeping in the hook holds up the download thread between chunks.
+            # Each file (format) starts a new count, and bytes already in a
+            # resumed .part file are not charged against the budget.
+            if status.get('filename') != self._progress_file:
+                self._progress_file = status.get('filename')
+                self._downloaded_bytes = downloaded
+            chunk = downloaded - self._downloaded_bytes
+            self._downloaded_bytes = downloaded
+            if self.throttle is not None and chunk > 0:
+                self.throttle.consume(chunk, cancelled=lambda: self._cancelled)
+
+    def _postprocessor_hook(self, status):
+        if status.get('status') == 'finished':
+            # Postprocessors rename the file (merging, audio extraction)
+            self.filename = status.get('info_dict', {}).get('filepath') or self.filename
+            return
+        # MoveFiles runs after every download and is not worth reporting
+        if status.get('status') != 'started' or status.get('postprocessor') in ('MoveFiles', 'FragmentTuning'):
+            return
+        if status.get('postprocessor') == 'ExtractAudio':
+            self._emit({'type': 'extract_audio'})
+        else:
+            self._emit({'type': 'processing'})
+
+
+def _make_tuning_postprocessor(handle):
+    """Return a 'before_dl' postprocessor that applies the tuner's plan.
+
+    It runs once the format has been chosen, so the plan can depend on
+    whether the format is fragmented, and before the downloader reads
+    ``concurrent_fragment_downloads``/``http_chunk_size`` from the params.
+    """
+    from yt_dlp.postprocessor import PostProcessor
+
+    class FragmentTuningPP(PostProcessor):
+        def run(self, info):
+            plan = handle._plan_connections(format_protocols(info))
+            self._downloader.params['concurrent_fragment_downloads'] = plan['fragments']
+            if plan['http_chunk_size']:
+                self._downloader.params['http_chunk_size'] = plan['http_chunk_size']
+            return [], info
+
+    return FragmentTuningPP()
+
+
+def inprocess_available():
+    """Return True if yt_dlp can be imported in this interpreter."""
+    import importlib.util
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
+class DownloadEngine:
+    """Creates download handles for one engine mode."""
+
+    def __init__(self, mode=ENGINE_AUTO):
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"Unknown engine mode: {mode}")
+
+        if mode == ENGINE_AUTO:
+            # An overridden yt-dlp command can only be honoured by running it
+            use_inprocess = inprocess_available() and not os.environ.get(YTDLP_ENV_VAR)
+            mode = ENGINE_INPROCESS if use_inprocess else ENGINE_SUBPROCESS
+        elif mode in (ENGINE_INPROCESS, ENGINE_WORKERS) and not inprocess_available():
+            mode = ENGINE_SUBPROCESS
+
+        self.mode = mode
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def description(self):
+        if self.mode == ENGINE_INPROCESS:
+            return "in-process yt_dlp"
+        if self.mode == ENGINE_WORKERS:
+            return "warm yt_dlp worker processes"
+        return "yt-dlp subprocess"
+
+    def worker_pool(self):
+        """Return the engine's ``WorkerPool``, starting it on first use (workers mode only)."""
+        with self._pool_lock:
+            if self._pool is None:
+                from worker_pool import WorkerPool
+                self._pool = WorkerPool()
+            return self._pool
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first request (no-op in other modes)."""
+        if self.mode == ENGINE_WORKERS:
+            self.worker_pool()
+
+    def create_download(self, url, options, on_event=None, throttle=None, tuner=None):
+        """Return a handle for downloading ``url``; call ``run()`` to start it."""
+        if self.mode == ENGINE_INPROCESS:
+            return InProcessDownload(url, options, on_event, throttle, tuner)
+        if self.mode == ENGINE_WORKERS:
+            return self.worker_pool().create_download(url, options, on_event, throttle, tuner)
+        return SubprocessDownload(url, options, on_event, throttle, tuner)
+
+    def iter_playlist_entries(self, url, stats=None):
+        """List a playlist like ``iter_playlist_entries``, in a worker in workers mode."""
+        if self.mode == ENGINE_WORKERS:
+            return self.worker_pool().iter_playlist_entries(url, stats)
+        return iter_playlist_entries(url, stats)
+
+    def close(self):
+        """Stop any worker processes."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+def create_engine(mode=None):
+    """Create a download engine, honouring the YTPD_ENGINE environment variable."""
+    if mode is None:
+        mode = os.environ.get(ENGINE_ENV_VAR, ENGINE_AUTO).strip().lower() or ENGINE_AUTO
+    return DownloadEngine(mode)